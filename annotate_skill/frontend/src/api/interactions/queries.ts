@@ -1,11 +1,12 @@
 import { BaseQueryOptions } from "@/api/query";
-import { Interaction } from "@/types/interactions";
+import { Interaction, SpanTree } from "@/types/interactions";
 import { useQuery } from "@tanstack/react-query";
-import { getInteractionForStep } from "./router";
+import { getInteractionForStep, getSpanTree } from "./router";
 
 export const queryKeys = {
   interactions: ["interactions"] as const,
   interaction_for_step: (stepId: string) => [...queryKeys.interactions, "step", stepId] as const,
+  span_tree: (interactionId: string) => [...queryKeys.interactions, interactionId, "span-tree"] as const,
 };
 
 interface GetInteractionForStepArgs {
@@ -20,3 +21,16 @@ export const useGetInteractionForStep = ({ stepId, options }: GetInteractionForS
     ...options,
   });
 };
+
+interface GetSpanTreeArgs {
+  interactionId: string;
+  options?: BaseQueryOptions<SpanTree>;
+}
+
+export const useGetSpanTree = ({ interactionId, options }: GetSpanTreeArgs) => {
+  return useQuery({
+    queryKey: queryKeys.span_tree(interactionId),
+    queryFn: () => getSpanTree({ interactionId }),
+    ...options,
+  });
+};
@@ -1,10 +1,16 @@
 import { api } from "@/api/api";
 import { parseResponse } from "@/api/utils";
 import { joinPaths } from "@/routes";
-import { Interaction } from "@/types/interactions";
+import { Interaction, SpanTree } from "@/types/interactions";
 
 export const getInteractionForStep = async ({ stepId }: { stepId: string }) => {
   const path = joinPaths(stepId, "interaction");
   const response = await api.get(path);
   return parseResponse(response, Interaction);
 };
+
+export const getSpanTree = async ({ interactionId }: { interactionId: string }) => {
+  const path = joinPaths("interactions", interactionId, "span-tree");
+  const response = await api.get(path);
+  return parseResponse(response, SpanTree);
+};
@@ -10,6 +10,12 @@ export const AttributeMatcher = z.object({
   equals_value: z.any().nullable(),
 });
 
+export const TimeRangeMatcher = z.object({
+  start_ns: z.number().nullish(),
+  end_ns: z.number().nullish(),
+  last_seconds: z.number().nullish(),
+});
+
 export const FeedbackConfig = z.object({
   id: z.string(),
   granularity: Granularity,
@@ -18,6 +24,7 @@ export const FeedbackConfig = z.object({
   input_items: z.array(InputItem),
   ai_rubric: z.string(),
   attribute_matchers: z.array(AttributeMatcher),
+  time_range: TimeRangeMatcher.nullish(),
   natural_language_disqualifier: z.string().nullable(),
   stats: z.any().nullable().optional(),
 });
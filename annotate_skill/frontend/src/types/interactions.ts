@@ -40,6 +40,15 @@ export const InteractionGroup = z.object({
   interactions: z.array(Interaction),
 });
 
+export const SpanTree = z.object({
+  roots: z.array(z.string()),
+  children: z.record(z.string(), z.array(z.string())),
+  depth: z.record(z.string(), z.number()),
+  order: z.array(z.string()),
+  subtree_duration_ns: z.record(z.string(), z.number()),
+  critical_path: z.array(z.string()),
+});
+
 export const InteractionType = z.enum(["step", "interaction", "group"]);
 
 export type InteractionType = z.infer<typeof InteractionType>;
@@ -47,3 +56,4 @@ export type InteractionStepType = z.infer<typeof InteractionStepType>;
 export type InteractionStep = z.infer<typeof InteractionStep>;
 export type Interaction = z.infer<typeof Interaction>;
 export type InteractionGroup = z.infer<typeof InteractionGroup>;
+export type SpanTree = z.infer<typeof SpanTree>;
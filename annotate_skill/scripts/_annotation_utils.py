@@ -5,7 +5,7 @@ from datetime import datetime, timezone
 import json
 import os
 from enum import Enum
-from typing import Optional, Union
+from typing import Iterable, Optional, Union
 
 from pydantic import Field, create_model, model_validator
 from pydantic_ai import Agent
@@ -87,6 +87,48 @@ def create_validated_reference_model(
     return ValidatedReference
 
 
+def format_span_tree(interaction: Interaction) -> str:
+    """Outline an interaction's step hierarchy, one indented line per step.
+
+    Steps on the critical path are marked with `*`.
+    """
+    tree = interaction.span_tree()
+    steps_by_id = {step.id: step for step in interaction.steps}
+    critical_path = set(tree.critical_path)
+    lines = []
+    for step_id in tree.order:
+        step = steps_by_id[step_id]
+        marker = "*" if step_id in critical_path else "-"
+        lines.append(
+            f"{'  ' * tree.depth[step_id]}{marker} {step.name or 'step'} "
+            f"(step {step_id}, {tree.subtree_duration_ns[step_id] / 1e6:.0f} ms)"
+        )
+    return "\n".join(lines)
+
+
+def _hierarchy_section(
+    raw_input: Union[InteractionStep, Interaction, InteractionGroup],
+    raw_input_context: Union[Interaction, InteractionGroup, None],
+) -> str:
+    source = raw_input if not isinstance(raw_input, InteractionStep) else None
+    source = source or raw_input_context
+    if isinstance(source, Interaction):
+        interactions = [source]
+    elif isinstance(source, InteractionGroup):
+        interactions = source.interactions
+    else:
+        return ""
+    outlines = "\n".join(
+        f"Interaction {interaction.id}:\n{format_span_tree(interaction)}"
+        for interaction in interactions
+    )
+    return f"""
+Step hierarchy (children are indented under their parent step; * marks the critical path,
+the chain of steps that took the longest):
+{outlines}
+"""
+
+
 async def summarize_for_judge_input(
     input_items: list[InputItem],
     raw_input: Union[InteractionStep, Interaction, InteractionGroup],
@@ -148,6 +190,8 @@ Use this context to help extract information from the raw input when needed.
 For example, if the raw input is a single step, the context might provide information
 about other steps surrounding the step in the same interaction.
 """
+    context_section += _hierarchy_section(raw_input, raw_input_context)
+
     disqualification_section = ""
     if natural_language_disqualifier:
         disqualification_section = f"""
@@ -585,11 +629,23 @@ def _compute_continuous_stats(
 
 
 def compute_feedback_config_stats(
-    test_cases: list[TestCase], feedback_spec: AnnotationSpec
+    test_cases: Iterable[TestCase], feedback_spec: AnnotationSpec
 ) -> FeedbackConfigStats:
+    """Compute stats in a single pass, so `test_cases` may be a lazy iterator."""
     stats = FeedbackConfigStats()
-    status_counts = Counter(tc.status for tc in test_cases)
-    stats.total_test_cases = len(test_cases)
+    status_counts: Counter[TestCaseStatus] = Counter()
+    dual_annotated = []
+    for tc in test_cases:
+        status_counts[tc.status] += 1
+        if (
+            tc.ai_annotation is not None
+            and tc.human_annotation is not None
+            and not tc.ai_annotation.skip
+            and not tc.human_annotation.skip
+        ):
+            dual_annotated.append(tc)
+
+    stats.total_test_cases = sum(status_counts.values())
     stats.pending = status_counts.get(TestCaseStatus.PENDING, 0)
     stats.summarized = status_counts.get(TestCaseStatus.SUMMARIZED, 0)
     stats.ai_annotated = status_counts.get(TestCaseStatus.AI_ANNOTATED, 0)
@@ -611,17 +667,6 @@ def compute_feedback_config_stats(
             f"but {stats.total_test_cases} total test cases"
         )
 
-    dual_annotated = [
-        tc
-        for tc in test_cases
-        if (
-            tc.ai_annotation is not None
-            and tc.human_annotation is not None
-            and not tc.ai_annotation.skip
-            and not tc.human_annotation.skip
-        )
-    ]
-
     if not dual_annotated:
         return stats
 
@@ -0,0 +1,51 @@
+"""Atomic writes and advisory file locks for state shared between processes."""
+
+from __future__ import annotations
+
+import os
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory locks, single-process use only
+    fcntl = None
+
+
+def atomic_write_bytes(path: Path, data: bytes) -> None:
+    """Write a file so that concurrent readers see either the old or the new contents.
+
+    The data is written to a hidden temp file in the same directory, unique to the
+    writing thread, flushed to disk and renamed over `path`.
+    """
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+
+@contextmanager
+def file_lock(path: Path) -> Iterator[None]:
+    """Hold an exclusive advisory lock on `path` for the duration of the block.
+
+    Locks are taken on a fresh file descriptor, so they also exclude other threads
+    of the same process; the same lock must not be acquired again while held.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a") as f:
+        if fcntl is None:
+            yield
+            return
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
@@ -0,0 +1,150 @@
+"""Manifest of ingested interactions, for picking up new and changed ones incrementally.
+
+The manifest records, per interaction ID, a content hash of its saved files (or
+shard record) along with their mtime and size. Rescanning only hashes interactions
+whose mtime or size moved, and diffing the hashes against the ones already loaded
+tells which interactions need to be parsed again.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from pathlib import Path
+from typing import Callable
+
+from pydantic import BaseModel, Field, ValidationError
+
+from ._file_utils import atomic_write_bytes
+from ._models import InteractionShardReader
+
+MANIFEST_FILENAME = "manifest.json"
+
+
+class IngestManifestEntry(BaseModel):
+    hash: str
+    mtime_ns: int
+    size: int
+
+
+class IngestDelta(BaseModel):
+    """What changed in the ingested data since it was last loaded."""
+
+    added: list[str] = Field(default_factory=list)
+    changed: list[str] = Field(default_factory=list)
+    removed: list[str] = Field(default_factory=list)
+    # Raw judge inputs that didn't exist before the delta was applied
+    new_step_ids: list[str] = Field(default_factory=list)
+    new_interaction_ids: list[str] = Field(default_factory=list)
+    new_group_ids: list[str] = Field(default_factory=list)
+    # Pending test cases whose raw judge inputs were removed, now marked invalid
+    invalidated_test_case_ids: list[str] = Field(default_factory=list)
+
+    @classmethod
+    def between(
+        cls, loaded: dict[str, str], current: dict[str, IngestManifestEntry]
+    ) -> "IngestDelta":
+        """Diff loaded content hashes against freshly scanned manifest entries."""
+        return cls(
+            added=sorted(id for id in current if id not in loaded),
+            changed=sorted(
+                id
+                for id, entry in current.items()
+                if id in loaded and loaded[id] != entry.hash
+            ),
+            removed=sorted(id for id in loaded if id not in current),
+        )
+
+    def is_empty(self) -> bool:
+        return not (self.added or self.changed or self.removed)
+
+
+class IngestManifest:
+    """Content hashes of the ingested interactions, persisted in ingested_data."""
+
+    def __init__(self, ingested_data_dir: Path):
+        self.path = ingested_data_dir / MANIFEST_FILENAME
+        self.entries: dict[str, IngestManifestEntry] = {}
+        if self.path.exists():
+            try:
+                self.entries = {
+                    interaction_id: IngestManifestEntry.model_validate(entry)
+                    for interaction_id, entry in json.loads(
+                        self.path.read_bytes()
+                    ).items()
+                }
+            except (OSError, ValueError, ValidationError):
+                # Only a cache of hashes; a bad manifest means rehashing
+                self.entries = {}
+
+    def save(self) -> None:
+        atomic_write_bytes(
+            self.path,
+            json.dumps(
+                {
+                    interaction_id: entry.model_dump()
+                    for interaction_id, entry in self.entries.items()
+                },
+                separators=(",", ":"),
+            ).encode(),
+        )
+
+    def _entry(
+        self,
+        interaction_id: str,
+        mtime_ns: int,
+        size: int,
+        read: Callable[[], bytes],
+    ) -> IngestManifestEntry:
+        previous = self.entries.get(interaction_id)
+        if (
+            previous is not None
+            and previous.mtime_ns == mtime_ns
+            and previous.size == size
+        ):
+            return previous
+        return IngestManifestEntry(
+            hash=hashlib.sha256(read()).hexdigest(), mtime_ns=mtime_ns, size=size
+        )
+
+    def scan_interaction_dirs(
+        self, interactions_dir: Path
+    ) -> dict[str, IngestManifestEntry]:
+        """Rescan the interaction directories written by `Interaction.save`."""
+        entries: dict[str, IngestManifestEntry] = {}
+        for interaction_dir in interactions_dir.iterdir():
+            if not interaction_dir.is_dir():
+                continue
+            files = sorted(path for path in interaction_dir.iterdir() if path.is_file())
+            stats = [path.stat() for path in files]
+            entries[interaction_dir.name] = self._entry(
+                interaction_dir.name,
+                max((stat.st_mtime_ns for stat in stats), default=0),
+                sum(stat.st_size for stat in stats),
+                lambda files=files: b"".join(path.read_bytes() for path in files),
+            )
+        self.entries = entries
+        return entries
+
+    def scan_shards(
+        self, reader: InteractionShardReader
+    ) -> dict[str, IngestManifestEntry]:
+        """Rescan the interactions packed in the shards open in `reader`."""
+        shard_mtimes: dict[str, int] = {}
+        entries: dict[str, IngestManifestEntry] = {}
+        for interaction_id in reader.ids():
+            shard_name, _, length = reader.locate(interaction_id)
+            if shard_name not in shard_mtimes:
+                shard_mtimes[shard_name] = (
+                    (reader.shard_dir / shard_name).stat().st_mtime_ns
+                )
+            entries[interaction_id] = self._entry(
+                interaction_id,
+                shard_mtimes[shard_name],
+                length,
+                lambda interaction_id=interaction_id: reader.read_record(
+                    interaction_id
+                ),
+            )
+        self.entries = entries
+        return entries
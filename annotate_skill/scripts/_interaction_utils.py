@@ -1,72 +1,286 @@
 from __future__ import annotations
+import math
+import os
 from collections import defaultdict
-from ._models import InteractionStep, Interaction, InteractionGroup
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from pathlib import Path
+from typing import Any, Callable, Literal, Mapping, Optional
+from ._models import (
+    InteractionStep,
+    Interaction,
+    InteractionGroup,
+    InteractionShardReader,
+)
+from ._step_columns import StepColumns
+from ._step_payloads import strip_payloads
 
+LoadExecutor = Literal["process", "thread"]
+# (interaction ID, loaded interaction or None, error message or None)
+LoadResult = tuple[str, Optional[Interaction], Optional[str]]
 
-def build_interaction_objects(steps: list[InteractionStep]) -> list[Interaction]:
-    grouped_steps: dict[str, list[InteractionStep]] = defaultdict(list)
+# Fewer interactions than this are loaded in-process; a pool isn't worth starting
+MIN_PARALLEL_LOAD = 64
 
-    for step in steps:
-        join_value = step.interaction_id
+# Fields of saved interactions that can't be derived from their steps
+INTERACTION_METADATA_FIELDS = {"name", "description", "tags", "group_id"}
+
+
+def interaction_metadata(interaction: Interaction) -> dict[str, Any]:
+    """The fields of a loaded interaction that building from steps would lose."""
+    return {field: getattr(interaction, field) for field in INTERACTION_METADATA_FIELDS}
+
+
+def build_interaction_objects(
+    steps: list[InteractionStep],
+    columns: Optional[StepColumns] = None,
+    metadata: Optional[Mapping[str, dict[str, Any]]] = None,
+) -> list[Interaction]:
+    """Group steps into interactions by interaction_id.
+
+    Grouping, ordering and the interaction timings are computed from the steps' hot
+    field columns; pass `columns` to reuse ones already extracted from `steps`.
+    `metadata` maps interaction IDs to the `interaction_metadata` of the saved
+    interactions, which supplies their name, description and tags, and their
+    group_id when none of their steps has one.
+    """
+    if columns is None:
+        columns = StepColumns.from_steps(steps, use_arrow=False)
+    interaction_ids = columns.column("interaction_id")
+    start_ns_column = columns.column("start_ns")
+    duration_ns_column = columns.column("duration_ns")
+    group_id_column = columns.column("group_id")
+
+    grouped_rows: dict[str, list[int]] = defaultdict(list)
+    for row, join_value in enumerate(interaction_ids):
         if join_value is not None:
-            grouped_steps[str(join_value)].append(step)
+            grouped_rows[str(join_value)].append(row)
 
     interactions: list[Interaction] = []
-    for interaction_id, interaction_steps in grouped_steps.items():
-        sorted_steps = sorted(
-            interaction_steps, key=lambda s: s.start_ns if s.start_ns else float("inf")
+    for interaction_id, rows in grouped_rows.items():
+        sorted_rows = sorted(
+            rows,
+            key=lambda row: (
+                start_ns_column[row] if start_ns_column[row] else float("inf")
+            ),
         )
 
         start_ns = None
+        valid_starts = [
+            start_ns_column[row] for row in rows if start_ns_column[row] is not None
+        ]
+        if valid_starts:
+            start_ns = min(valid_starts)
+
         duration_ns = None
-        if sorted_steps:
-            valid_starts = [s.start_ns for s in sorted_steps if s.start_ns is not None]
-            if valid_starts:
-                start_ns = min(valid_starts)
-
-            valid_durations = [
-                s.duration_ns for s in sorted_steps if s.duration_ns is not None
-            ]
-            if valid_durations:
-                duration_ns = sum(valid_durations)
-
-        group_id = None
-        for step in interaction_steps:
-            if step.group_id is not None:
-                group_id = step.group_id
-                break
+        valid_durations = [
+            duration_ns_column[row]
+            for row in rows
+            if duration_ns_column[row] is not None
+        ]
+        if valid_durations:
+            duration_ns = sum(valid_durations)
+
+        saved = metadata.get(interaction_id, {}) if metadata else {}
+        group_id = next(
+            (group_id_column[row] for row in rows if group_id_column[row] is not None),
+            saved.get("group_id"),
+        )
 
         interactions.append(
             Interaction(
                 id=interaction_id,
-                steps=sorted_steps,
+                steps=[steps[row] for row in sorted_rows],
                 start_ns=start_ns,
                 duration_ns=duration_ns,
                 group_id=group_id,
+                name=saved.get("name"),
+                description=saved.get("description"),
+                tags=saved.get("tags") or {},
             )
         )
     return interactions
 
 
-def build_interaction_groups(
-    steps: list[InteractionStep],
-) -> list[InteractionGroup]:
-    interactions = build_interaction_objects(steps)
+def interaction_group_id(interaction: Interaction) -> str:
+    """The ID of the group an interaction belongs to."""
+    return (
+        str(interaction.group_id)
+        if interaction.group_id is not None
+        else "default_group"
+    )
+
 
+def group_interactions(interactions: list[Interaction]) -> list[InteractionGroup]:
+    """Group interactions by group_id, in order of first appearance."""
     groups_dict: dict[str, list[Interaction]] = defaultdict(list)
     for interaction in interactions:
-        group_key = (
-            str(interaction.group_id)
-            if interaction.group_id is not None
-            else "default_group"
-        )
-        groups_dict[group_key].append(interaction)
+        groups_dict[interaction_group_id(interaction)].append(interaction)
 
     groups: list[InteractionGroup] = []
-    for group_id, group_interactions in groups_dict.items():
+    for group_id, grouped in groups_dict.items():
         groups.append(
-            InteractionGroup(
-                joined_on="group_id", id=group_id, interactions=group_interactions
-            )
+            InteractionGroup(joined_on="group_id", id=group_id, interactions=grouped)
         )
     return groups
+
+
+def build_interaction_graph(
+    steps: list[InteractionStep],
+    columns: Optional[StepColumns] = None,
+    metadata: Optional[Mapping[str, dict[str, Any]]] = None,
+) -> tuple[list[Interaction], list[InteractionGroup]]:
+    """Build the interactions of `steps` and the groups of those interactions.
+
+    Each step is grouped once, and the groups hold the same Interaction objects
+    that are returned, so steps, interactions and groups form a single graph.
+    See `build_interaction_objects` for the arguments.
+    """
+    interactions = build_interaction_objects(steps, columns, metadata)
+    return interactions, group_interactions(interactions)
+
+
+def build_interaction_groups(
+    steps: list[InteractionStep],
+    columns: Optional[StepColumns] = None,
+    metadata: Optional[Mapping[str, dict[str, Any]]] = None,
+) -> list[InteractionGroup]:
+    return build_interaction_graph(steps, columns, metadata)[1]
+
+
+def _load_interaction_dir_chunk(
+    paths: list[str], skeleton: bool = False
+) -> list[LoadResult]:
+    results: list[LoadResult] = []
+    for path in paths:
+        interaction_id = Path(path).name
+        try:
+            interaction = Interaction.load(path)
+        except Exception as e:
+            results.append((interaction_id, None, str(e)))
+            continue
+        if skeleton:
+            strip_payloads(interaction)
+        results.append((interaction_id, interaction, None))
+    return results
+
+
+# Each worker process of a sharded load maps the shards once
+_worker_shard_reader: Optional[InteractionShardReader] = None
+
+
+def _open_worker_shard_reader(shard_dir: str) -> None:
+    global _worker_shard_reader
+    _worker_shard_reader = InteractionShardReader(shard_dir)
+
+
+def _load_shard_chunk(
+    interaction_ids: list[str],
+    reader: Optional[InteractionShardReader] = None,
+    skeleton: bool = False,
+) -> list[LoadResult]:
+    reader = reader or _worker_shard_reader
+    results: list[LoadResult] = []
+    for interaction_id in interaction_ids:
+        try:
+            interaction = reader.load(interaction_id)
+        except Exception as e:
+            results.append((interaction_id, None, str(e)))
+            continue
+        if skeleton:
+            strip_payloads(interaction)
+        results.append((interaction_id, interaction, None))
+    return results
+
+
+def _load_workers(workers: Optional[int], num_interactions: int) -> int:
+    if num_interactions < MIN_PARALLEL_LOAD:
+        return 1
+    return workers or os.cpu_count() or 1
+
+
+def _map_chunks(
+    load_chunk: Callable[[list[Any]], list[LoadResult]],
+    items: list[Any],
+    workers: int,
+    executor: LoadExecutor,
+    initializer: Optional[Callable[..., None]] = None,
+    initargs: tuple = (),
+) -> list[LoadResult]:
+    # A few chunks per worker keeps workers busy when interaction sizes vary
+    chunk_size = math.ceil(len(items) / (workers * 4))
+    chunks = [items[i : i + chunk_size] for i in range(0, len(items), chunk_size)]
+    pool: Executor
+    if executor == "process":
+        pool = ProcessPoolExecutor(workers, initializer=initializer, initargs=initargs)
+    else:
+        pool = ThreadPoolExecutor(workers, initializer=initializer, initargs=initargs)
+    with pool:
+        # map yields chunk results in submission order, whichever finishes first
+        return [result for chunk in pool.map(load_chunk, chunks) for result in chunk]
+
+
+def load_interaction_dirs(
+    interaction_dirs: list[Path],
+    workers: Optional[int] = None,
+    executor: LoadExecutor = "thread",
+    skeleton: bool = False,
+) -> list[LoadResult]:
+    """Load interaction directories in parallel, in sorted interaction ID order.
+
+    Args:
+        interaction_dirs: Directories written by `Interaction.save`
+        workers: Number of workers; defaults to the CPU count, 1 loads in-process
+        executor: "thread" to overlap file reads and decompression, or "process"
+            to also parse and validate in worker processes. Interactions loaded
+            by processes are pickled back, which costs about as much as validating
+            them, so processes only pay off when reading dominates
+        skeleton: Drop the steps' payload fields as soon as each interaction is
+            loaded (see `_step_payloads`)
+
+    Returns:
+        One (interaction ID, interaction, error) tuple per directory, with either
+        the interaction or the error that prevented loading it
+    """
+    paths = sorted(
+        (str(interaction_dir) for interaction_dir in interaction_dirs),
+        key=lambda path: Path(path).name,
+    )
+    load_chunk = partial(_load_interaction_dir_chunk, skeleton=skeleton)
+    workers = _load_workers(workers, len(paths))
+    if workers <= 1:
+        return load_chunk(paths)
+    return _map_chunks(load_chunk, paths, workers, executor)
+
+
+def load_sharded_interactions(
+    shard_dir: Path,
+    workers: Optional[int] = None,
+    executor: LoadExecutor = "thread",
+    skeleton: bool = False,
+    interaction_ids: Optional[list[str]] = None,
+) -> list[LoadResult]:
+    """Load interactions packed in `shard_dir` in parallel, in sorted ID order.
+
+    Loads all packed interactions, or only `interaction_ids` if given. See
+    `load_interaction_dirs` for the other arguments and the results.
+    """
+    with InteractionShardReader(str(shard_dir)) as reader:
+        interaction_ids = sorted(
+            reader.ids() if interaction_ids is None else interaction_ids
+        )
+        workers = _load_workers(workers, len(interaction_ids))
+        if executor == "process" and workers > 1:
+            return _map_chunks(
+                partial(_load_shard_chunk, skeleton=skeleton),
+                interaction_ids,
+                workers,
+                executor,
+                initializer=_open_worker_shard_reader,
+                initargs=(str(shard_dir),),
+            )
+        # Threads share this process's mappings
+        load_chunk = partial(_load_shard_chunk, reader=reader, skeleton=skeleton)
+        if workers <= 1:
+            return load_chunk(interaction_ids)
+        return _map_chunks(load_chunk, interaction_ids, workers, executor)
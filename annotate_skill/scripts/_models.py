@@ -1,14 +1,248 @@
 import hashlib
+import importlib
 import json
+import mmap
+import os
 import re
+import threading
+import time
 import uuid
+import zlib
+from collections import OrderedDict
+from contextlib import ExitStack
 from datetime import datetime, timezone
 from enum import Enum
-from typing import Any, Literal, Optional, Union
-from pydantic import BaseModel, Field, model_validator
+from types import TracebackType
+from typing import (
+    Annotated,
+    Any,
+    Callable,
+    ClassVar,
+    Iterator,
+    Literal,
+    Optional,
+    Union,
+)
+
+from pydantic import (
+    BaseModel,
+    Discriminator,
+    Field,
+    PrivateAttr,
+    Tag,
+    ValidationInfo,
+    model_validator,
+)
 import ast
 from pathlib import Path
 
+# Stamped into files written by this version of the models. Data carrying the
+# current stamp can be loaded in trusted mode, which skips the model validators.
+SCHEMA_VERSION = 1
+
+
+def trusted_context(data: Any, trusted: bool = True) -> Optional[dict[str, Any]]:
+    """Validation context that skips model validators for data stamped with the current SCHEMA_VERSION."""
+    if (
+        trusted
+        and isinstance(data, dict)
+        and data.get("schema_version") == SCHEMA_VERSION
+    ):
+        return {"trusted": True}
+    return None
+
+
+def _is_trusted(info: ValidationInfo) -> bool:
+    return bool(info.context and info.context.get("trusted"))
+
+
+# On-disk serialization formats: "json" is indented JSON (the original format),
+# "compact" is JSON without whitespace, "msgpack" needs `pip install msgpack` and
+# "zstd" (zstd-compressed compact JSON) needs `pip install zstandard`. Readers
+# detect the format from the file contents, so any format can always be loaded.
+SerializationFormat = Literal["json", "compact", "msgpack", "zstd"]
+SERIALIZATION_EXTENSIONS: dict[str, str] = {
+    "json": ".json",
+    "compact": ".json",
+    "msgpack": ".msgpack",
+    "zstd": ".json.zst",
+}
+_ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+
+def _import_optional(module: str, format: str) -> Any:
+    try:
+        return importlib.import_module(module)
+    except ImportError as e:
+        raise ImportError(
+            f"The '{format}' serialization format requires {module}: pip install {module}"
+        ) from e
+
+
+def detect_format(raw: bytes) -> SerializationFormat:
+    """Detect the serialization format of serialized bytes from their header."""
+    if raw.startswith(_ZSTD_MAGIC):
+        return "zstd"
+    stripped = raw.lstrip()
+    if not stripped or stripped[:1] in (b"{", b"["):
+        return "json"
+    return "msgpack"
+
+
+def dump_bytes(data: Any, format: SerializationFormat = "json") -> bytes:
+    """Serialize JSON-compatible data in the given format."""
+    if format == "json":
+        return json.dumps(data, indent=2, default=str).encode()
+    if format == "msgpack":
+        return _import_optional("msgpack", format).packb(data, default=str)
+    compact = json.dumps(data, separators=(",", ":"), default=str).encode()
+    if format == "compact":
+        return compact
+    if format == "zstd":
+        return _import_optional("zstandard", format).ZstdCompressor().compress(compact)
+    raise ValueError(f"Unknown serialization format: {format}")
+
+
+def load_bytes(raw: bytes) -> Any:
+    """Deserialize bytes written by `dump_bytes` in any format."""
+    format = detect_format(raw)
+    if format == "zstd":
+        return json.loads(
+            _import_optional("zstandard", format).ZstdDecompressor().decompress(raw)
+        )
+    if format == "msgpack":
+        return _import_optional("msgpack", format).unpackb(raw)
+    return json.loads(raw)
+
+
+# Interaction file names for each serialization format, in lookup order
+_METADATA_EXTENSIONS = [".json", ".msgpack", ".json.zst"]
+_STEPS_EXTENSIONS = [".jsonl", ".msgpack", ".jsonl.zst"]
+
+
+def _first_existing(directory: Path, stem: str, extensions: list[str]) -> Path:
+    for extension in extensions:
+        candidate = directory / f"{stem}{extension}"
+        if candidate.exists():
+            return candidate
+    raise FileNotFoundError(f"No {stem} file found in {directory}")
+
+
+BLOB_REF_KEY = "$blob"
+BLOBS_DIRNAME = "blobs"
+# Step fields whose large strings are moved to the blob store
+_BLOB_FIELDS = ("input_data", "output_data", "raw", "input_messages", "output_messages")
+
+
+class BlobStore:
+    """
+    Content-addressed store for large strings in step payloads.
+
+    {blob_dir}/
+      └── {hash[:2]}/{hash}  (zlib-compressed UTF-8, hash = sha256 of the string)
+
+    Strings of at least `min_size` characters are written once and replaced with
+    {"$blob": hash} references, so prompts repeated across steps and values that
+    `raw` duplicates from `input_data`/`output_data` take up space only once.
+    Resolved strings are cached, so steps sharing a blob also share it in memory.
+    """
+
+    CACHE_SIZE = 4096
+    # Shared by every thread of the process, e.g. parallel interaction loaders
+    _open_stores: ClassVar[dict[str, "BlobStore"]] = {}
+    _open_stores_lock: ClassVar[threading.Lock] = threading.Lock()
+
+    def __init__(self, blob_dir: str, min_size: int = 1024):
+        self.blob_dir = Path(blob_dir)
+        self.min_size = min_size
+        self._written: set[str] = set()
+        self._cache: OrderedDict[str, str] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def open(cls, blob_dir: str) -> "BlobStore":
+        """A store shared by all readers of `blob_dir` in this process."""
+        key = os.path.abspath(blob_dir)
+        with cls._open_stores_lock:
+            if key not in cls._open_stores:
+                cls._open_stores[key] = cls(key)
+            return cls._open_stores[key]
+
+    def _path(self, blob_hash: str) -> Path:
+        return self.blob_dir / blob_hash[:2] / blob_hash
+
+    def put(self, value: str) -> str:
+        """Store a string and return its hash."""
+        data = value.encode()
+        blob_hash = hashlib.sha256(data).hexdigest()
+        if blob_hash in self._written:
+            return blob_hash
+        path = self._path(blob_hash)
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_name(
+                f".{blob_hash}.{os.getpid()}.{threading.get_ident()}.tmp"
+            )
+            tmp_path.write_bytes(zlib.compress(data))
+            os.replace(tmp_path, path)
+        self._written.add(blob_hash)
+        return blob_hash
+
+    def get(self, blob_hash: str) -> str:
+        """The string stored under a hash."""
+        with self._lock:
+            value = self._cache.get(blob_hash)
+            if value is not None:
+                self._cache.move_to_end(blob_hash)
+                return value
+        value = zlib.decompress(self._path(blob_hash).read_bytes()).decode()
+        with self._lock:
+            self._cache[blob_hash] = value
+            while len(self._cache) > self.CACHE_SIZE:
+                self._cache.popitem(last=False)
+        return value
+
+    def externalize(self, value: Any) -> Any:
+        """Replace large strings anywhere in a JSON-compatible value with references."""
+        if isinstance(value, str):
+            if len(value) >= self.min_size:
+                return {BLOB_REF_KEY: self.put(value)}
+            return value
+        if isinstance(value, dict):
+            return {key: self.externalize(item) for key, item in value.items()}
+        if isinstance(value, list):
+            return [self.externalize(item) for item in value]
+        return value
+
+    def resolve(self, value: Any) -> Any:
+        """Replace blob references anywhere in a JSON-compatible value with their strings."""
+        if isinstance(value, dict):
+            if len(value) == 1 and BLOB_REF_KEY in value:
+                return self.get(value[BLOB_REF_KEY])
+            return {key: self.resolve(item) for key, item in value.items()}
+        if isinstance(value, list):
+            return [self.resolve(item) for item in value]
+        return value
+
+    def externalize_step(self, step_data: dict[str, Any]) -> dict[str, Any]:
+        """Move the large strings of a dumped step's payload fields to the store."""
+        for field in _BLOB_FIELDS:
+            if step_data.get(field) is not None:
+                step_data[field] = self.externalize(step_data[field])
+        return step_data
+
+    def resolve_step(self, step_data: dict[str, Any]) -> dict[str, Any]:
+        """Resolve the blob references in a dumped step's payload fields."""
+        for field in _BLOB_FIELDS:
+            if step_data.get(field) is not None:
+                step_data[field] = self.resolve(step_data[field])
+        return step_data
+
+
+def _blob_dir_reference(blob_store: BlobStore, directory: Path) -> str:
+    # Stored relative to the data referencing it, so the directory can be moved
+    return os.path.relpath(blob_store.blob_dir.resolve(), directory.resolve())
+
 
 def _extract_fstring_variables(fstring: str) -> list[str]:
     """Extract variable names from an f-string template."""
@@ -91,6 +325,96 @@ class InteractionStep(BaseModel):
     provider: Optional[str] = None
 
 
+class SpanTree(BaseModel):
+    """The step hierarchy of an interaction, built from `parent_step_id` links.
+
+    Steps whose parent isn't in the interaction are roots, and siblings are ordered
+    by start time. All fields are keyed by step ID.
+    """
+
+    roots: list[str] = Field(default_factory=list)
+    children: dict[str, list[str]] = Field(default_factory=dict)
+    depth: dict[str, int] = Field(default_factory=dict)
+    order: list[str] = Field(
+        default_factory=list, description="Step IDs in depth-first (pre-)order"
+    )
+    subtree_duration_ns: dict[str, int] = Field(
+        default_factory=dict,
+        description="Time from the earliest start to the latest end in each step's subtree",
+    )
+    critical_path: list[str] = Field(
+        default_factory=list,
+        description="From the longest root down through the longest child subtree at each level",
+    )
+
+    @classmethod
+    def from_steps(cls, steps: list[InteractionStep]) -> "SpanTree":
+        steps_by_id: dict[str, InteractionStep] = {}
+        for step in steps:
+            steps_by_id.setdefault(step.id, step)
+        # Python's sort is stable, so steps without a start keep their order, last
+        ordered = sorted(
+            steps_by_id.values(),
+            key=lambda step: (step.start_ns is None, step.start_ns or 0),
+        )
+
+        tree = cls(children={step.id: [] for step in ordered})
+        for step in ordered:
+            parent_id = step.parent_step_id
+            if parent_id in steps_by_id and parent_id != step.id:
+                tree.children[parent_id].append(step.id)
+            else:
+                tree.roots.append(step.id)
+
+        def visit(root_id: str) -> None:
+            stack = [(root_id, 0)]
+            while stack:
+                step_id, depth = stack.pop()
+                if step_id in tree.depth:
+                    continue
+                tree.depth[step_id] = depth
+                tree.order.append(step_id)
+                stack.extend(
+                    (child_id, depth + 1)
+                    for child_id in reversed(tree.children[step_id])
+                )
+
+        for root_id in tree.roots:
+            visit(root_id)
+        # Steps in a parent_step_id cycle aren't reachable from any root; the
+        # cycle is cut above its earliest step, which becomes a root
+        for step in ordered:
+            if step.id not in tree.depth:
+                tree.children[step.parent_step_id].remove(step.id)
+                tree.roots.append(step.id)
+                visit(step.id)
+
+        # Children come after their parent in pre-order, so in reverse every
+        # subtree is complete before its root is reached
+        extents: dict[str, tuple[Optional[int], Optional[int]]] = {}
+        for step_id in reversed(tree.order):
+            step = steps_by_id[step_id]
+            start = end = None
+            if step.start_ns is not None and step.duration_ns is not None:
+                start, end = step.start_ns, step.start_ns + step.duration_ns
+            for child_id in tree.children[step_id]:
+                child_start, child_end = extents[child_id]
+                if child_start is not None:
+                    start = child_start if start is None else min(start, child_start)
+                    end = child_end if end is None else max(end, child_end)
+            extents[step_id] = (start, end)
+            tree.subtree_duration_ns[step_id] = max(
+                step.duration_ns or 0, end - start if start is not None else 0
+            )
+
+        candidates = tree.roots
+        while candidates:
+            step_id = max(candidates, key=tree.subtree_duration_ns.__getitem__)
+            tree.critical_path.append(step_id)
+            candidates = tree.children[step_id]
+        return tree
+
+
 class Interaction(BaseModel):
     """A complete interaction composed of multiple steps (e.g., a trace, request/response pair)."""
 
@@ -114,47 +438,419 @@ class Interaction(BaseModel):
         default_factory=dict,
         description="Flexible key-value storage for additional metadata",
     )
+    _span_tree: Optional[SpanTree] = PrivateAttr(default=None)
+
+    def span_tree(self) -> SpanTree:
+        """The step hierarchy of this interaction, computed on first use.
 
-    def save(self, path: str) -> None:
+        The tree is cached on the interaction, so it doesn't reflect steps that
+        are added or re-parented afterwards.
+        """
+        if self._span_tree is None:
+            self._span_tree = SpanTree.from_steps(self.steps)
+        return self._span_tree
+
+    def save(
+        self,
+        path: str,
+        format: SerializationFormat = "json",
+        blob_store: Optional[BlobStore] = None,
+    ) -> None:
         """
         {interaction_id}/
           ├── metadata.json  (all fields except steps)
           └── steps.jsonl    (one InteractionStep per line)
+
+        With `format="msgpack"` these are metadata.msgpack and steps.msgpack (a stream
+        of msgpack objects), with `format="zstd"` metadata.json.zst and steps.jsonl.zst.
+        Files left over from saving in another format are removed.
+
+        With a `blob_store`, large strings in step payloads are saved to it and the
+        steps hold references, which `load` resolves.
         """
 
         interaction_dir = Path(path)
         interaction_dir.mkdir(parents=True, exist_ok=True)
+        for extension in _METADATA_EXTENSIONS:
+            (interaction_dir / f"metadata{extension}").unlink(missing_ok=True)
+        for extension in _STEPS_EXTENSIONS:
+            (interaction_dir / f"steps{extension}").unlink(missing_ok=True)
 
         metadata = self.model_dump(exclude={"steps"}, mode="json")
-        with open(interaction_dir / "metadata.json", "w") as f:
-            json.dump(metadata, f, indent=2)
+        metadata["schema_version"] = SCHEMA_VERSION
+        step_records = None
+        if blob_store is not None:
+            metadata["blob_dir"] = _blob_dir_reference(blob_store, interaction_dir)
+            step_records = [
+                blob_store.externalize_step(step.model_dump(mode="json"))
+                for step in self.steps
+            ]
+        (interaction_dir / f"metadata{SERIALIZATION_EXTENSIONS[format]}").write_bytes(
+            dump_bytes(metadata, format)
+        )
+
+        if format == "msgpack":
+            if step_records is None:
+                step_records = [step.model_dump(mode="json") for step in self.steps]
+            packer = _import_optional("msgpack", format).Packer(default=str)
+            (interaction_dir / "steps.msgpack").write_bytes(
+                b"".join(packer.pack(record) for record in step_records)
+            )
+            return
+
+        if format == "json":
+            lines = [
+                json.dumps(record)
+                for record in (
+                    step_records
+                    if step_records is not None
+                    else [step.model_dump(mode="json") for step in self.steps]
+                )
+            ]
+        elif step_records is not None:
+            lines = [
+                json.dumps(record, separators=(",", ":")) for record in step_records
+            ]
+        else:
+            lines = [step.model_dump_json() for step in self.steps]
+        steps_jsonl = "".join(line + "\n" for line in lines).encode()
+        if format == "zstd":
+            (interaction_dir / "steps.jsonl.zst").write_bytes(
+                _import_optional("zstandard", format)
+                .ZstdCompressor()
+                .compress(steps_jsonl)
+            )
+        else:
+            (interaction_dir / "steps.jsonl").write_bytes(steps_jsonl)
+
+    @classmethod
+    def load_metadata(cls, path: str) -> dict[str, Any]:
+        """Read the raw interaction metadata, in whichever format it was saved."""
+        metadata_file = _first_existing(Path(path), "metadata", _METADATA_EXTENSIONS)
+        return load_bytes(metadata_file.read_bytes())
+
+    @classmethod
+    def iter_step_records(cls, path: str) -> Iterator[Union[bytes, dict[str, Any]]]:
+        """Yield each raw step: a JSON line as bytes, or a decoded msgpack dict."""
+        steps_file = _first_existing(Path(path), "steps", _STEPS_EXTENSIONS)
+        if steps_file.suffix == ".msgpack":
+            msgpack = _import_optional("msgpack", "msgpack")
+            with open(steps_file, "rb") as f:
+                yield from msgpack.Unpacker(f)
+            return
+        raw = steps_file.read_bytes()
+        if steps_file.suffix == ".zst":
+            raw = (
+                _import_optional("zstandard", "zstd").ZstdDecompressor().decompress(raw)
+            )
+        for line in raw.splitlines():
+            if line.strip():
+                yield line
 
-        with open(interaction_dir / "steps.jsonl", "w") as f:
-            for step in self.steps:
-                f.write(json.dumps(step.model_dump(mode="json")) + "\n")
+    @classmethod
+    def blob_store_for(cls, path: str, metadata: dict[str, Any]) -> Optional[BlobStore]:
+        """The blob store that the steps of a saved interaction reference, if any."""
+        if not metadata.get("blob_dir"):
+            return None
+        return BlobStore.open(str(Path(path) / metadata["blob_dir"]))
 
     @classmethod
     def load(cls, path: str) -> "Interaction":
         """
         Load interaction from filesystem directory structure.
-        Reads metadata.json and steps.jsonl.
+        Reads metadata.json and steps.jsonl, or their msgpack/zstd variants, and
+        resolves references to the blob store.
         """
-        from pathlib import Path
-        import json
+        metadata = cls.load_metadata(path)
+
+        blob_store = cls.blob_store_for(path, metadata)
+        if blob_store is not None:
+            steps = [
+                InteractionStep.model_validate(
+                    blob_store.resolve_step(
+                        record if isinstance(record, dict) else json.loads(record)
+                    )
+                )
+                for record in cls.iter_step_records(path)
+            ]
+            return cls.model_validate({**metadata, "steps": steps})
+
+        # Validate JSON lines' raw bytes directly with pydantic-core
+        steps = [
+            (
+                InteractionStep.model_validate(record)
+                if isinstance(record, dict)
+                else InteractionStep.model_validate_json(record)
+            )
+            for record in cls.iter_step_records(path)
+        ]
 
-        interaction_dir = Path(path)
+        return cls.model_validate({**metadata, "steps": steps})
 
-        with open(interaction_dir / "metadata.json", "r") as f:
-            metadata = json.load(f)
+    def save_to_shard(self, writer: "InteractionShardWriter") -> None:
+        """Append this interaction to a packed shard; the shard counterpart of `save`."""
+        writer.write(self)
+
+    @classmethod
+    def load_from_shard(
+        cls, reader: "InteractionShardReader", interaction_id: str
+    ) -> "Interaction":
+        """Load one interaction from packed shards; the shard counterpart of `load`."""
+        return reader.load(interaction_id)
 
-        # Load steps
-        steps = []
-        with open(interaction_dir / "steps.jsonl", "r") as f:
+
+SHARD_INDEX_FILENAME = "index.jsonl"
+_SHARD_FILE_PATTERN = "shard_*"
+
+
+class InteractionShardWriter:
+    """
+    Packs interactions into a few large shard files plus an offset index.
+
+    {shard_dir}/
+      ├── shard_00000.jsonl  (one interaction per line, steps included)
+      ├── shard_00001.jsonl
+      └── index.jsonl        (interaction ID -> shard file, byte offset, length)
+
+    With `format="msgpack"` or `format="zstd"` records are binary, the shards are
+    named shard_NNNNN.bin and records can only be located through the index.
+    A new shard is started once the current one reaches `max_shard_bytes`.
+    Shards previously written to `shard_dir` are replaced, unless `append=True`:
+    then the interactions already indexed are kept (see `written_ids`) and new
+    ones go to new shards, e.g. to resume packing after a crash.
+
+    With a `blob_store`, large strings in step payloads are saved to it, and the
+    first line of the index records where the store is.
+
+    `write` may be called from several threads.
+    """
+
+    def __init__(
+        self,
+        shard_dir: str,
+        format: SerializationFormat = "compact",
+        max_shard_bytes: int = 256 * 1024 * 1024,
+        blob_store: Optional[BlobStore] = None,
+        append: bool = False,
+    ):
+        self.shard_dir = Path(shard_dir)
+        self.shard_dir.mkdir(parents=True, exist_ok=True)
+        # One record per line, so indented JSON is written compact
+        self.format: SerializationFormat = "compact" if format == "json" else format
+        self.max_shard_bytes = max_shard_bytes
+        self._shard_count = 0
+        self._shard_name: Optional[str] = None
+        self._shard_file: Optional[Any] = None
+        # Close the index file on close() and the shard file once the next
+        # shard is started
+        self._index_files = ExitStack()
+        self._shard_files = ExitStack()
+        self._shard_size = 0
+        self._lock = threading.Lock()
+        self.blob_store = blob_store
+        self.written_ids: set[str] = set()
+
+        header: Optional[dict[str, str]] = None
+        if blob_store is not None:
+            header = {"blob_dir": _blob_dir_reference(blob_store, self.shard_dir)}
+        index_lines: list[str] = []
+        index_path = self.shard_dir / SHARD_INDEX_FILENAME
+        if append and index_path.exists():
+            recovered_header, index_lines = self._recover_index(index_path)
+            header = header or recovered_header
+        else:
+            for stale_file in self.shard_dir.glob(_SHARD_FILE_PATTERN):
+                stale_file.unlink()
+        if header is not None:
+            index_lines.insert(0, json.dumps(header))
+        with ExitStack() as index_files:
+            self._index_file = index_files.enter_context(open(index_path, "w"))
+            for line in index_lines:
+                self._index_file.write(line + "\n")
+            self._index_files = index_files.pop_all()
+
+    def _recover_index(
+        self, index_path: Path
+    ) -> tuple[Optional[dict[str, str]], list[str]]:
+        """Keep the index header and the lines of records that made it to disk in full."""
+        shard_sizes = {
+            shard.name: shard.stat().st_size
+            for shard in self.shard_dir.glob(_SHARD_FILE_PATTERN)
+        }
+        header = None
+        lines = []
+        with open(index_path, "rb") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # Torn last line of an interrupted run
+                    continue
+                if "blob_dir" in entry:
+                    header = entry
+                    continue
+                if entry["offset"] + entry["length"] > shard_sizes.get(
+                    entry["shard"], -1
+                ):
+                    continue
+                lines.append(json.dumps(entry))
+                self.written_ids.add(entry["id"])
+        # Existing shards are left as they are; records are added to new ones
+        self._shard_count = 1 + max(
+            (int(name[len("shard_") :].split(".")[0]) for name in shard_sizes),
+            default=-1,
+        )
+        return header, lines
+
+    def _start_shard(self) -> None:
+        self._shard_files.close()
+        extension = ".jsonl" if self.format == "compact" else ".bin"
+        self._shard_name = f"shard_{self._shard_count:05d}{extension}"
+        with ExitStack() as shard_files:
+            self._shard_file = shard_files.enter_context(
+                open(self.shard_dir / self._shard_name, "wb")
+            )
+            self._shard_files = shard_files.pop_all()
+        self._shard_count += 1
+        self._shard_size = 0
+
+    def write(self, interaction: Interaction) -> None:
+        """Append an interaction to the current shard and record its offset."""
+        data = interaction.model_dump(mode="json")
+        data["schema_version"] = SCHEMA_VERSION
+        if self.blob_store is not None:
+            data["steps"] = [
+                self.blob_store.externalize_step(step) for step in data["steps"]
+            ]
+        record = dump_bytes(data, self.format)
+        if self.format == "compact":
+            record += b"\n"
+        with self._lock:
+            if self._shard_file is None or (
+                self._shard_size
+                and self._shard_size + len(record) > self.max_shard_bytes
+            ):
+                self._start_shard()
+            self._shard_file.write(record)
+            entry = {
+                "id": interaction.id,
+                "shard": self._shard_name,
+                "offset": self._shard_size,
+                "length": len(record),
+            }
+            self._index_file.write(json.dumps(entry) + "\n")
+            self._shard_size += len(record)
+            self.written_ids.add(interaction.id)
+
+    def close(self) -> None:
+        self._shard_file = None
+        self._shard_files.close()
+        self._index_files.close()
+
+    def __enter__(self) -> "InteractionShardWriter":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[type[BaseException]],
+        exc_value: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        self.close()
+
+
+class InteractionShardReader:
+    """
+    Random access to interactions packed by `InteractionShardWriter`.
+
+    Shards are memory-mapped on first use, so loading a single interaction is one
+    slice of a mapping at the offset recorded in the index.
+    """
+
+    def __init__(self, shard_dir: str):
+        self.shard_dir = Path(shard_dir)
+        self._index: dict[str, tuple[str, int, int]] = {}
+        self.blob_store: Optional[BlobStore] = None
+        with open(self.shard_dir / SHARD_INDEX_FILENAME, "rb") as f:
             for line in f:
                 if line.strip():
-                    steps.append(InteractionStep(**json.loads(line)))
+                    entry = json.loads(line)
+                    if "blob_dir" in entry:
+                        self.blob_store = BlobStore.open(
+                            str(self.shard_dir / entry["blob_dir"])
+                        )
+                        continue
+                    self._index[entry["id"]] = (
+                        entry["shard"],
+                        entry["offset"],
+                        entry["length"],
+                    )
+        self._mmaps: dict[str, mmap.mmap] = {}
+
+    @classmethod
+    def exists(cls, shard_dir: str) -> bool:
+        """Whether `shard_dir` contains packed shards."""
+        return (Path(shard_dir) / SHARD_INDEX_FILENAME).exists()
+
+    def __len__(self) -> int:
+        return len(self._index)
 
-        return cls(**metadata, steps=steps)
+    def __contains__(self, interaction_id: str) -> bool:
+        return interaction_id in self._index
+
+    def ids(self) -> list[str]:
+        """Interaction IDs in on-disk order, for sequential reads."""
+        return sorted(self._index, key=lambda id: self._index[id][:2])
+
+    def locate(self, interaction_id: str) -> tuple[str, int, int]:
+        """The (shard file name, offset, length) of an interaction's record."""
+        return self._index[interaction_id]
+
+    def _mmap(self, shard_name: str) -> mmap.mmap:
+        if shard_name not in self._mmaps:
+            with open(self.shard_dir / shard_name, "rb") as f:
+                self._mmaps[shard_name] = mmap.mmap(
+                    f.fileno(), 0, access=mmap.ACCESS_READ
+                )
+        return self._mmaps[shard_name]
+
+    def read_record(self, interaction_id: str) -> bytes:
+        """The raw serialized record of an interaction."""
+        shard_name, offset, length = self._index[interaction_id]
+        return self._mmap(shard_name)[offset : offset + length]
+
+    def load(self, interaction_id: str) -> Interaction:
+        """Load a single interaction by ID."""
+        record = self.read_record(interaction_id)
+        if self.blob_store is not None:
+            data = load_bytes(record)
+            data["steps"] = [
+                self.blob_store.resolve_step(step) for step in data["steps"]
+            ]
+            return Interaction.model_validate(data)
+        if detect_format(record) == "json":
+            return Interaction.model_validate_json(record)
+        return Interaction.model_validate(load_bytes(record))
+
+    def __iter__(self) -> Iterator[Interaction]:
+        for interaction_id in self.ids():
+            yield self.load(interaction_id)
+
+    def close(self) -> None:
+        for shard_mmap in self._mmaps.values():
+            shard_mmap.close()
+        self._mmaps = {}
+
+    def __enter__(self) -> "InteractionShardReader":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[type[BaseException]],
+        exc_value: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        self.close()
 
 
 class InteractionGroup(BaseModel):
@@ -201,19 +897,22 @@ class AttributeMatcher(BaseModel):
         """Check if the object matches this criteria."""
         try:
             value = self._get_nested_value(obj, self.attribute_path)
-
-            if self.contains_str is not None:
-                return self.contains_str in str(value)
-            elif self.matches_regex is not None:
-                return bool(re.search(self.matches_regex, str(value)))
-            elif self.equals_value is not None:
-                return value == self.equals_value
-            else:
-                return False
+            return self.matches_value(value)
 
         except (KeyError, IndexError, TypeError, AttributeError):
             return False
 
+    def matches_value(self, value: Any) -> bool:
+        """Check if an attribute value, already resolved from `attribute_path`, matches this criteria."""
+        if self.contains_str is not None:
+            return self.contains_str in str(value)
+        elif self.matches_regex is not None:
+            return bool(re.search(self.matches_regex, str(value)))
+        elif self.equals_value is not None:
+            return value == self.equals_value
+        else:
+            return False
+
     def _get_nested_value(
         self, obj: InteractionStep | Interaction | InteractionGroup, path: str
     ) -> Any:
@@ -237,6 +936,65 @@ class AttributeMatcher(BaseModel):
         return current
 
 
+def raw_input_start_ns(
+    obj: InteractionStep | Interaction | InteractionGroup,
+) -> Optional[int]:
+    """When a raw judge input started; for a group, its earliest interaction."""
+    if isinstance(obj, InteractionGroup):
+        return min(
+            (
+                interaction.start_ns
+                for interaction in obj.interactions
+                if interaction.start_ns is not None
+            ),
+            default=None,
+        )
+    return obj.start_ns
+
+
+class TimeRangeMatcher(BaseModel):
+    """Time window filtering on when InteractionStep/Interaction/InteractionGroup objects started."""
+
+    start_ns: Optional[int] = Field(
+        default=None,
+        description="Earliest start time to include, in nanoseconds since the epoch",
+    )
+    end_ns: Optional[int] = Field(
+        default=None,
+        description="Start time to include data up to (exclusive), in nanoseconds since the epoch",
+    )
+    last_seconds: Optional[float] = Field(
+        default=None,
+        description="Only include data that started in this many seconds before the filter is applied, e.g., 86400 for the last 24 hours",
+    )
+
+    def bounds(
+        self, now_ns: Optional[int] = None
+    ) -> tuple[Optional[int], Optional[int]]:
+        """The [start, end) window of start times, with `last_seconds` counted back from `now_ns`."""
+        start_ns = self.start_ns
+        if self.last_seconds is not None:
+            if now_ns is None:
+                now_ns = time.time_ns()
+            window_start = now_ns - int(self.last_seconds * 1_000_000_000)
+            start_ns = window_start if start_ns is None else max(start_ns, window_start)
+        return start_ns, self.end_ns
+
+    def matches(
+        self,
+        obj: InteractionStep | Interaction | InteractionGroup,
+        now_ns: Optional[int] = None,
+    ) -> bool:
+        """Check if the object started in this time window; objects without a start never do."""
+        start = raw_input_start_ns(obj)
+        if start is None:
+            return False
+        start_ns, end_ns = self.bounds(now_ns)
+        return (start_ns is None or start >= start_ns) and (
+            end_ns is None or start < end_ns
+        )
+
+
 class RankingSpec(BaseModel):
     """Ranking-based annotation (preference learning)."""
 
@@ -431,6 +1189,10 @@ class FeedbackConfig(BaseModel):
         as input; keep that in mind when designing matchers. It must be in sync with `granularity` described in the feedback config.
         """
     )
+    time_range: Optional[TimeRangeMatcher] = Field(
+        default=None,
+        description="Only evaluate data that started in this time window, e.g., the last 24 hours of traffic. Applied together with the attribute matchers.",
+    )
     natural_language_disqualifier: Optional[str] = Field(
         default=None,
         description="Natural language criteria for disqualifying interactions from evaluation. This is checked after the attribute matchers.",
@@ -463,8 +1225,10 @@ class FeedbackConfig(BaseModel):
 
     @model_validator(mode="before")
     @classmethod
-    def populate_missing_id(cls, data: Any) -> Any:
+    def populate_missing_id(cls, data: Any, info: ValidationInfo) -> Any:
         """Always populate `id` deterministically from other fields."""
+        if _is_trusted(info) and isinstance(data, dict) and data.get("id"):
+            return data
         if isinstance(data, dict):
             granularity = data.get("granularity")
             requires_context = data.get("requires_context")
@@ -491,7 +1255,9 @@ class FeedbackConfig(BaseModel):
         return data
 
     @model_validator(mode="after")
-    def validate_ai_rubric(self) -> "FeedbackConfig":
+    def validate_ai_rubric(self, info: ValidationInfo) -> "FeedbackConfig":
+        if _is_trusted(info):
+            return self
 
         def validate_pointwise_rubric(rubric: str) -> None:
             actual_variables = _extract_fstring_variables(rubric)
@@ -550,30 +1316,54 @@ class JudgeInput(BaseModel):
     input_items: list[InputItemValue] = Field(
         description="The inputs that were extracted from the interaction"
     )
-    raw_input: Union[InteractionStep, Interaction, InteractionGroup] = Field(
-        description="The raw input that was summarized to generate the judge inputs"
+    raw_input: Optional[Union[InteractionStep, Interaction, InteractionGroup]] = Field(
+        default=None,
+        description="The raw input that was summarized to generate the judge inputs. "
+        "None in reference-only mode, where the raw input is identified by source_type and source_ids",
     )
 
-    def save(self, path: str) -> None:
-        """Save JudgeInput as JSON file."""
-        import json
-        from pathlib import Path
+    def as_reference(self) -> "JudgeInput":
+        """Return a reference-only copy that points at its source instead of embedding it."""
+        return self.model_copy(update={"raw_input": None})
 
+    def resolve(self, resolver: Callable[[str, str], RawJudgeInput]) -> "JudgeInput":
+        """Return a copy with `raw_input` populated, looking it up by source type and ID if needed."""
+        if self.raw_input is not None:
+            return self
+        return self.model_copy(
+            update={"raw_input": resolver(self.source_type, self.source_ids[0])}
+        )
+
+    def save(
+        self,
+        path: str,
+        compact: bool = False,
+        format: Optional[SerializationFormat] = None,
+    ) -> None:
+        """Save JudgeInput as JSON file, or in another serialization format.
+
+        With `compact=True` the raw input is left out (it can be resolved again from
+        source_type/source_ids) and, unless another format is given, the JSON is
+        written without indentation.
+        """
         file_path = Path(path)
         file_path.parent.mkdir(parents=True, exist_ok=True)
 
-        with open(file_path, "w") as f:
-            json.dump(self.model_dump(mode="json"), f, indent=2)
+        if format is None:
+            format = "compact" if compact else "json"
+        data = self.model_dump(mode="json", exclude={"raw_input"} if compact else None)
+        file_path.write_bytes(dump_bytes(data, format))
 
     @classmethod
-    def load(cls, path: str) -> "JudgeInput":
-        """Load JudgeInput from JSON file."""
-        import json
-        from pathlib import Path
-
-        with open(Path(path), "r") as f:
-            data = json.load(f)
-        return cls(**data)
+    def load(
+        cls,
+        path: str,
+        resolver: Optional[Callable[[str, str], RawJudgeInput]] = None,
+    ) -> "JudgeInput":
+        """Load JudgeInput from a file in any serialization format, resolving the raw input if a resolver is given."""
+        data = load_bytes(Path(path).read_bytes())
+        judge_input = cls(**data)
+        return judge_input.resolve(resolver) if resolver else judge_input
 
 
 class BaseAnnotation(BaseModel):
@@ -620,7 +1410,29 @@ class ContinuousAnnotation(BaseAnnotation):
     score: Optional[float] = Field(default=None, description="The assigned score")
 
 
-Annotation = Union[RankingAnnotation, CategoricalAnnotation, ContinuousAnnotation]
+def _annotation_type(value: Any) -> Optional[str]:
+    """Discriminate annotations by `type`, inferring it for data that omits it."""
+    if not isinstance(value, dict):
+        return getattr(value, "type", None)
+    if "type" in value:
+        return value["type"]
+    if "rankings" in value:
+        return "ranking"
+    if "category" in value:
+        return "categorical"
+    if "score_range" in value:
+        return "continuous"
+    return None
+
+
+Annotation = Annotated[
+    Union[
+        Annotated[RankingAnnotation, Tag("ranking")],
+        Annotated[CategoricalAnnotation, Tag("categorical")],
+        Annotated[ContinuousAnnotation, Tag("continuous")],
+    ],
+    Discriminator(_annotation_type),
+]
 
 
 class BaseTestCase(BaseModel):
@@ -644,8 +1456,10 @@ class BaseTestCase(BaseModel):
     updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
     @model_validator(mode="after")
-    def validate_annotation_consistency(self) -> "BaseTestCase":
+    def validate_annotation_consistency(self, info: ValidationInfo) -> "BaseTestCase":
         """Ensure annotations match the expected type based on feedback_spec and granularity."""
+        if _is_trusted(info):
+            return self
         feedback_spec = self.feedback_config.feedback_spec
         if self.granularity != self.feedback_config.granularity:
             raise ValueError(
@@ -683,26 +1497,27 @@ class BaseTestCase(BaseModel):
 
         return self
 
-    def save(self, path: str) -> None:
-        """Save TestCase as JSON file."""
-        import json
-        from pathlib import Path
-
+    def save(self, path: str, format: SerializationFormat = "json") -> None:
+        """Save TestCase as JSON file, or in another serialization format."""
         file_path = Path(path)
         file_path.parent.mkdir(parents=True, exist_ok=True)
 
-        with open(file_path, "w") as f:
-            json.dump(self.model_dump(mode="json"), f, indent=2)
+        file_path.write_bytes(
+            dump_bytes(
+                {**self.model_dump(mode="json"), "schema_version": SCHEMA_VERSION},
+                format,
+            )
+        )
 
     @classmethod
-    def load(cls, path: str) -> "BaseTestCase":
-        """Load TestCase from JSON file."""
-        import json
-        from pathlib import Path
-
-        with open(Path(path), "r") as f:
-            data = json.load(f)
-        return cls(**data)
+    def load(cls, path: str, trusted: bool = False) -> "BaseTestCase":
+        """Load TestCase from a file in any serialization format.
+
+        With `trusted=True`, files stamped with the current SCHEMA_VERSION skip the
+        model validators; anything else is still fully validated.
+        """
+        data = load_bytes(Path(path).read_bytes())
+        return cls.model_validate(data, context=trusted_context(data, trusted))
 
 
 class PointwiseAnnotationTestCase(BaseTestCase):
@@ -0,0 +1,187 @@
+"""Full-text search over the ingested steps, backed by SQLite FTS5.
+
+Each step's name, input_data, output_data and message contents are indexed in
+an FTS5 table in `ingested_data/search.sqlite`, along with the content hash of
+the saved interaction (the source) they came from. Sources are only re-indexed
+when their manifest hash changes, so the index survives restarts and reloads
+only touch new, changed and removed interactions.
+"""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Iterable, Optional
+
+from pydantic import BaseModel, Field
+
+from ._models import InteractionStep
+
+SEARCH_INDEX_FILENAME = "search.sqlite"
+
+# Longer payloads are truncated before indexing to bound the index size
+MAX_FIELD_CHARS = 100_000
+SNIPPET_TOKENS = 16
+# bm25 weights of the name, input, output and messages columns
+COLUMN_WEIGHTS = (4.0, 1.0, 1.0, 1.0)
+
+
+class SearchHit(BaseModel):
+    """A step matching a search query, with a highlighted excerpt."""
+
+    step_id: str
+    interaction_id: Optional[str] = None
+    group_id: Optional[str] = None
+    score: float = Field(description="Relevance of the match; higher is better")
+    snippet: str = Field(
+        description="Excerpt of the best matching field, matches in [brackets]"
+    )
+
+
+def _field_text(value: Any) -> str:
+    if value is None:
+        return ""
+    text = (
+        value
+        if isinstance(value, str)
+        else json.dumps(value, ensure_ascii=False, default=str)
+    )
+    return text[:MAX_FIELD_CHARS]
+
+
+def step_search_fields(step: InteractionStep) -> tuple[str, str, str, str]:
+    """The name, input, output and message text of a step, as indexed."""
+    messages = (step.input_messages or []) + (step.output_messages or [])
+    return (
+        step.name or "",
+        _field_text(step.input_data),
+        _field_text(step.output_data),
+        _field_text("\n".join(_field_text(message.content) for message in messages)),
+    )
+
+
+def to_match_query(query: str) -> str:
+    """Quote each term of a free-text query as an FTS5 phrase, all required.
+
+    A trailing `*` on a term matches it as a prefix.
+    """
+    phrases = []
+    for term in query.split():
+        prefix = term.endswith("*") and len(term) > 1
+        term = term.rstrip("*") if prefix else term
+        phrase = '"' + term.replace('"', '""') + '"'
+        phrases.append(phrase + "*" if prefix else phrase)
+    return " ".join(phrases)
+
+
+class SearchIndex:
+    """FTS5 index of the steps of each ingested interaction."""
+
+    def __init__(self, ingested_data_dir: Path):
+        self.db_path = ingested_data_dir / SEARCH_INDEX_FILENAME
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            self.db_path, check_same_thread=False, isolation_level=None, timeout=30
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        try:
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS sources (
+                    source_id TEXT PRIMARY KEY,
+                    hash TEXT NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS steps (
+                    rowid INTEGER PRIMARY KEY,
+                    step_id TEXT NOT NULL,
+                    source_id TEXT NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_steps_source ON steps (source_id);
+                CREATE VIRTUAL TABLE IF NOT EXISTS step_text USING fts5(
+                    name, input, output, messages,
+                    tokenize = 'unicode61 remove_diacritics 2'
+                );
+                """)
+        except sqlite3.OperationalError as e:
+            self._conn.close()
+            raise RuntimeError(
+                f"Full-text search needs SQLite built with FTS5 ({e})"
+            ) from e
+
+    def source_hashes(self) -> dict[str, str]:
+        """Content hash each indexed source was indexed at."""
+        with self._lock:
+            return dict(self._conn.execute("SELECT source_id, hash FROM sources"))
+
+    def update(
+        self,
+        removed: Iterable[str],
+        indexed: dict[str, tuple[str, list[InteractionStep]]],
+    ) -> None:
+        """Drop `removed` sources and (re)index `indexed`: source ID -> (hash, steps).
+
+        Steps must have their payloads loaded.
+        """
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                for source_id in list(removed) + list(indexed):
+                    self._delete_source(source_id)
+                for source_id, (source_hash, steps) in indexed.items():
+                    for step in steps:
+                        rowid = self._conn.execute(
+                            "INSERT INTO steps (step_id, source_id) VALUES (?, ?)",
+                            (step.id, source_id),
+                        ).lastrowid
+                        self._conn.execute(
+                            "INSERT INTO step_text (rowid, name, input, output, messages) "
+                            "VALUES (?, ?, ?, ?, ?)",
+                            (rowid, *step_search_fields(step)),
+                        )
+                    self._conn.execute(
+                        "INSERT INTO sources (source_id, hash) VALUES (?, ?)",
+                        (source_id, source_hash),
+                    )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def _delete_source(self, source_id: str) -> None:
+        self._conn.execute(
+            "DELETE FROM step_text WHERE rowid IN "
+            "(SELECT rowid FROM steps WHERE source_id = ?)",
+            (source_id,),
+        )
+        self._conn.execute("DELETE FROM steps WHERE source_id = ?", (source_id,))
+        self._conn.execute("DELETE FROM sources WHERE source_id = ?", (source_id,))
+
+    def search(self, query: str, limit: int = 20) -> list[SearchHit]:
+        """Steps matching every term of `query`, best match first."""
+        match_query = to_match_query(query)
+        if not match_query:
+            return []
+        weights = ", ".join(str(weight) for weight in COLUMN_WEIGHTS)
+        with self._lock:
+            rows = self._conn.execute(
+                f"""
+                SELECT steps.step_id, bm25(step_text, {weights}) AS rank,
+                    snippet(step_text, -1, '[', ']', '…', {SNIPPET_TOKENS})
+                FROM step_text JOIN steps ON steps.rowid = step_text.rowid
+                WHERE step_text MATCH ?
+                ORDER BY rank
+                LIMIT ?
+                """,
+                (match_query, limit),
+            ).fetchall()
+        # bm25 ranks better matches lower
+        return [
+            SearchHit(step_id=step_id, score=-rank, snippet=snippet)
+            for step_id, rank, snippet in rows
+        ]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,194 @@
+"""Columnar storage of the hot scalar fields of InteractionStep.
+
+Attribute filtering and grouping into interactions only look at a handful of
+scalar step fields. StepColumns keeps those fields as
+columns, separate from the steps' heavy input/output data, raw records and
+messages, so they can be scanned without going through a model per step.
+
+Columns are held in an Arrow table and scanned with vectorized kernels when
+pyarrow is installed (`pip install pyarrow`), and as plain lists otherwise.
+"""
+
+from __future__ import annotations
+
+from functools import reduce
+from typing import Any, Iterable, Optional
+
+from ._models import AttributeMatcher, InteractionStep
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+except ImportError:
+    pa = None
+    pc = None
+
+
+STRING_COLUMNS = [
+    "id",
+    "parent_step_id",
+    "interaction_id",
+    "group_id",
+    "name",
+    "model",
+    "provider",
+]
+INT_COLUMNS = [
+    "start_ns",
+    "duration_ns",
+    "usage.input_tokens",
+    "usage.output_tokens",
+    "usage.total_tokens",
+]
+# Presence of the nested usage, whose attributes never match when it's missing
+FLAG_COLUMNS = ["has_usage"]
+
+# Columns named after the attribute path that resolves to them on a step
+VALUE_COLUMNS = STRING_COLUMNS + INT_COLUMNS
+
+
+class StepColumns:
+    """The hot fields of a list of steps, one column per field in step order."""
+
+    def __init__(self, columns: dict[str, list[Any]], use_arrow: Optional[bool] = None):
+        if use_arrow is None:
+            use_arrow = pa is not None
+        elif use_arrow and pa is None:
+            raise ImportError("Arrow step columns require pyarrow: pip install pyarrow")
+
+        self.num_rows = len(columns["id"])
+        self._lists: Optional[dict[str, list[Any]]] = None
+        self._table = None
+        if use_arrow:
+            schema = pa.schema(
+                [(name, pa.string()) for name in STRING_COLUMNS]
+                + [(name, pa.int64()) for name in INT_COLUMNS]
+                + [(name, pa.bool_()) for name in FLAG_COLUMNS]
+            )
+            self._table = pa.table(columns, schema=schema)
+        else:
+            self._lists = columns
+
+    @classmethod
+    def from_steps(
+        cls, steps: Iterable[InteractionStep], use_arrow: Optional[bool] = None
+    ) -> StepColumns:
+        """Extract the hot fields of `steps` in a single pass."""
+        columns: dict[str, list[Any]] = {
+            name: [] for name in STRING_COLUMNS + INT_COLUMNS + FLAG_COLUMNS
+        }
+        string_columns = [(name, columns[name]) for name in STRING_COLUMNS]
+        for step in steps:
+            for name, column in string_columns:
+                column.append(getattr(step, name))
+            columns["start_ns"].append(step.start_ns)
+            columns["duration_ns"].append(step.duration_ns)
+            usage = step.usage
+            columns["usage.input_tokens"].append(usage.input_tokens if usage else None)
+            columns["usage.output_tokens"].append(
+                usage.output_tokens if usage else None
+            )
+            columns["usage.total_tokens"].append(usage.total_tokens if usage else None)
+            columns["has_usage"].append(usage is not None)
+        return cls(columns, use_arrow)
+
+    def __len__(self) -> int:
+        return self.num_rows
+
+    def column(self, name: str) -> list[Any]:
+        """The values of a column as a Python list."""
+        if self._table is not None:
+            return self._table.column(name).to_pylist()
+        return self._lists[name]
+
+    def match(self, matcher: AttributeMatcher) -> Any:
+        """Evaluate an attribute matcher over all rows at once.
+
+        Returns one boolean per step, the same as `matcher.matches(step)`, as an
+        Arrow boolean array when the columns are in Arrow and as a list otherwise;
+        or None if the matcher's attribute path isn't one of the hot fields.
+        """
+        path = matcher.attribute_path
+        if path not in VALUE_COLUMNS:
+            return None
+
+        if self._table is None:
+            mask = [matcher.matches_value(value) for value in self._lists[path]]
+            if path.startswith("usage."):
+                # A nested attribute of a missing usage never matches
+                mask = [
+                    matched and has_usage
+                    for matched, has_usage in zip(
+                        mask, self._lists["has_usage"], strict=True
+                    )
+                ]
+            return mask
+
+        mask = self._arrow_match(matcher)
+        if mask is None:
+            mask = pa.array(
+                [matcher.matches_value(value) for value in self.column(path)],
+                pa.bool_(),
+            )
+        if path.startswith("usage."):
+            mask = pc.and_(mask, self._table.column("has_usage"))
+        return mask
+
+    def select(
+        self, matchers: Iterable[AttributeMatcher], rows: list[int]
+    ) -> tuple[list[int], list[AttributeMatcher]]:
+        """Filter `rows` with the matchers on hot fields, scanning their columns.
+
+        Returns the rows that pass all of those matchers, in order, and the
+        matchers on other fields, which are left to check per step. With Arrow,
+        the masks are combined and applied without leaving Arrow.
+        """
+        masks = []
+        remaining_matchers = []
+        for matcher in matchers:
+            mask = self.match(matcher)
+            if mask is None:
+                remaining_matchers.append(matcher)
+            else:
+                masks.append(mask)
+        if not masks:
+            return rows, remaining_matchers
+
+        if self._table is None:
+            selected = [row for row in rows if all(mask[row] for mask in masks)]
+            return selected, remaining_matchers
+
+        mask = reduce(pc.and_, masks)
+        if isinstance(mask, pa.ChunkedArray):
+            mask = mask.combine_chunks()
+        row_array = pa.array(rows, pa.int64())
+        selected = row_array.filter(pc.take(mask, row_array)).to_pylist()
+        return selected, remaining_matchers
+
+    def _arrow_match(self, matcher: AttributeMatcher) -> Any:
+        path = matcher.attribute_path
+        column = self._table.column(path)
+        try:
+            if matcher.contains_str is not None:
+                mask = pc.match_substring(self._as_str(column), matcher.contains_str)
+            elif matcher.matches_regex is not None:
+                mask = pc.match_substring_regex(
+                    self._as_str(column), matcher.matches_regex
+                )
+            elif matcher.equals_value is not None:
+                # Leave comparisons across types (e.g. 1 == 1.0 or True == 1) to Python
+                expected_type = str if path in STRING_COLUMNS else int
+                if type(matcher.equals_value) is not expected_type:
+                    return None
+                mask = pc.fill_null(pc.equal(column, matcher.equals_value), False)
+            else:
+                return pa.array([False] * self.num_rows, pa.bool_())
+        except (pa.ArrowInvalid, pa.ArrowNotImplementedError, OverflowError):
+            # e.g. regex syntax RE2 doesn't support; fall back to re
+            return None
+        return mask
+
+    @staticmethod
+    def _as_str(column: Any) -> Any:
+        # Matchers compare against str(value), which is "None" for missing values
+        return pc.fill_null(pc.cast(column, pa.string()), "None")
@@ -0,0 +1,107 @@
+"""On-demand loading of the heavy payload fields of ingested steps.
+
+With lazy payloads, ingested steps are kept in memory as skeletons: IDs, parent
+links, timings, model and the other scalar fields stay resident, while the payload
+fields below are dropped right after loading and read back from the ingested data
+when a step is materialized, e.g. for summarization or to be returned by the API.
+Payloads of recently materialized interactions are kept in a bounded LRU cache.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Iterable
+
+from ._models import Interaction, InteractionStep
+
+PAYLOAD_FIELDS = (
+    "input_data",
+    "output_data",
+    "raw",
+    "input_messages",
+    "output_messages",
+)
+
+
+def strip_payloads(interaction: Interaction) -> Interaction:
+    """Drop the payload fields of an interaction's steps in place."""
+    for step in interaction.steps:
+        step.input_data = None
+        step.output_data = None
+        step.raw = {}
+        step.input_messages = None
+        step.output_messages = None
+    return interaction
+
+
+def needs_payloads(attribute_path: str) -> bool:
+    """Whether an attribute matcher path reads a payload field of a step."""
+    return any(
+        part.split("[")[0] in PAYLOAD_FIELDS for part in attribute_path.split(".")
+    )
+
+
+class StepPayloadStore:
+    """Reloads step payloads from the saved interactions that hold them.
+
+    Payloads are loaded and cached one saved interaction at a time, so
+    materializing all the steps of an interaction costs a single load.
+    """
+
+    def __init__(self, cache_size: int = 256):
+        self.cache_size = cache_size
+        self._loaders: dict[str, Callable[[], Interaction]] = {}
+        self._step_sources: dict[str, str] = {}
+        self._cache: OrderedDict[str, dict[str, dict[str, Any]]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add_source(
+        self,
+        source_id: str,
+        load: Callable[[], Interaction],
+        step_ids: Iterable[str],
+    ) -> None:
+        """Register how to reload the saved interaction `source_id` holding `step_ids`.
+
+        Registering a source again replaces its loader and drops its cached payloads.
+        """
+        self._loaders[source_id] = load
+        for step_id in step_ids:
+            self._step_sources[step_id] = source_id
+        with self._lock:
+            self._cache.pop(source_id, None)
+
+    def remove_source(self, source_id: str, step_ids: Iterable[str]) -> None:
+        """Forget a saved interaction and the steps it held."""
+        self._loaders.pop(source_id, None)
+        for step_id in step_ids:
+            if self._step_sources.get(step_id) == source_id:
+                del self._step_sources[step_id]
+        with self._lock:
+            self._cache.pop(source_id, None)
+
+    def get(self, step_id: str) -> dict[str, Any]:
+        """The payload fields of a step, or an empty dict for an unknown step."""
+        source_id = self._step_sources.get(step_id)
+        if source_id is None:
+            return {}
+        with self._lock:
+            payloads = self._cache.get(source_id)
+            if payloads is not None:
+                self._cache.move_to_end(source_id)
+        if payloads is None:
+            interaction = self._loaders[source_id]()
+            payloads = {
+                step.id: {field: getattr(step, field) for field in PAYLOAD_FIELDS}
+                for step in interaction.steps
+            }
+            with self._lock:
+                self._cache[source_id] = payloads
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return payloads.get(step_id, {})
+
+    def materialize(self, step: InteractionStep) -> InteractionStep:
+        """A copy of a skeleton step with its payload fields loaded."""
+        return step.model_copy(update=self.get(step.id))
@@ -2,11 +2,24 @@
 
 from __future__ import annotations
 
-import json
+import hashlib
+import time
+import zlib
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import partial
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Optional
-from ._models import FeedbackConfig
+from typing import Any, Iterable, Iterator, Optional
+from ._models import (
+    SCHEMA_VERSION,
+    FeedbackConfig,
+    SerializationFormat,
+    detect_format,
+    dump_bytes,
+    load_bytes,
+    trusted_context,
+)
 from ._models import (
     JudgeInput,
     Annotation,
@@ -15,35 +28,168 @@ from ._models import (
     PointwiseAnnotationTestCase,
     RankingAnnotationTestCase,
     RawJudgeInput,
+    Reference,
 )
 from itertools import combinations
 from ._models import RankingSpec
 from ._interaction_utils import (
+    LoadExecutor,
+    build_interaction_graph,
     build_interaction_objects,
-    build_interaction_groups,
+    group_interactions,
+    interaction_metadata,
+    interaction_group_id,
+    load_interaction_dirs,
+    load_sharded_interactions,
+)
+from ._ingest_manifest import IngestDelta, IngestManifest
+from ._step_columns import StepColumns
+from ._step_payloads import StepPayloadStore, needs_payloads
+from ._time_index import TimeIndex
+from ._search_index import SearchHit, SearchIndex
+from ._models import (
+    Interaction,
+    InteractionGroup,
+    SHARD_INDEX_FILENAME,
+    InteractionShardReader,
+    InteractionStep,
+    TimeRangeMatcher,
+    raw_input_start_ns,
+)
+from ._file_utils import file_lock
+from ._test_case_journal import TestCaseJournal
+from ._test_case_store import (
+    FeedbackConfigRegistry,
+    TestCaseHeader,
+    TestCaseStore,
+    TestCaseStoreKind,
+    create_test_case_store,
 )
-from ._models import Interaction, InteractionStep, InteractionGroup
 
 
-MAX_TEST_CASES = 100
+def _raw_input_id(raw_input: RawJudgeInput | dict[str, Any]) -> str:
+    return raw_input["id"] if isinstance(raw_input, dict) else raw_input.id
+
+
+def _missing_raw_input(source_type: str, source_id: str) -> RawJudgeInput:
+    """An empty stand-in for a raw judge input that is no longer ingested."""
+    if source_type == "step":
+        return InteractionStep(id=source_id)
+    elif source_type == "interaction":
+        return Interaction(id=source_id, steps=[])
+    return InteractionGroup(id=source_id, interactions=[])
+
+
+def _raw_input_refs(tc_data: dict[str, Any]) -> list[dict[str, Any]]:
+    """The raw judge input references of a serialized test case, if any."""
+    if tc_data.get("raw_judge_input_ref"):
+        return [tc_data["raw_judge_input_ref"]]
+    return tc_data.get("raw_judge_input_refs") or []
 
 
 class TestCaseCollection:
-    """Manages test cases stored as individual JSON files."""
+    """Manages test cases persisted through a pluggable TestCaseStore.
+
+    State transitions (judge inputs, annotations, invalidation) are appended to a
+    journal and compacted into the store every `journal_compact_every` entries, or
+    before any query that relies on the store's status and config indexes.
+
+    Test cases are stamped with the SCHEMA_VERSION they were written with. With
+    `trusted=True`, stamped test cases and feedback configs are loaded without
+    running the model validators; unstamped or older data is always validated.
+
+    Test cases are written in `serialization_format` and read back in whichever
+    format they were written.
+
+    Ingested interactions are loaded by `load_workers` worker threads (or processes
+    with `load_executor="process"`), defaulting to one per CPU. With
+    `lazy_payloads=True`, ingested steps are kept as skeletons without their
+    payload fields; use `materialize` or `materialize_test_case` to load them.
+
+    The collection can be shared by several processes (e.g. uvicorn workers and
+    processor processes): store writes are atomic renames, each state transition
+    is computed and journaled while holding an advisory lock on its test case, and
+    journal entries are compare-and-swap updates on `updated_at`, so a transition
+    computed from a stale version of a test case is dropped rather than applied.
+    """
+
+    # Test cases share this many lock files, chosen by a stable hash of their ID
+    LOCK_STRIPES = 64
+    # Interactions whose payloads are loaded at once while building the search index
+    SEARCH_INDEX_BATCH_SIZE = 100
 
     def __init__(
         self,
         test_cases_dir: Path | str,
         haize_annotations_dir: Path | str | None = None,
+        store: TestCaseStoreKind | TestCaseStore = "file",
+        journal_compact_every: int = 500,
+        trusted: bool = False,
+        serialization_format: SerializationFormat = "json",
+        load_workers: Optional[int] = None,
+        load_executor: LoadExecutor = "thread",
+        lazy_payloads: bool = False,
+        payload_cache_size: int = 256,
+        build_search_index: bool = False,
     ):
         self.dir = Path(test_cases_dir)
         self.dir.mkdir(parents=True, exist_ok=True)
+        self.serialization_format = serialization_format
+        self.store = (
+            store
+            if isinstance(store, TestCaseStore)
+            else create_test_case_store(store, self.dir, serialization_format)
+        )
+        self.trusted = trusted
+        self.feedback_configs = FeedbackConfigRegistry(
+            self.dir / "feedback_configs", trusted=trusted
+        )
+        self.journal = TestCaseJournal(self.dir / "journal.jsonl")
+        self.journal_compact_every = journal_compact_every
+        # Context-local so that only the tasks spawned inside a batch join it
+        self._batch_entries: ContextVar[Optional[list[dict[str, Any]]]] = ContextVar(
+            f"batch_entries_{id(self)}", default=None
+        )
         self.haize_annotations_dir = (
             Path(haize_annotations_dir) if haize_annotations_dir else None
         )
         self._steps: list[InteractionStep] = []
+        # Hot scalar fields of self._steps, for filtering and grouping
+        self._step_columns: Optional[StepColumns] = None
         self._interactions: list[Interaction] = []
         self._groups: list[InteractionGroup] = []
+        self._steps_by_id: dict[str, InteractionStep] = {}
+        self._interactions_by_id: dict[str, Interaction] = {}
+        self._groups_by_id: dict[str, InteractionGroup] = {}
+        # The interaction each step belongs to, by step ID
+        self._interactions_by_step_id: dict[str, Interaction] = {}
+        # Start time indexes per granularity, built on first use after each load
+        self._time_indexes: dict[str, TimeIndex] = {}
+        self.load_workers = load_workers
+        self.load_executor = load_executor
+        self.lazy_payloads = lazy_payloads
+        self.payload_cache_size = payload_cache_size
+        self._payloads: Optional[StepPayloadStore] = None
+        # Full-text search over the ingested steps, updated as they are loaded
+        self.build_search_index = build_search_index
+        self._search_index: Optional[SearchIndex] = None
+        # Test cases judging each raw judge input, by (source type, ID), and the
+        # inputs of each indexed test case; built on the first search and synced
+        # with the store on every search after
+        self._test_case_ids_by_input: Optional[
+            dict[tuple[str, str], dict[str, None]]
+        ] = None
+        self._indexed_inputs: dict[str, list[tuple[str, str]]] = {}
+        # Steps of each loaded saved interaction, and the content hash it was loaded at
+        self._source_steps: dict[str, list[InteractionStep]] = {}
+        # The saved interaction each loaded step came from, by step ID
+        self._step_sources: dict[str, str] = {}
+        # Name, description, tags and group_id of the saved interactions, by ID
+        self._interaction_metadata: dict[str, dict[str, Any]] = {}
+        self._loaded_hashes: dict[str, str] = {}
+        self._manifest: Optional[IngestManifest] = None
+        # (mtime, size) of the shard index payloads are currently read from
+        self._shard_index_version: Optional[tuple[int, int]] = None
         self._data_loaded = False
 
     def load_ingested_data(self) -> bool:
@@ -52,27 +198,12 @@ class TestCaseCollection:
         if not self.haize_annotations_dir:
             return False
 
-        ingested_data_dir = (
-            self.haize_annotations_dir / "ingested_data" / "interactions"
-        )
-        if not ingested_data_dir.exists():
-            print(f"Ingested data directory not found at {ingested_data_dir}")
+        self._reset_ingested_data()
+        delta = self._sync_ingested_data()
+        if delta is None:
             return False
 
-        print(f"📂 Loading ingested data from {ingested_data_dir}")
-        steps_list = []
-        for interaction_dir in ingested_data_dir.iterdir():
-            if interaction_dir.is_dir():
-                try:
-                    interaction = Interaction.load(str(interaction_dir))
-                    steps_list.extend(interaction.steps)
-                except Exception as e:
-                    print(f"⚠️  Warning: Could not load {interaction_dir.name}: {e}")
-
-        if steps_list:
-            self._steps = steps_list
-            self._interactions = build_interaction_objects(steps_list)
-            self._groups = build_interaction_groups(steps_list)
+        if self._steps:
             self._data_loaded = True
             print(
                 f"✓ Loaded {len(self._steps)} steps, {len(self._interactions)} interactions, {len(self._groups)} groups"
@@ -82,6 +213,601 @@ class TestCaseCollection:
             print("⚠️  No steps loaded from ingested data")
             return False
 
+    def reload_ingested_data(self) -> Optional[IngestDelta]:
+        """Pick up interactions ingested, re-ingested or removed since the last load.
+
+        Only new and changed interactions are parsed; their steps are merged into
+        the loaded steps, and the interactions and groups they belong to are
+        rebuilt. Returns the delta, or None if there is no ingested data.
+        """
+        if not self._data_loaded:
+            if not self.load_ingested_data():
+                return None
+            return IngestDelta(
+                added=sorted(self._source_steps),
+                new_step_ids=list(self._steps_by_id),
+                new_interaction_ids=list(self._interactions_by_id),
+                new_group_ids=list(self._groups_by_id),
+            )
+        delta = self._sync_ingested_data()
+        if delta is not None and not delta.is_empty():
+            print(
+                f"✓ Reloaded ingested data: {len(delta.added)} added, {len(delta.changed)} changed, "
+                f"{len(delta.removed)} removed interactions; now {len(self._steps)} steps"
+            )
+        return delta
+
+    def _reset_ingested_data(self) -> None:
+        self._steps = []
+        self._step_columns = None
+        self._interactions = []
+        self._groups = []
+        self._steps_by_id = {}
+        self._interactions_by_id = {}
+        self._groups_by_id = {}
+        self._interactions_by_step_id = {}
+        self._time_indexes = {}
+        self._payloads = (
+            StepPayloadStore(self.payload_cache_size) if self.lazy_payloads else None
+        )
+        self._source_steps = {}
+        self._step_sources = {}
+        self._interaction_metadata = {}
+        self._loaded_hashes = {}
+        self._shard_index_version = None
+
+    def _sync_ingested_data(self) -> Optional[IngestDelta]:
+        """Load the interactions whose manifest hash differs from the loaded one."""
+        assert self.haize_annotations_dir is not None
+        ingested_data_dir = self.haize_annotations_dir / "ingested_data"
+        shard_dir = ingested_data_dir / "shards"
+        interactions_dir = ingested_data_dir / "interactions"
+        use_shards = InteractionShardReader.exists(str(shard_dir))
+        if not use_shards and not interactions_dir.exists():
+            print(f"Ingested data directory not found at {interactions_dir}")
+            return None
+
+        if self._manifest is None:
+            self._manifest = IngestManifest(ingested_data_dir)
+        shard_reader = InteractionShardReader(str(shard_dir)) if use_shards else None
+        current = (
+            self._manifest.scan_shards(shard_reader)
+            if shard_reader is not None
+            else self._manifest.scan_interaction_dirs(interactions_dir)
+        )
+        self._manifest.save()
+
+        delta = IngestDelta.between(self._loaded_hashes, current)
+        if delta.is_empty():
+            if self._payloads is not None and self._shards_moved(shard_reader):
+                self._register_payload_sources(
+                    list(self._source_steps), shard_reader, interactions_dir
+                )
+            elif shard_reader is not None:
+                shard_reader.close()
+            return delta
+
+        to_load = delta.added + delta.changed
+        source_dir = shard_dir if use_shards else interactions_dir
+        print(f"📂 Loading {len(to_load)} interactions from {source_dir}")
+        if use_shards:
+            results = load_sharded_interactions(
+                shard_dir,
+                self.load_workers,
+                self.load_executor,
+                self.lazy_payloads,
+                interaction_ids=to_load,
+            )
+        else:
+            results = load_interaction_dirs(
+                [interactions_dir / interaction_id for interaction_id in to_load],
+                self.load_workers,
+                self.load_executor,
+                self.lazy_payloads,
+            )
+
+        self._embed_replaced_inputs(
+            [
+                step
+                for source_id in delta.changed + delta.removed
+                for step in self._source_steps.get(source_id, [])
+            ],
+            [interaction for _, interaction, _ in results if interaction is not None],
+        )
+
+        old_steps: list[InteractionStep] = []
+        for source_id in delta.changed + delta.removed:
+            source_steps = self._source_steps.pop(source_id, [])
+            for step in source_steps:
+                self._step_sources.pop(step.id, None)
+            for interaction_id in {str(step.interaction_id) for step in source_steps}:
+                self._interaction_metadata.pop(interaction_id, None)
+            old_steps.extend(source_steps)
+            if self._payloads is not None:
+                self._payloads.remove_source(
+                    source_id, (step.id for step in source_steps)
+                )
+        for source_id in delta.removed:
+            del self._loaded_hashes[source_id]
+
+        new_steps: list[InteractionStep] = []
+        for source_id, interaction, error in results:
+            # Recorded even on failure, so a broken interaction is only retried
+            # once its files change
+            self._loaded_hashes[source_id] = current[source_id].hash
+            if interaction is None:
+                print(f"⚠️  Warning: Could not load {source_id}: {error}")
+                continue
+            self._source_steps[source_id] = interaction.steps
+            self._step_sources.update(
+                dict.fromkeys((step.id for step in interaction.steps), source_id)
+            )
+            self._interaction_metadata[interaction.id] = interaction_metadata(
+                interaction
+            )
+            new_steps.extend(interaction.steps)
+
+        if self._payloads is not None:
+            # Repacking moves every record, so all shard sources are repointed
+            self._register_payload_sources(
+                (
+                    list(self._source_steps)
+                    if self._shards_moved(shard_reader)
+                    else to_load
+                ),
+                shard_reader,
+                interactions_dir,
+            )
+        elif shard_reader is not None:
+            shard_reader.close()
+
+        self._apply_step_delta(old_steps, new_steps, delta)
+        self._update_search_index(ingested_data_dir)
+        delta.invalidated_test_case_ids = self._invalidate_removed_inputs(old_steps)
+        return delta
+
+    def _invalidate_removed_inputs(self, old_steps: list[InteractionStep]) -> list[str]:
+        """Mark invalid the test cases referencing raw judge inputs that are gone.
+
+        Test cases referencing re-ingested raw judge inputs need no update: pending
+        ones resolve to the new version when loaded, and summarized or annotated
+        ones had the version they were judged on embedded before it was replaced.
+        """
+        removed: set[tuple[str, str]] = set()
+        for step in old_steps:
+            if step.id not in self._steps_by_id:
+                removed.add(("step", step.id))
+            if (
+                step.interaction_id is not None
+                and str(step.interaction_id) not in self._interactions_by_id
+            ):
+                removed.add(("interaction", str(step.interaction_id)))
+            if step.group_id is not None and step.group_id not in self._groups_by_id:
+                removed.add(("group", step.group_id))
+        if not removed:
+            return []
+
+        invalidated = []
+        for test_case_id in self.get_test_case_ids_for_inputs(removed):
+            tc_data = self._read_data(test_case_id)
+            if (
+                tc_data is None
+                or tc_data.get("status") == TestCaseStatus.INVALID
+                or not _raw_input_refs(tc_data)
+            ):
+                continue
+            self.mark_as_invalid(
+                test_case_id, reason="Raw judge input no longer in ingested data"
+            )
+            invalidated.append(test_case_id)
+        if invalidated:
+            print(
+                f"⚠️  Marked {len(invalidated)} pending test cases invalid: their raw judge inputs were removed"
+            )
+        return invalidated
+
+    def _embed_replaced_inputs(
+        self, old_steps: list[InteractionStep], new_interactions: list[Interaction]
+    ) -> None:
+        """Embed pinned raw judge inputs whose ingested version is about to go away.
+
+        Called before `old_steps` are replaced or removed and `new_interactions`
+        are merged in, while the steps, interactions and groups they touch still
+        resolve to the version judged test cases are pinned to.
+        """
+        # Nothing is loaded yet to embed
+        if not self._step_sources:
+            return
+        affected: set[tuple[str, str]] = set()
+        for step in old_steps:
+            affected.add(("step", step.id))
+            interaction = self._interactions_by_step_id.get(step.id)
+            if interaction is not None:
+                affected.add(("interaction", interaction.id))
+                affected.add(("group", interaction_group_id(interaction)))
+        # New interactions can join existing interactions and groups, which are
+        # assigned from their steps as in build_interaction_objects
+        for interaction in new_interactions:
+            affected.update(("step", step.id) for step in interaction.steps)
+            affected.add(("interaction", interaction.id))
+            group_id = next(
+                (
+                    step.group_id
+                    for step in interaction.steps
+                    if step.group_id is not None
+                ),
+                interaction.group_id,
+            )
+            affected.add(("group", str(group_id or "default_group")))
+        if not affected:
+            return
+
+        embedded = 0
+        for test_case_id in self.get_test_case_ids_for_inputs(affected):
+            with self._test_case_lock(test_case_id):
+                tc_data = self._read_data(test_case_id)
+                if tc_data is None or not any(
+                    "version" in reference
+                    and (reference["type"], reference["id"]) in affected
+                    for reference in _raw_input_refs(tc_data)
+                ):
+                    continue
+                changes = self._embedded_raw_inputs(tc_data)
+                if changes:
+                    self._record_transition(test_case_id, tc_data, changes)
+                    embedded += 1
+        if embedded:
+            print(
+                f"📌 Embedded the judged raw inputs of {embedded} test cases before their ingested data changed"
+            )
+
+    def _update_search_index(self, ingested_data_dir: Path) -> None:
+        """Index the loaded interactions that changed since they were last indexed."""
+        if not self.build_search_index:
+            return
+        if self._search_index is None:
+            try:
+                self._search_index = SearchIndex(ingested_data_dir)
+            except RuntimeError as e:
+                print(f"⚠️  Warning: Search is unavailable: {e}")
+                self.build_search_index = False
+                return
+
+        indexed_hashes = self._search_index.source_hashes()
+        removed = [
+            source_id
+            for source_id in indexed_hashes
+            if source_id not in self._source_steps
+        ]
+        stale = [
+            source_id
+            for source_id in self._source_steps
+            if indexed_hashes.get(source_id) != self._loaded_hashes[source_id]
+        ]
+        if not removed and not stale:
+            return
+        if removed:
+            self._search_index.update(removed, {})
+        # In batches, so only a batch of interactions has its payloads loaded at once
+        for start in range(0, len(stale), self.SEARCH_INDEX_BATCH_SIZE):
+            self._search_index.update(
+                [],
+                {
+                    source_id: (
+                        self._loaded_hashes[source_id],
+                        [
+                            self.materialize(step)
+                            for step in self._source_steps[source_id]
+                        ],
+                    )
+                    for source_id in stale[start : start + self.SEARCH_INDEX_BATCH_SIZE]
+                },
+            )
+        print(
+            f"🔎 Updated search index: {len(stale)} interactions indexed, {len(removed)} removed"
+        )
+
+    def search(self, query: str, limit: int = 20) -> list[SearchHit]:
+        """Full-text search of the ingested steps' names, inputs, outputs and messages.
+
+        Every term of the query must match; a trailing `*` matches a prefix.
+        Returns the best matching steps first, with their interaction and group.
+        """
+        if not self._data_loaded:
+            self.load_ingested_data()
+        if self._search_index is None:
+            raise RuntimeError(
+                "Search index is not available; it is built when ingested data is "
+                "loaded with build_search_index=True"
+            )
+        hits = []
+        for hit in self._search_index.search(query, limit):
+            interaction = self._interactions_by_step_id.get(hit.step_id)
+            if interaction is None:
+                continue
+            hit.interaction_id = interaction.id
+            hit.group_id = interaction_group_id(interaction)
+            hits.append(hit)
+        return hits
+
+    def get_test_case_ids_for_inputs(
+        self, references: Iterable[tuple[str, str]]
+    ) -> list[str]:
+        """IDs of the test cases judging any of the given (source type, ID) raw inputs."""
+        if self._test_case_ids_by_input is None:
+            self._test_case_ids_by_input = {}
+            self._indexed_inputs = {}
+        # Other processes may have created or archived test cases since the last
+        # search; a test case's raw judge inputs never change
+        stored_ids = self.get_test_case_ids()
+        for test_case_id in set(self._indexed_inputs).difference(stored_ids):
+            self._unindex_test_case_inputs(test_case_id)
+        for test_case_id in stored_ids:
+            if test_case_id not in self._indexed_inputs:
+                body = self.store.get(test_case_id)
+                if body is not None:
+                    self._index_test_case_inputs(test_case_id, load_bytes(body))
+        test_case_ids: dict[str, None] = {}
+        for reference in references:
+            for test_case_id in self._test_case_ids_by_input.get(reference, []):
+                test_case_ids[test_case_id] = None
+        return list(test_case_ids)
+
+    def _index_test_case_inputs(
+        self, test_case_id: str, tc_data: dict[str, Any]
+    ) -> None:
+        assert self._test_case_ids_by_input is not None
+        if tc_data.get("raw_judge_input_ref"):
+            references = [tc_data["raw_judge_input_ref"]]
+        elif tc_data.get("raw_judge_input_refs"):
+            references = tc_data["raw_judge_input_refs"]
+        else:
+            # Pinned raw judge inputs, or test cases saved before raw judge
+            # inputs were stored as references
+            raw_inputs = tc_data.get("raw_judge_inputs") or [
+                tc_data.get("raw_judge_input") or {}
+            ]
+            references = [
+                {"type": tc_data.get("granularity"), "id": raw_input.get("id")}
+                for raw_input in raw_inputs
+            ]
+        self._unindex_test_case_inputs(test_case_id)
+        self._indexed_inputs[test_case_id] = [
+            (reference["type"], reference["id"]) for reference in references
+        ]
+        for key in self._indexed_inputs[test_case_id]:
+            self._test_case_ids_by_input.setdefault(key, {})[test_case_id] = None
+
+    def _unindex_test_case_inputs(self, test_case_id: str) -> None:
+        assert self._test_case_ids_by_input is not None
+        for key in self._indexed_inputs.pop(test_case_id, []):
+            self._test_case_ids_by_input.get(key, {}).pop(test_case_id, None)
+
+    def _shards_moved(self, shard_reader: Optional[InteractionShardReader]) -> bool:
+        """Whether the shards were repacked since payload sources last pointed at them."""
+        if shard_reader is None:
+            return False
+        index_stat = (shard_reader.shard_dir / SHARD_INDEX_FILENAME).stat()
+        shard_index_version = (index_stat.st_mtime_ns, index_stat.st_size)
+        moved = shard_index_version != self._shard_index_version
+        self._shard_index_version = shard_index_version
+        return moved
+
+    def _register_payload_sources(
+        self,
+        source_ids: list[str],
+        shard_reader: Optional[InteractionShardReader],
+        interactions_dir: Path,
+    ) -> None:
+        """Point the payloads of loaded interactions at the layout they were read from."""
+        assert self._payloads is not None
+        for source_id in source_ids:
+            source_steps = self._source_steps.get(source_id)
+            if source_steps is None:
+                continue
+            self._payloads.add_source(
+                source_id,
+                (
+                    partial(shard_reader.load, source_id)
+                    if shard_reader is not None
+                    else partial(Interaction.load, str(interactions_dir / source_id))
+                ),
+                (step.id for step in source_steps),
+            )
+
+    def _apply_step_delta(
+        self,
+        old_steps: list[InteractionStep],
+        new_steps: list[InteractionStep],
+        delta: IngestDelta,
+    ) -> None:
+        """Swap `old_steps` for `new_steps` and rebuild what they belong to."""
+        self._time_indexes = {}
+        previous_step_ids = set(self._steps_by_id)
+        previous_interaction_ids = set(self._interactions_by_id)
+        previous_group_ids = set(self._groups_by_id)
+
+        for step in old_steps:
+            self._steps_by_id.pop(step.id, None)
+        for step in new_steps:
+            self._steps_by_id[step.id] = step
+        self._steps = [
+            step
+            for source_id in sorted(self._source_steps)
+            for step in self._source_steps[source_id]
+        ]
+        self._step_columns = StepColumns.from_steps(self._steps)
+
+        affected_interaction_ids = {
+            str(step.interaction_id)
+            for step in old_steps + new_steps
+            if step.interaction_id is not None
+        }
+        affected_steps = [
+            step
+            for step in self._steps
+            if step.interaction_id is not None
+            and str(step.interaction_id) in affected_interaction_ids
+        ]
+        if len(affected_steps) == len(self._steps):
+            # Everything changed, e.g. on the first load: build the graph at once
+            self._interactions, self._groups = build_interaction_graph(
+                self._steps, self._step_columns, self._interaction_metadata
+            )
+            self._interactions_by_id = {
+                interaction.id: interaction for interaction in self._interactions
+            }
+            self._groups_by_id = {group.id: group for group in self._groups}
+            self._interactions_by_step_id = {
+                step.id: interaction
+                for interaction in self._interactions
+                for step in interaction.steps
+            }
+            self._record_new_ids(
+                delta,
+                new_steps,
+                self._interactions,
+                self._groups,
+                previous_step_ids,
+                previous_interaction_ids,
+                previous_group_ids,
+            )
+            return
+
+        rebuilt_interactions = build_interaction_objects(
+            affected_steps, metadata=self._interaction_metadata
+        )
+        affected_group_ids = {
+            interaction_group_id(interaction) for interaction in rebuilt_interactions
+        }
+        for interaction_id in affected_interaction_ids:
+            interaction = self._interactions_by_id.pop(interaction_id, None)
+            if interaction is not None:
+                affected_group_ids.add(interaction_group_id(interaction))
+        for step in old_steps:
+            self._interactions_by_step_id.pop(step.id, None)
+        for interaction in rebuilt_interactions:
+            self._interactions_by_id[interaction.id] = interaction
+            for step in interaction.steps:
+                self._interactions_by_step_id[step.id] = interaction
+        self._interactions = [
+            interaction
+            for interaction in self._interactions
+            if interaction.id not in affected_interaction_ids
+        ] + rebuilt_interactions
+
+        rebuilt_groups = group_interactions(
+            [
+                interaction
+                for interaction in self._interactions
+                if interaction_group_id(interaction) in affected_group_ids
+            ]
+        )
+        for group_id in affected_group_ids:
+            self._groups_by_id.pop(group_id, None)
+        for group in rebuilt_groups:
+            self._groups_by_id[group.id] = group
+        self._groups = [
+            group for group in self._groups if group.id not in affected_group_ids
+        ] + rebuilt_groups
+
+        self._record_new_ids(
+            delta,
+            new_steps,
+            rebuilt_interactions,
+            rebuilt_groups,
+            previous_step_ids,
+            previous_interaction_ids,
+            previous_group_ids,
+        )
+
+    @staticmethod
+    def _record_new_ids(
+        delta: IngestDelta,
+        new_steps: list[InteractionStep],
+        rebuilt_interactions: list[Interaction],
+        rebuilt_groups: list[InteractionGroup],
+        previous_step_ids: set[str],
+        previous_interaction_ids: set[str],
+        previous_group_ids: set[str],
+    ) -> None:
+        delta.new_step_ids = [
+            step.id for step in new_steps if step.id not in previous_step_ids
+        ]
+        delta.new_interaction_ids = [
+            interaction.id
+            for interaction in rebuilt_interactions
+            if interaction.id not in previous_interaction_ids
+        ]
+        delta.new_group_ids = [
+            group.id for group in rebuilt_groups if group.id not in previous_group_ids
+        ]
+
+    def get_new_raw_judge_inputs(self, delta: IngestDelta, granularity: str) -> list:
+        """The raw judge inputs of a granularity that a reload added."""
+        new_ids, index = {
+            "step": (delta.new_step_ids, self._steps_by_id),
+            "interaction": (delta.new_interaction_ids, self._interactions_by_id),
+            "group": (delta.new_group_ids, self._groups_by_id),
+        }[granularity]
+        return [index[source_id] for source_id in new_ids if source_id in index]
+
+    def get_step(self, step_id: str) -> Optional[InteractionStep]:
+        """Look up an ingested step by ID."""
+        if not self._data_loaded:
+            self.load_ingested_data()
+        return self._steps_by_id.get(step_id)
+
+    def get_interaction(self, interaction_id: Optional[str]) -> Optional[Interaction]:
+        """Look up an ingested interaction by ID."""
+        if not self._data_loaded:
+            self.load_ingested_data()
+        return self._interactions_by_id.get(interaction_id)
+
+    def get_group(self, group_id: Optional[str]) -> Optional[InteractionGroup]:
+        """Look up an ingested interaction group by ID."""
+        if not self._data_loaded:
+            self.load_ingested_data()
+        return self._groups_by_id.get(group_id)
+
+    def get_interaction_for_step(self, step_id: str) -> Optional[Interaction]:
+        """Look up the ingested interaction a step belongs to."""
+        if not self._data_loaded:
+            self.load_ingested_data()
+        return self._interactions_by_step_id.get(step_id)
+
+    def _time_index(self, granularity: str) -> TimeIndex:
+        index = self._time_indexes.get(granularity)
+        if index is None:
+            if granularity == "step" and self._step_columns is not None:
+                starts = self._step_columns.column("start_ns")
+            else:
+                starts = [
+                    raw_input_start_ns(raw_input)
+                    for raw_input in self.get_raw_judge_inputs(granularity)
+                ]
+            index = self._time_indexes[granularity] = TimeIndex(starts)
+        return index
+
+    def get_raw_judge_inputs_in_range(
+        self,
+        granularity: str,
+        start_ns: Optional[int] = None,
+        end_ns: Optional[int] = None,
+    ) -> list:
+        """Get the raw judge inputs that started in [start_ns, end_ns), in time order.
+
+        Inputs without a start time are never in range. For groups, the start
+        time is that of their earliest interaction.
+        """
+        raw_judge_inputs = self.get_raw_judge_inputs(granularity)
+        return [
+            raw_judge_inputs[position]
+            for position in self._time_index(granularity).positions_between(
+                start_ns, end_ns
+            )
+        ]
+
     def get_raw_judge_inputs(self, granularity: str) -> list:
         """Get raw judge inputs based on granularity.
 
@@ -109,59 +835,515 @@ class TestCaseCollection:
             self.load_ingested_data()
         return len(self._steps) > 0
 
-    def _load_all(self) -> list[TestCase]:
-        """Load all test cases from directory, limited to MAX_TEST_CASES for memory management."""
-        test_cases = []
-        tc_files = sorted(self.dir.glob("tc_*.json"))
+    def iter_test_cases(
+        self,
+        status: Optional[TestCaseStatus] = None,
+        feedback_config_id: Optional[str] = None,
+        test_case_type: Optional[str] = None,
+    ) -> Iterator[TestCase]:
+        """Lazily load test cases one at a time, in test case ID order.
 
-        if len(tc_files) > MAX_TEST_CASES:
-            print(
-                f"⚠️  Found {len(tc_files)} test cases, loading only first {MAX_TEST_CASES} for memory management"
+        Only the matching IDs are held in memory; test cases deleted or archived
+        while iterating are skipped.
+        """
+        test_case_ids = self.get_test_case_ids(
+            status=status,
+            feedback_config_id=feedback_config_id,
+            test_case_type=test_case_type,
+        )
+        for test_case_id in test_case_ids:
+            tc_data = self._read_data(test_case_id)
+            if tc_data is None:
+                continue
+            test_case = self._from_data(tc_data, test_case_id)
+            # Invalidated on load because its raw judge inputs are gone
+            if status is None or test_case.status == status:
+                yield test_case
+
+    def _reference(self, raw_input: RawJudgeInput) -> Reference:
+        """Reference a raw judge input by its source type and ID."""
+        if isinstance(raw_input, InteractionStep):
+            return Reference(type="step", id=raw_input.id)
+        elif isinstance(raw_input, Interaction):
+            return Reference(type="interaction", id=raw_input.id)
+        return Reference(type="group", id=raw_input.id)
+
+    def resolve_raw_input(self, source_type: str, source_id: str) -> RawJudgeInput:
+        """Look up a step, interaction or group in the ingested data by type and ID."""
+        if not self._data_loaded:
+            self.load_ingested_data()
+        index = {
+            "step": self._steps_by_id,
+            "interaction": self._interactions_by_id,
+            "group": self._groups_by_id,
+        }[source_type]
+        raw_input = index.get(source_id)
+        if raw_input is None:
+            raise ValueError(
+                f"Raw judge input {source_type} {source_id} not found in ingested data"
+            )
+        return raw_input
+
+    def materialize(
+        self, raw_input: Optional[RawJudgeInput]
+    ) -> Optional[RawJudgeInput]:
+        """Return a raw judge input with the payloads of all its steps loaded.
+
+        Without lazy payloads steps are always complete and are returned as is.
+        """
+        if self._payloads is None or raw_input is None:
+            return raw_input
+        if isinstance(raw_input, InteractionStep):
+            return self._payloads.materialize(raw_input)
+        if isinstance(raw_input, Interaction):
+            return raw_input.model_copy(
+                update={"steps": [self.materialize(step) for step in raw_input.steps]}
+            )
+        return raw_input.model_copy(
+            update={
+                "interactions": [
+                    self.materialize(interaction)
+                    for interaction in raw_input.interactions
+                ]
+            }
+        )
+
+    def _materialize_judge_input(self, judge_input: JudgeInput) -> JudgeInput:
+        return judge_input.model_copy(
+            update={"raw_input": self.materialize(judge_input.raw_input)}
+        )
+
+    def materialize_test_case(self, test_case: TestCase) -> TestCase:
+        """Return a test case with the payloads of its raw judge inputs loaded."""
+        if self._payloads is None:
+            return test_case
+        if isinstance(test_case, PointwiseAnnotationTestCase):
+            update = {"raw_judge_input": self.materialize(test_case.raw_judge_input)}
+            if test_case.judge_input is not None:
+                update["judge_input"] = self._materialize_judge_input(
+                    test_case.judge_input
+                )
+        else:
+            update = {
+                "raw_judge_inputs": [
+                    self.materialize(raw_input)
+                    for raw_input in test_case.raw_judge_inputs
+                ]
+            }
+            if test_case.judge_inputs:
+                update["judge_inputs"] = [
+                    self._materialize_judge_input(judge_input)
+                    for judge_input in test_case.judge_inputs
+                ]
+        return test_case.model_copy(update=update)
+
+    def _resolve_reference(self, reference: dict, missing: list[str]) -> RawJudgeInput:
+        """Resolve a serialized raw judge input reference against the ingested data.
+
+        A reference to data that is no longer ingested, or no longer at the version
+        it is pinned to, resolves to an empty placeholder and is added to `missing`.
+        """
+        try:
+            raw_input = self.resolve_raw_input(reference["type"], reference["id"])
+        except ValueError:
+            raw_input = None
+        if raw_input is None or reference.get("version") not in (
+            None,
+            self._source_version(raw_input),
+        ):
+            missing.append(f"{reference['type']} {reference['id']}")
+            return _missing_raw_input(reference["type"], reference["id"])
+        return raw_input
+
+    def _source_version(self, raw_input: RawJudgeInput) -> str:
+        """The version of the ingested data a raw judge input was loaded from.
+
+        This is the manifest hash of the saved interaction it came from, or a hash
+        of those hashes if it spans several.
+        """
+        if isinstance(raw_input, InteractionStep):
+            steps = [raw_input]
+        elif isinstance(raw_input, Interaction):
+            steps = raw_input.steps
+        else:
+            steps = [
+                step
+                for interaction in raw_input.interactions
+                for step in interaction.steps
+            ]
+        hashes = sorted(
+            {
+                self._loaded_hashes[self._step_sources[step.id]]
+                for step in steps
+                if step.id in self._step_sources
+            }
+        )
+        if len(hashes) == 1:
+            return hashes[0]
+        return hashlib.sha256("\n".join(hashes).encode()).hexdigest()
+
+    def _pinned_references(
+        self, raw_inputs: list[RawJudgeInput]
+    ) -> Optional[list[dict[str, Any]]]:
+        """References pinned to the current version of raw judge inputs.
+
+        Returns None unless every raw input is the one in the ingested data.
+        """
+        references = []
+        for raw_input in raw_inputs:
+            reference = self._reference(raw_input)
+            try:
+                ingested = self.resolve_raw_input(reference.type, reference.id)
+            except ValueError:
+                return None
+            if ingested is not raw_input:
+                return None
+            references.append(
+                {
+                    **reference.model_dump(mode="json", exclude_none=True),
+                    "version": self._source_version(raw_input),
+                }
+            )
+        return references
+
+    def _pinned_raw_inputs(self, tc_data: dict[str, Any]) -> dict[str, Any]:
+        """Changes that pin a test case's raw judge input references to their version.
+
+        Raw judge inputs are pinned once a test case is summarized or annotated:
+        its references record the manifest hash of the ingested data they resolve
+        to, and the data is embedded only when that version is re-ingested or
+        removed, so what was judged can't change or be orphaned. Returns no changes
+        if the test case is already pinned or a referenced raw input is gone.
+        """
+
+        def pin(reference: dict) -> Optional[dict[str, Any]]:
+            if "version" in reference:
+                return reference
+            try:
+                raw_input = self.resolve_raw_input(reference["type"], reference["id"])
+            except ValueError:
+                return None
+            return {**reference, "version": self._source_version(raw_input)}
+
+        references = _raw_input_refs(tc_data)
+        pinned = [pin(reference) for reference in references]
+        if any(reference is None for reference in pinned) or all(
+            reference is original
+            for reference, original in zip(pinned, references, strict=True)
+        ):
+            return {}
+        if tc_data.get("raw_judge_input_ref"):
+            return {"raw_judge_input_ref": pinned[0]}
+        return {"raw_judge_input_refs": pinned}
+
+    def _pinned_config_version(self, tc_data: dict[str, Any]) -> dict[str, Any]:
+        """Changes that pin a test case to the current version of its feedback config.
+
+        Pinned along with its raw judge inputs, so a test case keeps resolving to
+        the rubric it was judged under after the config is edited.
+        """
+        if "feedback_config_version" in tc_data or "feedback_config_id" not in tc_data:
+            return {}
+        return {
+            "feedback_config_version": self.feedback_configs.current_version(
+                tc_data["feedback_config_id"]
             )
-            tc_files = tc_files[:MAX_TEST_CASES]
+        }
+
+    def _embedded_raw_inputs(self, tc_data: dict[str, Any]) -> dict[str, Any]:
+        """Changes that embed a test case's referenced raw judge inputs in it.
 
-        for tc_file in tc_files:
-            test_cases.append(self._load_file(tc_file))
-        return test_cases
+        Returns no changes if the test case has no references, or a referenced raw
+        input is gone or no longer at the version it is pinned to.
+        """
+        missing: list[str] = []
+        raw_inputs = [
+            self._resolve_reference(reference, missing)
+            for reference in _raw_input_refs(tc_data)
+        ]
+        if missing or not raw_inputs:
+            return {}
+        embedded = [
+            self.materialize(raw_input).model_dump(mode="json")
+            for raw_input in raw_inputs
+        ]
+        if tc_data.get("raw_judge_input_ref"):
+            return {"raw_judge_input": embedded[0], "raw_judge_input_ref": None}
+        return {"raw_judge_inputs": embedded, "raw_judge_input_refs": None}
 
-    def _load_file(self, tc_file: Path) -> TestCase:
-        """Load single test case file."""
-        tc_data = json.loads(tc_file.read_text())
+    def _read_data(self, test_case_id: str) -> Optional[dict[str, Any]]:
+        """Read a serialized test case with any journaled changes applied."""
+        # Refresh first: if the journal is compacted between the two reads, the body
+        # already contains the entries and compare-and-swap skips them
+        self.journal.refresh()
+        body = self.store.get(test_case_id)
+        if body is None:
+            return None
+        return self.journal.apply(
+            test_case_id, load_bytes(body), self._batch_entries.get() or ()
+        )
+
+    def _from_data(self, tc_data: dict[str, Any], test_case_id: str) -> TestCase:
+        """Build a test case from serialized data, resolving config and raw judge input references.
+
+        If referenced raw judge inputs are no longer in the ingested data, they are
+        replaced by empty placeholders and the test case is marked invalid, instead
+        of failing to load.
+        """
+        if "feedback_config_id" in tc_data:
+            tc_data["feedback_config"] = self.feedback_configs.get(
+                tc_data.pop("feedback_config_id"),
+                tc_data.pop("feedback_config_version", None),
+            )
+        missing: list[str] = []
+        reference = tc_data.pop("raw_judge_input_ref", None)
+        if reference:
+            tc_data["raw_judge_input"] = self._resolve_reference(reference, missing)
+        references = tc_data.pop("raw_judge_input_refs", None)
+        if references:
+            tc_data["raw_judge_inputs"] = [
+                self._resolve_reference(reference, missing) for reference in references
+            ]
+
+        # Judge inputs were summarized from their test case's raw inputs, which
+        # may be pinned rather than ingested
+        raw_inputs_by_id = {
+            _raw_input_id(raw_input): raw_input
+            for raw_input in [
+                tc_data.get("raw_judge_input"),
+                *(tc_data.get("raw_judge_inputs") or []),
+            ]
+            if raw_input is not None
+        }
+        # Copied before resolving, as they may be shared with cached journal entries
+        if tc_data.get("judge_input"):
+            tc_data["judge_input"] = dict(tc_data["judge_input"])
+        if tc_data.get("judge_inputs"):
+            tc_data["judge_inputs"] = [
+                dict(judge_input) for judge_input in tc_data["judge_inputs"]
+            ]
+        judge_inputs = tc_data.get("judge_inputs") or []
+        if tc_data.get("judge_input"):
+            judge_inputs = [tc_data["judge_input"], *judge_inputs]
+        for judge_input in judge_inputs:
+            if judge_input.get("raw_input") is None:
+                source_id = judge_input["source_ids"][0]
+                judge_input["raw_input"] = raw_inputs_by_id.get(
+                    source_id
+                ) or self._resolve_reference(
+                    {"type": judge_input["source_type"], "id": source_id}, missing
+                )
+
+        if missing and tc_data.get("status") != TestCaseStatus.INVALID.value:
+            print(
+                f"⚠️  Warning: Marking test case {test_case_id} invalid; removed or "
+                f"changed in ingested data: {', '.join(missing)}"
+            )
+            self.mark_as_invalid(
+                test_case_id,
+                reason="Raw judge input removed or changed in ingested data",
+            )
+            tc_data["status"] = TestCaseStatus.INVALID.value
+            tc_data.pop("judge_input", None)
+            tc_data.pop("judge_inputs", None)
+        context = trusted_context(tc_data, self.trusted)
         if tc_data.get("test_case_type") == "pointwise":
-            return PointwiseAnnotationTestCase(**tc_data)
+            return PointwiseAnnotationTestCase.model_validate(tc_data, context=context)
         elif tc_data.get("test_case_type") == "ranking":
-            return RankingAnnotationTestCase(**tc_data)
-        raise ValueError(f"Unknown test case type in {tc_file}")
+            return RankingAnnotationTestCase.model_validate(tc_data, context=context)
+        raise ValueError(f"Unknown test case type in test case {test_case_id}")
 
     def get_test_case(self, test_case_id: str) -> TestCase:
         """Get single test case by ID."""
-        tc_file = self.dir / f"tc_{test_case_id}.json"
-        if not tc_file.exists():
+        tc_data = self._read_data(test_case_id)
+        if tc_data is None:
             raise ValueError(f"Test case not found: {test_case_id}")
-        return self._load_file(tc_file)
+        return self._from_data(tc_data, test_case_id)
 
     def save_test_case(self, test_case: TestCase) -> None:
-        """Save test case to file."""
-        tc_file = self.dir / f"tc_{test_case.test_case_id}.json"
-        data = test_case.model_dump(mode="json")
+        """Save test case to the store.
+
+        The feedback config is stored once per version in the config registry, and
+        referenced by ID (plus the version, once judged). Raw judge inputs
+        of pending test cases (including those of judge inputs) are stored as
+        references into the ingested data rather than as embedded copies, and are
+        resolved again when the test case is loaded; once a test case has been
+        summarized or annotated, its references are pinned to the version of the
+        ingested data it was judged on. Raw judge inputs that are not the ingested
+        ones are embedded.
+        """
         if isinstance(test_case, PointwiseAnnotationTestCase):
+            data = test_case.model_dump(
+                mode="json",
+                exclude={
+                    "feedback_config": True,
+                    "raw_judge_input": True,
+                    "judge_input": {"raw_input"},
+                },
+            )
             data["test_case_type"] = "pointwise"
+            if test_case.status == TestCaseStatus.PENDING:
+                data["raw_judge_input_ref"] = self._reference(
+                    test_case.raw_judge_input
+                ).model_dump(mode="json", exclude_none=True)
+            elif references := self._pinned_references([test_case.raw_judge_input]):
+                data["raw_judge_input_ref"] = references[0]
+            else:
+                data["raw_judge_input"] = self.materialize(
+                    test_case.raw_judge_input
+                ).model_dump(mode="json")
         elif isinstance(test_case, RankingAnnotationTestCase):
+            data = test_case.model_dump(
+                mode="json",
+                exclude={
+                    "feedback_config": True,
+                    "raw_judge_inputs": True,
+                    "judge_inputs": {"__all__": {"raw_input"}},
+                },
+            )
             data["test_case_type"] = "ranking"
-        tc_file.write_text(json.dumps(data, indent=2, default=str))
+            if test_case.status == TestCaseStatus.PENDING:
+                data["raw_judge_input_refs"] = [
+                    self._reference(raw_input).model_dump(
+                        mode="json", exclude_none=True
+                    )
+                    for raw_input in test_case.raw_judge_inputs
+                ]
+            elif references := self._pinned_references(test_case.raw_judge_inputs):
+                data["raw_judge_input_refs"] = references
+            else:
+                data["raw_judge_inputs"] = [
+                    self.materialize(raw_input).model_dump(mode="json")
+                    for raw_input in test_case.raw_judge_inputs
+                ]
+        data["feedback_config_id"] = test_case.feedback_config.id
+        config_version = self.feedback_configs.register(test_case.feedback_config)
+        if test_case.status != TestCaseStatus.PENDING:
+            data["feedback_config_version"] = config_version
+        data["schema_version"] = SCHEMA_VERSION
+        self.store.put(
+            TestCaseHeader.from_data(data),
+            dump_bytes(data, self.serialization_format),
+        )
+        if self._test_case_ids_by_input is not None:
+            self._index_test_case_inputs(test_case.test_case_id, data)
+
+    def get_test_case_ids(
+        self,
+        status: Optional[TestCaseStatus] = None,
+        feedback_config_id: Optional[str] = None,
+        test_case_type: Optional[str] = None,
+        has_ai_annotation: Optional[bool] = None,
+        has_human_annotation: Optional[bool] = None,
+    ) -> list[str]:
+        """List test case IDs matching the given filters without loading test cases."""
+        self.compact_journal()
+        return self.store.list_ids(
+            status=status,
+            feedback_config_id=feedback_config_id,
+            test_case_type=test_case_type,
+            has_ai_annotation=has_ai_annotation,
+            has_human_annotation=has_human_annotation,
+        )
+
+    def get_header(self, test_case_id: str) -> TestCaseHeader:
+        """Get the indexed header fields of a test case without loading it."""
+        self.journal.refresh()
+        if self.journal.get(test_case_id):
+            self.compact_journal()
+        header = self.store.get_header(test_case_id)
+        if header is None:
+            raise ValueError(f"Test case not found: {test_case_id}")
+        return header
 
     def list_test_cases(
         self,
         status: Optional[TestCaseStatus] = None,
         limit: Optional[int] = None,
         offset: int = 0,
+        after: Optional[str] = None,
     ) -> list[TestCase]:
-        """List test cases with optional filtering."""
-        # TODO: don't load all test cases into memory
-        all_cases = self._load_all()
-        if status:
-            all_cases = [tc for tc in all_cases if tc.status == status]
-        return all_cases[offset : offset + limit] if limit else all_cases[offset:]
+        """List test cases with optional filtering, ordered by test case ID.
+
+        For cursor-based pagination, pass the `test_case_id` of the last test case
+        of the previous page as `after`.
+        """
+        self.compact_journal()
+        test_case_ids = self.store.list_ids(
+            status=status,
+            after=after,
+            limit=offset + limit if limit else None,
+        )[offset:]
+        return [self.get_test_case(test_case_id) for test_case_id in test_case_ids]
+
+    def get_oldest_by_status(
+        self, status: TestCaseStatus
+    ) -> tuple[Optional[TestCase], int]:
+        """Get the oldest test case with a status, along with the total count for that status."""
+        while True:
+            self.compact_journal()
+            test_case_ids = self.store.list_ids(
+                status=status, order_by="created_at", limit=1
+            )
+            if not test_case_ids:
+                return None, 0
+            test_case = self.get_test_case(test_case_ids[0])
+            # Otherwise it was just invalidated on load; it won't be listed again
+            if test_case.status == status:
+                status_counts = self.store.count_by_status()
+                return test_case, status_counts[TestCaseStatus(status).value]
+
+    def archive_test_cases(
+        self,
+        test_case_ids: list[str],
+        archive_dir: Path,
+        feedback_config: Optional[FeedbackConfig] = None,
+    ) -> int:
+        """Move test cases out of the collection into an archive directory.
+
+        Archived test cases are self-contained: their feedback config and raw judge
+        inputs are embedded rather than referenced, so they stay readable after
+        the config registry or the ingested data change. Test cases not pinned to
+        a config version embed `feedback_config` if it has their config ID, and
+        otherwise the current version in the registry.
+        """
+        self.compact_journal()
+        if self._test_case_ids_by_input is not None:
+            for test_case_id in test_case_ids:
+                self._unindex_test_case_inputs(test_case_id)
+        return self.store.archive(
+            test_case_ids,
+            archive_dir,
+            render=partial(self._self_contained_body, feedback_config=feedback_config),
+        )
+
+    def _self_contained_body(
+        self,
+        test_case_id: str,
+        body: bytes,
+        feedback_config: Optional[FeedbackConfig] = None,
+    ) -> bytes:
+        """A stored test case with its config and raw judge inputs embedded."""
+        tc_data = self.journal.apply(test_case_id, load_bytes(body))
+        # Dangling references are kept as is
+        tc_data.update(self._embedded_raw_inputs(tc_data))
+        # References of embedded raw judge inputs are None; leave them out
+        for key in ("raw_judge_input_ref", "raw_judge_input_refs"):
+            if tc_data.get(key) is None:
+                tc_data.pop(key, None)
+        config_id = tc_data.pop("feedback_config_id", None)
+        config_version = tc_data.pop("feedback_config_version", None)
+        if config_id is not None:
+            if (
+                config_version is None
+                and feedback_config is not None
+                and feedback_config.id == config_id
+            ):
+                config = feedback_config
+            else:
+                config = self.feedback_configs.get(config_id, config_version)
+            tc_data["feedback_config"] = config.model_dump(mode="json")
+        return dump_bytes(tc_data, detect_format(body))
 
     def create_all_pointwise_test_cases(
         self,
@@ -170,13 +1352,7 @@ class TestCaseCollection:
         feedback_config,
     ) -> list[str]:
         test_case_ids = []
-        limited_inputs = raw_judge_inputs[:MAX_TEST_CASES]
-        if len(raw_judge_inputs) > MAX_TEST_CASES:
-            print(
-                f"⚠️  Limiting pointwise test case creation to {MAX_TEST_CASES} (from {len(raw_judge_inputs)} inputs)"
-            )
-
-        for raw_input in limited_inputs:
+        for raw_input in raw_judge_inputs:
             test_case = PointwiseAnnotationTestCase(
                 feedback_config=feedback_config,
                 granularity=granularity,
@@ -188,19 +1364,122 @@ class TestCaseCollection:
 
         return test_case_ids
 
+    def _get_data(self, test_case_id: str) -> dict[str, Any]:
+        tc_data = self._read_data(test_case_id)
+        if tc_data is None:
+            raise ValueError(f"Test case not found: {test_case_id}")
+        return tc_data
+
+    @contextmanager
+    def _test_case_lock(self, test_case_id: str) -> Iterator[None]:
+        """Hold the advisory lock of a test case across processes."""
+        stripe = zlib.crc32(test_case_id.encode()) % self.LOCK_STRIPES
+        with file_lock(self.dir / ".locks" / f"{stripe:02d}.lock"):
+            yield
+
+    def _record_transition(
+        self, test_case_id: str, tc_data: dict[str, Any], changes: dict[str, Any]
+    ) -> None:
+        """Journal a partial update of a test case instead of rewriting it.
+
+        The update only applies on top of `tc_data`, the version it was computed from.
+        """
+        changes["updated_at"] = datetime.now(timezone.utc).isoformat()
+        entry = self.journal.record(test_case_id, tc_data["updated_at"], changes)
+        batch_entries = self._batch_entries.get()
+        if batch_entries is not None:
+            batch_entries.append(entry)
+            return
+        self.journal.append([entry])
+        if len(self.journal) >= self.journal_compact_every:
+            self.compact_journal()
+
+    @contextmanager
+    def batch_updates(self) -> Iterator[None]:
+        """Commit every state transition made inside the block in one journal write.
+
+        Transitions made by asyncio tasks created inside the block join the batch;
+        other tasks (e.g. concurrent API requests) keep committing immediately.
+        Until the batch is written its transitions are only visible inside it, so
+        a concurrent update of the same test case wins over the batch's instead of
+        being computed on top of it and then lost.
+        """
+        if self._batch_entries.get() is not None:
+            yield
+            return
+        entries: list[dict[str, Any]] = []
+        token = self._batch_entries.set(entries)
+        try:
+            yield
+        finally:
+            self._batch_entries.reset(token)
+            self.journal.append(entries)
+            if len(self.journal) >= self.journal_compact_every:
+                self.compact_journal()
+
+    def compact_journal(self) -> None:
+        """Fold journaled transitions into the store, one write per touched test case."""
+        self.journal.refresh()
+        if not self.journal.pending():
+            return
+        with self.journal.locked():
+            # Another process may have compacted or appended in the meantime
+            self.journal.refresh()
+            for test_case_id in self.journal.pending():
+                body = self.store.get(test_case_id)
+                if body is None:
+                    continue
+                tc_data = load_bytes(body)
+                updated_at = tc_data["updated_at"]
+                self.journal.apply(test_case_id, tc_data)
+                if tc_data["updated_at"] == updated_at:
+                    continue
+                self.store.put(
+                    TestCaseHeader.from_data(tc_data),
+                    dump_bytes(tc_data, self.serialization_format),
+                )
+            self.journal.clear()
+
+    def convert_serialization_format(self) -> int:
+        """Rewrite every stored test case in this collection's serialization format."""
+        self.compact_journal()
+        converted_count = 0
+        for test_case_id in self.store.list_ids():
+            body = self.store.get(test_case_id)
+            if body is None:
+                continue
+            tc_data = load_bytes(body)
+            self.store.put(
+                TestCaseHeader.from_data(tc_data),
+                dump_bytes(tc_data, self.serialization_format),
+            )
+            converted_count += 1
+        return converted_count
+
     def update_judge_input(
         self,
         test_case_id: str,
         judge_input: JudgeInput,
     ) -> None:
         """Add summarized judge input to pointwise test case."""
-        tc = self.get_test_case(test_case_id)
-        if not isinstance(tc, PointwiseAnnotationTestCase):
-            raise ValueError(f"Test case {test_case_id} is not a pointwise test case")
-        tc.judge_input = judge_input
-        tc.status = TestCaseStatus.SUMMARIZED
-        tc.updated_at = datetime.now(timezone.utc)
-        self.save_test_case(tc)
+        with self._test_case_lock(test_case_id):
+            tc_data = self._get_data(test_case_id)
+            if tc_data.get("test_case_type") != "pointwise":
+                raise ValueError(
+                    f"Test case {test_case_id} is not a pointwise test case"
+                )
+            self._record_transition(
+                test_case_id,
+                tc_data,
+                {
+                    "judge_input": judge_input.model_dump(
+                        mode="json", exclude={"raw_input"}
+                    ),
+                    "status": TestCaseStatus.SUMMARIZED.value,
+                    **self._pinned_raw_inputs(tc_data),
+                    **self._pinned_config_version(tc_data),
+                },
+            )
 
     def update_judge_inputs(
         self,
@@ -208,13 +1487,23 @@ class TestCaseCollection:
         judge_inputs: list[JudgeInput],
     ) -> None:
         """Add summarized judge inputs to ranking test case."""
-        tc = self.get_test_case(test_case_id)
-        if not isinstance(tc, RankingAnnotationTestCase):
-            raise ValueError(f"Test case {test_case_id} is not a ranking test case")
-        tc.judge_inputs = judge_inputs
-        tc.status = TestCaseStatus.SUMMARIZED
-        tc.updated_at = datetime.now(timezone.utc)
-        self.save_test_case(tc)
+        with self._test_case_lock(test_case_id):
+            tc_data = self._get_data(test_case_id)
+            if tc_data.get("test_case_type") != "ranking":
+                raise ValueError(f"Test case {test_case_id} is not a ranking test case")
+            self._record_transition(
+                test_case_id,
+                tc_data,
+                {
+                    "judge_inputs": [
+                        judge_input.model_dump(mode="json", exclude={"raw_input"})
+                        for judge_input in judge_inputs
+                    ],
+                    "status": TestCaseStatus.SUMMARIZED.value,
+                    **self._pinned_raw_inputs(tc_data),
+                    **self._pinned_config_version(tc_data),
+                },
+            )
 
     def update_ai_annotation(
         self,
@@ -222,12 +1511,16 @@ class TestCaseCollection:
         ai_annotation: Annotation,
     ) -> None:
         """Add AI judge annotation to test case."""
-        tc = self.get_test_case(test_case_id)
-        tc.ai_annotation = ai_annotation
-        if tc.status != TestCaseStatus.HUMAN_ANNOTATED:
-            tc.status = TestCaseStatus.AI_ANNOTATED
-        tc.updated_at = datetime.now(timezone.utc)
-        self.save_test_case(tc)
+        with self._test_case_lock(test_case_id):
+            tc_data = self._get_data(test_case_id)
+            changes = {
+                "ai_annotation": ai_annotation.model_dump(mode="json"),
+                **self._pinned_raw_inputs(tc_data),
+                **self._pinned_config_version(tc_data),
+            }
+            if tc_data["status"] != TestCaseStatus.HUMAN_ANNOTATED:
+                changes["status"] = TestCaseStatus.AI_ANNOTATED.value
+            self._record_transition(test_case_id, tc_data, changes)
 
     def update_human_annotation(
         self,
@@ -235,32 +1528,27 @@ class TestCaseCollection:
         human_annotation: Annotation,
     ) -> None:
         """Add human annotation to test case."""
-        tc = self.get_test_case(test_case_id)
-        tc.human_annotation = human_annotation
-        tc.status = TestCaseStatus.HUMAN_ANNOTATED
-        tc.updated_at = datetime.now(timezone.utc)
-        self.save_test_case(tc)
+        with self._test_case_lock(test_case_id):
+            tc_data = self._get_data(test_case_id)
+            self._record_transition(
+                test_case_id,
+                tc_data,
+                {
+                    "human_annotation": human_annotation.model_dump(mode="json"),
+                    "status": TestCaseStatus.HUMAN_ANNOTATED.value,
+                    **self._pinned_raw_inputs(tc_data),
+                    **self._pinned_config_version(tc_data),
+                },
+            )
 
     def get_by_status(self, status: TestCaseStatus) -> list[TestCase]:
         """Get all test cases with a specific status."""
-        test_cases = self.list_test_cases(status=status)
-        return test_cases
+        return list(self.iter_test_cases(status=status))
 
     def count_by_status(self) -> dict[str, int]:
         """Get count of test cases by status."""
-        all_cases = self._load_all()
-        counts: dict[str, int] = {
-            TestCaseStatus.PENDING: 0,
-            TestCaseStatus.SUMMARIZED: 0,
-            TestCaseStatus.AI_ANNOTATED: 0,
-            TestCaseStatus.HUMAN_ANNOTATED: 0,
-            TestCaseStatus.INVALID: 0,
-        }
-        for tc in all_cases:
-            status = tc.status
-            if status in counts:
-                counts[status] += 1
-        return counts
+        self.compact_journal()
+        return self.store.count_by_status()
 
     def create_ranking_test_cases(
         self,
@@ -268,16 +1556,20 @@ class TestCaseCollection:
         comparison_items: int,
         feedback_config,
     ) -> list[str]:
-        combos = list(combinations(raw_judge_inputs, comparison_items))
-
-        limited_combos = combos[:MAX_TEST_CASES]
-        if len(combos) > MAX_TEST_CASES:
-            print(
-                f"⚠️  Limiting ranking test case creation to {MAX_TEST_CASES} (from {len(combos)} combinations)"
-            )
+        return self._save_ranking_test_cases(
+            combinations(raw_judge_inputs, comparison_items),
+            comparison_items,
+            feedback_config,
+        )
 
+    def _save_ranking_test_cases(
+        self,
+        combos: Iterable[tuple[RawJudgeInput, ...]],
+        comparison_items: int,
+        feedback_config,
+    ) -> list[str]:
         test_case_ids = []
-        for combo in limited_combos:
+        for combo in combos:
             test_case = RankingAnnotationTestCase(
                 granularity=feedback_config.granularity,
                 feedback_config=feedback_config,
@@ -291,50 +1583,16 @@ class TestCaseCollection:
         return test_case_ids
 
     def get_pointwise_test_cases(self) -> list[PointwiseAnnotationTestCase]:
-        """Get all pointwise test cases, limited to MAX_TEST_CASES for memory management."""
-        pointwise_files = []
-        for tc_file in sorted(self.dir.glob("tc_*.json")):
-            # Quick check of file content to see if it's pointwise without loading full object
-            tc_data = json.loads(tc_file.read_text())
-            if tc_data.get("test_case_type") == "pointwise":
-                pointwise_files.append(tc_file)
-                if len(pointwise_files) >= MAX_TEST_CASES:
-                    break
-
-        if len(pointwise_files) > MAX_TEST_CASES:
-            print(
-                f"⚠️  Found {len(pointwise_files)} pointwise test cases, loading only first {MAX_TEST_CASES} for memory management"
-            )
-            pointwise_files = pointwise_files[:MAX_TEST_CASES]
-
-        return [
-            tc
-            for tc in [self._load_file(tc_file) for tc_file in pointwise_files]
-            if tc is not None
-        ]
+        """Get all pointwise test cases."""
+        return list(self.iter_test_cases(test_case_type="pointwise"))
 
     def get_ranking_test_cases(self) -> list[RankingAnnotationTestCase]:
-        """Get all ranking test cases, limited to MAX_TEST_CASES for memory management."""
-        ranking_files = []
-        for tc_file in sorted(self.dir.glob("tc_*.json")):
-            # Quick check of file content to see if it's ranking without loading full object
-            tc_data = json.loads(tc_file.read_text())
-            if tc_data.get("test_case_type") == "ranking":
-                ranking_files.append(tc_file)
-                if len(ranking_files) >= MAX_TEST_CASES:
-                    break
-
-        if len(ranking_files) > MAX_TEST_CASES:
-            print(
-                f"⚠️  Found {len(ranking_files)} ranking test cases, loading only first {MAX_TEST_CASES} for memory management"
-            )
-            ranking_files = ranking_files[:MAX_TEST_CASES]
-
-        return [self._load_file(tc_file) for tc_file in ranking_files]
+        """Get all ranking test cases."""
+        return list(self.iter_test_cases(test_case_type="ranking"))
 
     def get_test_cases_by_config(self, config_id: str) -> list[TestCase]:
         """Get all test cases for a specific config ID."""
-        return [tc for tc in self._load_all() if tc.feedback_config.id == config_id]
+        return list(self.iter_test_cases(feedback_config_id=config_id))
 
     def _find(self, test_case_id: str) -> TestCase:
         """Internal method to find a test case by ID (for backward compatibility)."""
@@ -344,42 +1602,42 @@ class TestCaseCollection:
         self, config_id: str
     ) -> list[PointwiseAnnotationTestCase]:
         """Get pointwise test cases for a specific config ID."""
-        return [
-            tc
-            for tc in self.get_pointwise_test_cases()
-            if tc.feedback_config.id == config_id
-        ]
+        return list(
+            self.iter_test_cases(
+                feedback_config_id=config_id, test_case_type="pointwise"
+            )
+        )
 
     def get_ranking_by_config(self, config_id: str) -> list[RankingAnnotationTestCase]:
         """Get ranking test cases for a specific config ID."""
-        return [
-            tc
-            for tc in self.get_ranking_test_cases()
-            if tc.feedback_config.id == config_id
-        ]
+        return list(
+            self.iter_test_cases(feedback_config_id=config_id, test_case_type="ranking")
+        )
 
     def get_status(self, test_case_id: str) -> TestCaseStatus:
         """Get the status of a test case."""
-        tc = self.get_test_case(test_case_id)
-        return tc.status
+        return self.get_header(test_case_id).status
 
     def has_ai_annotation(self, test_case_id: str) -> bool:
         """Check if a test case has an AI annotation."""
-        tc = self.get_test_case(test_case_id)
-        return tc.ai_annotation is not None
+        return self.get_header(test_case_id).has_ai_annotation
 
     def mark_as_invalid(
         self, test_case_id: str, reason: str = "Required fields not available"
     ) -> None:
         """Mark a test case as invalid (skipped due to missing required fields)."""
-        tc = self.get_test_case(test_case_id)
-        tc.status = TestCaseStatus.INVALID
-        if isinstance(tc, RankingAnnotationTestCase):
-            tc.judge_inputs = None
-        else:
-            tc.judge_input = None
-        tc.updated_at = datetime.now(timezone.utc)
-        self.save_test_case(tc)
+        with self._test_case_lock(test_case_id):
+            tc_data = self._get_data(test_case_id)
+            judge_input_field = (
+                "judge_inputs"
+                if tc_data.get("test_case_type") == "ranking"
+                else "judge_input"
+            )
+            self._record_transition(
+                test_case_id,
+                tc_data,
+                {"status": TestCaseStatus.INVALID.value, judge_input_field: None},
+            )
 
     def filter_raw_judge_inputs(
         self,
@@ -395,37 +1653,79 @@ class TestCaseCollection:
         Returns:
             List of filtered raw judge inputs that match all attribute matchers
         """
-        if not feedback_config.attribute_matchers:
+        if not feedback_config.attribute_matchers and not feedback_config.time_range:
             return raw_judge_inputs
 
+        matchers = feedback_config.attribute_matchers
+        candidates = self._time_range_candidates(
+            raw_judge_inputs, feedback_config.time_range
+        )
+        if raw_judge_inputs is self._steps and self._step_columns is not None:
+            # Scan the hot field columns for matchers on those fields, and only
+            # check the remaining matchers on the steps that pass them
+            candidates, matchers = self._step_columns.select(matchers, candidates)
+
+        # Matchers on step payloads run last, on materialized copies
+        payload_matchers = []
+        if self._payloads is not None:
+            payload_matchers = [
+                matcher
+                for matcher in matchers
+                if needs_payloads(matcher.attribute_path)
+            ]
+            matchers = [
+                matcher for matcher in matchers if matcher not in payload_matchers
+            ]
+
         filtered_inputs = []
-        for raw_input in raw_judge_inputs:
-            passes_all = all(
-                matcher.matches(raw_input)
-                for matcher in feedback_config.attribute_matchers
-            )
+        for index in candidates:
+            raw_input = raw_judge_inputs[index]
+            passes_all = all(matcher.matches(raw_input) for matcher in matchers)
+            if passes_all and payload_matchers:
+                materialized = self.materialize(raw_input)
+                passes_all = all(
+                    matcher.matches(materialized) for matcher in payload_matchers
+                )
             if passes_all:
                 filtered_inputs.append(raw_input)
 
         return filtered_inputs
 
+    def _time_range_candidates(
+        self,
+        raw_judge_inputs: list[RawJudgeInput],
+        time_range: Optional[TimeRangeMatcher],
+    ) -> list[int]:
+        """Positions in `raw_judge_inputs`, in list order, of the inputs in `time_range`."""
+        if time_range is None:
+            return list(range(len(raw_judge_inputs)))
+        now_ns = time.time_ns()
+        for granularity in ("step", "interaction", "group"):
+            # Ingested inputs are looked up in the time index rather than scanned
+            if raw_judge_inputs is self.get_raw_judge_inputs(granularity):
+                return sorted(
+                    self._time_index(granularity).positions_between(
+                        *time_range.bounds(now_ns)
+                    )
+                )
+        return [
+            index
+            for index, raw_input in enumerate(raw_judge_inputs)
+            if time_range.matches(raw_input, now_ns)
+        ]
+
     def initialize_test_cases_for_config(
         self,
         raw_judge_inputs: list[RawJudgeInput],
         feedback_config,
     ) -> dict[str, list[str]]:
-        existing_test_cases = self.get_test_cases_by_config(feedback_config.id)
-        if len(existing_test_cases) > 0:
-            pointwise = [
-                tc.test_case_id
-                for tc in existing_test_cases
-                if isinstance(tc, PointwiseAnnotationTestCase)
-            ]
-            ranking = [
-                tc.test_case_id
-                for tc in existing_test_cases
-                if isinstance(tc, RankingAnnotationTestCase)
-            ]
+        pointwise = self.get_test_case_ids(
+            feedback_config_id=feedback_config.id, test_case_type="pointwise"
+        )
+        ranking = self.get_test_case_ids(
+            feedback_config_id=feedback_config.id, test_case_type="ranking"
+        )
+        if pointwise or ranking:
             return {"pointwise": pointwise, "ranking": ranking}
 
         filtered_inputs = self.filter_raw_judge_inputs(
@@ -446,3 +1746,49 @@ class TestCaseCollection:
                 feedback_config=feedback_config,
             )
             return {"pointwise": pointwise_ids, "ranking": []}
+
+    def initialize_test_cases_for_new_inputs(
+        self,
+        new_raw_judge_inputs: list[RawJudgeInput],
+        raw_judge_inputs: list[RawJudgeInput],
+        feedback_config,
+    ) -> dict[str, list[str]]:
+        """Create test cases for raw judge inputs added by `reload_ingested_data`.
+
+        Pointwise configs get one test case per new matching input. Ranking configs
+        get every combination that includes at least one new matching input, drawing
+        the rest from the matching inputs already in `raw_judge_inputs`.
+        """
+        new_inputs = self.filter_raw_judge_inputs(new_raw_judge_inputs, feedback_config)
+        if not new_inputs:
+            return {"pointwise": [], "ranking": []}
+
+        if isinstance(feedback_config.feedback_spec, RankingSpec):
+            comparison_items = feedback_config.feedback_spec.comparison_items
+            new_ids = {raw_input.id for raw_input in new_inputs}
+            existing_inputs = [
+                raw_input
+                for raw_input in self.filter_raw_judge_inputs(
+                    raw_judge_inputs, feedback_config
+                )
+                if raw_input.id not in new_ids
+            ]
+            combos = (
+                existing_combo + new_combo
+                for new_count in range(1, comparison_items + 1)
+                for new_combo in combinations(new_inputs, new_count)
+                for existing_combo in combinations(
+                    existing_inputs, comparison_items - new_count
+                )
+            )
+            ranking_ids = self._save_ranking_test_cases(
+                combos, comparison_items, feedback_config
+            )
+            return {"pointwise": [], "ranking": ranking_ids}
+        else:
+            pointwise_ids = self.create_all_pointwise_test_cases(
+                new_inputs,
+                granularity=feedback_config.granularity,
+                feedback_config=feedback_config,
+            )
+            return {"pointwise": pointwise_ids, "ranking": []}
@@ -0,0 +1,190 @@
+"""Append-only journal of test case state transitions.
+
+Each journal entry is a partial update of a serialized test case (for example a new
+status plus an AI annotation). Entries are appended in batches and periodically
+compacted into the test case store, so a transition costs one small append instead
+of a full rewrite of the test case.
+
+Entries are compare-and-swap updates: each records the `updated_at` of the version
+it was computed from and only applies on top of exactly that version. Replaying the
+journal over a store that already contains some of its entries is therefore a
+no-op for those entries, and when several processes update the same test case
+concurrently the first update appended wins instead of silently overwriting it.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Iterable, Iterator, Optional
+
+from ._file_utils import file_lock
+
+
+def _parse_timestamp(timestamp: str) -> datetime:
+    # datetime.fromisoformat only accepts a trailing "Z" from Python 3.11
+    return datetime.fromisoformat(timestamp.replace("Z", "+00:00"))
+
+
+def is_newer(changes: dict[str, Any], tc_data: dict[str, Any]) -> bool:
+    """Whether a journaled change is at least as recent as a serialized test case."""
+    return _parse_timestamp(changes["updated_at"]) >= _parse_timestamp(
+        tc_data["updated_at"]
+    )
+
+
+def _applies_to(entry: dict[str, Any], tc_data: dict[str, Any]) -> bool:
+    expected = entry.get("expected_updated_at")
+    if expected is None:
+        # Entries journaled before compare-and-swap was introduced
+        return is_newer(entry["changes"], tc_data)
+    return _parse_timestamp(expected) == _parse_timestamp(tc_data["updated_at"])
+
+
+class TestCaseJournal:
+    """A JSONL journal plus an in-memory view of the entries not yet compacted.
+
+    The view is kept in sync with appends made by other processes through
+    `refresh`, and all appends and compactions are serialized by a lock file next
+    to the journal.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.lock_path = path.with_suffix(".lock")
+        self._entries: dict[str, list[dict[str, Any]]] = {}
+        self._num_entries = 0
+        self._offset = 0
+        self._inode: Optional[int] = None
+        self.refresh()
+
+    def _reset(self) -> None:
+        self._entries = {}
+        self._num_entries = 0
+        self._offset = 0
+        self._inode = None
+
+    def refresh(self) -> None:
+        """Pick up entries appended since the last read, e.g. by another process.
+
+        If the journal was compacted and removed in the meantime, the in-memory view
+        is rebuilt from whatever the journal contains now.
+        """
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            self._reset()
+            return
+        if stat.st_ino != self._inode or stat.st_size < self._offset:
+            self._reset()
+            self._inode = stat.st_ino
+        if stat.st_size == self._offset:
+            return
+        with open(self.path, "rb") as f:
+            f.seek(self._offset)
+            data = f.read()
+        # Leave a partially appended final line for the next refresh
+        end = data.rfind(b"\n") + 1
+        for line in data[:end].splitlines():
+            if not line.strip():
+                continue
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                # A torn line from an append interrupted by a crash
+                continue
+            self._apply(entry)
+        self._offset += end
+
+    def _apply(self, entry: dict[str, Any]) -> None:
+        self._entries.setdefault(entry["test_case_id"], []).append(entry)
+        self._num_entries += 1
+
+    def __len__(self) -> int:
+        return self._num_entries
+
+    def record(
+        self,
+        test_case_id: str,
+        expected_updated_at: str,
+        changes: dict[str, Any],
+    ) -> dict[str, Any]:
+        """Build the entry to append for a change.
+
+        The change only applies to the version of the test case last updated at
+        `expected_updated_at`. It is not visible to `get` and `apply` until it has
+        been appended.
+        """
+        return {
+            "test_case_id": test_case_id,
+            "expected_updated_at": expected_updated_at,
+            "changes": changes,
+        }
+
+    @contextmanager
+    def locked(self) -> Iterator[None]:
+        """Exclude appends and compactions by other processes while held."""
+        with file_lock(self.lock_path):
+            yield
+
+    def append(self, entries: list[dict[str, Any]]) -> None:
+        """Durably append recorded entries to the journal in a single write."""
+        if not entries:
+            return
+        data = "".join(
+            json.dumps(entry, separators=(",", ":")) + "\n" for entry in entries
+        ).encode()
+        with self.locked():
+            self.refresh()
+            with open(self.path, "ab") as f:
+                if f.tell() > self._offset:
+                    # Terminate a torn line so it can't swallow the first entry
+                    data = b"\n" + data
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+                self._inode = os.fstat(f.fileno()).st_ino
+                self._offset = f.tell()
+        for entry in entries:
+            self._apply(entry)
+
+    def get(self, test_case_id: str) -> list[dict[str, Any]]:
+        """The appended entries for a test case not yet compacted, in the order they apply."""
+        return self._entries.get(test_case_id, [])
+
+    def apply(
+        self,
+        test_case_id: str,
+        tc_data: dict[str, Any],
+        unappended: Iterable[dict[str, Any]] = (),
+    ) -> dict[str, Any]:
+        """Apply a test case's entries to its serialized data, skipping stale ones.
+
+        Only appended entries are applied, plus those of `unappended` (the caller's
+        own batch, recorded but not appended yet) for this test case. Entries of
+        other batches are never seen, so no update is computed on top of a change
+        that may still be lost or rejected.
+        """
+        entries = [
+            *self.get(test_case_id),
+            *(entry for entry in unappended if entry["test_case_id"] == test_case_id),
+        ]
+        for entry in entries:
+            if _applies_to(entry, tc_data):
+                tc_data.update(entry["changes"])
+        return tc_data
+
+    def pending(self) -> list[str]:
+        """IDs of the test cases with appended entries not yet compacted."""
+        return list(self._entries)
+
+    def clear(self) -> None:
+        """Drop all appended entries once they have been compacted into the store.
+
+        Must be called while holding `locked()`, right after compacting.
+        """
+        self._reset()
+        self.path.unlink(missing_ok=True)
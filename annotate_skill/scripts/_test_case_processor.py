@@ -44,22 +44,12 @@ class TestCaseProcessor:
         self, test_case: PointwiseAnnotationTestCase | RankingAnnotationTestCase
     ) -> Union[Interaction, InteractionGroup, None]:
         if self.feedback_config.requires_context == "interaction":
-            return next(
-                (
-                    interaction
-                    for interaction in self.interactions
-                    if interaction.id == test_case.raw_judge_input.interaction_id
-                ),
-                None,
+            return self.test_case_collection.get_interaction(
+                test_case.raw_judge_input.interaction_id
             )
         elif self.feedback_config.requires_context == "group":
-            return next(
-                (
-                    group
-                    for group in self.groups
-                    if group.id == test_case.raw_judge_input.group_id
-                ),
-                None,
+            return self.test_case_collection.get_group(
+                test_case.raw_judge_input.group_id
             )
         else:
             return None
@@ -80,8 +70,12 @@ class TestCaseProcessor:
                     for raw_judge_input in tc.raw_judge_inputs:
                         judge_input = await summarize_for_judge_input(
                             input_items=self.feedback_config.input_items,
-                            raw_input=raw_judge_input,
-                            raw_input_context=self.get_context(tc),
+                            raw_input=self.test_case_collection.materialize(
+                                raw_judge_input
+                            ),
+                            raw_input_context=self.test_case_collection.materialize(
+                                self.get_context(tc)
+                            ),
                             attribute_matchers=self.feedback_config.attribute_matchers,
                             natural_language_disqualifier=self.feedback_config.natural_language_disqualifier,
                         )
@@ -101,8 +95,12 @@ class TestCaseProcessor:
                 elif isinstance(tc, PointwiseAnnotationTestCase) and not tc.judge_input:
                     judge_input = await summarize_for_judge_input(
                         input_items=self.feedback_config.input_items,
-                        raw_input=tc.raw_judge_input,
-                        raw_input_context=self.get_context(tc),
+                        raw_input=self.test_case_collection.materialize(
+                            tc.raw_judge_input
+                        ),
+                        raw_input_context=self.test_case_collection.materialize(
+                            self.get_context(tc)
+                        ),
                         attribute_matchers=self.feedback_config.attribute_matchers,
                         natural_language_disqualifier=self.feedback_config.natural_language_disqualifier,
                     )
@@ -145,22 +143,25 @@ class TestCaseProcessor:
 
         for i in range(0, len(test_cases), max_concurrent):
             batch = test_cases[i : i + max_concurrent]
-            await asyncio.gather(*[process_single(tc) for tc in batch])
+            with self.test_case_collection.batch_updates():
+                await asyncio.gather(*[process_single(tc) for tc in batch])
 
         return results
 
     async def run(
         self,
         poll_interval: float = 5.0,
+        batch_size: int = 100,
     ) -> None:
         while True:
-            pending = self.test_case_collection.get_by_status(TestCaseStatus.PENDING)
-            summarized = self.test_case_collection.get_by_status(
-                TestCaseStatus.SUMMARIZED
-            )
-            all_to_process = summarized + pending
-
-            if all_to_process:
-                await self.process_batch(all_to_process)
+            for status in (TestCaseStatus.SUMMARIZED, TestCaseStatus.PENDING):
+                batch = []
+                for tc in self.test_case_collection.iter_test_cases(status=status):
+                    batch.append(tc)
+                    if len(batch) >= batch_size:
+                        await self.process_batch(batch)
+                        batch = []
+                if batch:
+                    await self.process_batch(batch)
 
             await asyncio.sleep(poll_interval)
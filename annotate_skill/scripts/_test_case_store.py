@@ -0,0 +1,765 @@
+"""Storage backends for test cases.
+
+A store persists serialized test case bodies alongside a small header of indexed
+fields (status, config ID, type, timestamps, annotation presence) so that listing
+and counting never needs to parse full test case bodies.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import heapq
+import json
+import os
+import shutil
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from datetime import datetime
+from operator import attrgetter
+from pathlib import Path
+from typing import Any, Callable, Literal, Optional
+
+from pydantic import BaseModel
+
+from ._file_utils import atomic_write_bytes, file_lock
+from ._models import (
+    SCHEMA_VERSION,
+    SERIALIZATION_EXTENSIONS,
+    FeedbackConfig,
+    SerializationFormat,
+    TestCaseStatus,
+    detect_format,
+    load_bytes,
+    trusted_context,
+)
+
+TestCaseStoreKind = Literal["file", "sqlite"]
+
+
+class TestCaseHeader(BaseModel):
+    """Indexed fields of a test case, stored next to its serialized body."""
+
+    test_case_id: str
+    test_case_type: Literal["pointwise", "ranking"]
+    status: TestCaseStatus
+    feedback_config_id: str
+    created_at: datetime
+    updated_at: datetime
+    has_ai_annotation: bool = False
+    has_human_annotation: bool = False
+    size_bytes: int = 0
+
+    @classmethod
+    def from_data(cls, tc_data: dict, size_bytes: int = 0) -> "TestCaseHeader":
+        """Read the header fields of a serialized test case."""
+        return cls(
+            test_case_id=tc_data["test_case_id"],
+            test_case_type=tc_data["test_case_type"],
+            status=tc_data["status"],
+            feedback_config_id=(
+                tc_data["feedback_config_id"]
+                if "feedback_config_id" in tc_data
+                else tc_data["feedback_config"]["id"]
+            ),
+            created_at=tc_data["created_at"],
+            updated_at=tc_data["updated_at"],
+            has_ai_annotation=tc_data.get("ai_annotation") is not None,
+            has_human_annotation=tc_data.get("human_annotation") is not None,
+            size_bytes=size_bytes,
+        )
+
+
+# Turns a stored test case body into the bytes written to the archive
+ArchiveRenderer = Callable[[str, bytes], bytes]
+
+
+def _empty_status_counts() -> dict[str, int]:
+    return {status: 0 for status in TestCaseStatus}
+
+
+class TestCaseStore(ABC):
+    """Interface implemented by every test case storage backend."""
+
+    @abstractmethod
+    def get(self, test_case_id: str) -> Optional[bytes]:
+        """Return the serialized body of a test case, or None if it doesn't exist."""
+
+    @abstractmethod
+    def put(self, header: TestCaseHeader, body: bytes) -> None:
+        """Insert or replace a test case."""
+
+    @abstractmethod
+    def delete(self, test_case_id: str) -> None:
+        """Remove a test case if it exists."""
+
+    @abstractmethod
+    def get_header(self, test_case_id: str) -> Optional[TestCaseHeader]:
+        """Return the indexed header of a test case, or None if it doesn't exist."""
+
+    @abstractmethod
+    def list_ids(
+        self,
+        status: Optional[TestCaseStatus] = None,
+        feedback_config_id: Optional[str] = None,
+        test_case_type: Optional[str] = None,
+        has_ai_annotation: Optional[bool] = None,
+        has_human_annotation: Optional[bool] = None,
+        order_by: Literal["test_case_id", "created_at"] = "test_case_id",
+        after: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> list[str]:
+        """List IDs of test cases matching all of the given filters.
+
+        `after` and `limit` page through results ordered by test case ID: pass the
+        last ID of the previous page as `after` to get the next page.
+        """
+
+    @abstractmethod
+    def count_by_status(self) -> dict[str, int]:
+        """Count test cases per status."""
+
+    @abstractmethod
+    def archive(
+        self,
+        test_case_ids: list[str],
+        archive_dir: Path,
+        render: Optional[ArchiveRenderer] = None,
+    ) -> int:
+        """Move test cases out of the store into `archive_dir` as tc_{id} files.
+
+        With `render`, each archived file holds `render(test_case_id, body)` instead
+        of the stored body.
+        """
+
+
+def test_case_file_id(tc_file: Path) -> Optional[str]:
+    """The test case ID of a `tc_{id}` file in any serialization format."""
+    for extension in set(SERIALIZATION_EXTENSIONS.values()):
+        if tc_file.name.endswith(extension):
+            return tc_file.name[len("tc_") : -len(extension)]
+    return None
+
+
+class FileTestCaseStore(TestCaseStore):
+    """One `tc_{id}.json` file per test case; the original on-disk layout.
+
+    Headers are kept in memory and persisted to an append-only `index.jsonl`
+    sidecar (last record per test case wins), so filtering and counting never
+    open the test case files themselves.
+
+    New files get the extension of `serialization_format` (e.g. `tc_{id}.msgpack`);
+    files in other formats are still read, and replaced when next written.
+
+    Test case files are replaced atomically, and index appends are serialized by a
+    lock file; records appended by other processes are picked up before each query.
+    """
+
+    INDEX_FILENAME = "index.jsonl"
+    LOCK_FILENAME = "index.lock"
+
+    def __init__(
+        self, directory: Path, serialization_format: SerializationFormat = "json"
+    ):
+        self.dir = directory
+        self.extension = SERIALIZATION_EXTENSIONS[serialization_format]
+        self.index_path = directory / self.INDEX_FILENAME
+        self.lock_path = directory / self.LOCK_FILENAME
+        self._headers: dict[str, TestCaseHeader] = {}
+        self._paths: dict[str, Path] = {}
+        self._index_records = 0
+        self._index_offset = 0
+        self._index_inode: Optional[int] = None
+        self._load_index()
+
+    def _path(self, test_case_id: str) -> Path:
+        path = self._paths.get(test_case_id)
+        if path is None:
+            path = self.dir / f"tc_{test_case_id}{self.extension}"
+        return path
+
+    def _find_path(self, test_case_id: str) -> Optional[Path]:
+        """Locate a test case file, which another process may have written in another format."""
+        path = self._path(test_case_id)
+        if path.exists():
+            return path
+        for extension in set(SERIALIZATION_EXTENSIONS.values()):
+            candidate = self.dir / f"tc_{test_case_id}{extension}"
+            if candidate.exists():
+                self._paths[test_case_id] = candidate
+                return candidate
+        return None
+
+    def _read_header(self, tc_file: Path) -> TestCaseHeader:
+        body = tc_file.read_bytes()
+        return TestCaseHeader.from_data(load_bytes(body), size_bytes=len(body))
+
+    def _refresh_index(self) -> None:
+        """Apply index records appended since the last read, e.g. by another process."""
+        try:
+            stat = os.stat(self.index_path)
+        except FileNotFoundError:
+            return
+        if stat.st_ino != self._index_inode or stat.st_size < self._index_offset:
+            # Rewritten, possibly by another process: reload from the start
+            self._headers = {}
+            self._index_records = 0
+            self._index_offset = 0
+            self._index_inode = stat.st_ino
+        if stat.st_size == self._index_offset:
+            return
+        with open(self.index_path, "rb") as f:
+            f.seek(self._index_offset)
+            data = f.read()
+        # Leave a partially appended final line for the next refresh
+        end = data.rfind(b"\n") + 1
+        for line in data[:end].splitlines():
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # A torn line from an append interrupted by a crash
+                continue
+            self._apply_index_record(record)
+        self._index_offset += end
+
+    def _load_index(self) -> None:
+        """Load the sidecar index and reconcile it with the test case files on disk."""
+        with file_lock(self.lock_path):
+            self._refresh_index()
+            self._reconcile_index()
+
+    def _reconcile_index(self) -> None:
+        # Pick up files written or edited without going through the index
+        stale = False
+        on_disk = set()
+        for tc_file in self.dir.glob("tc_*"):
+            test_case_id = test_case_file_id(tc_file)
+            if test_case_id is None:
+                continue
+            header = self._headers.get(test_case_id)
+            try:
+                if header is None or header.size_bytes != tc_file.stat().st_size:
+                    self._headers[test_case_id] = self._read_header(tc_file)
+                    stale = True
+            except FileNotFoundError:
+                # Archived or rewritten by another process while scanning
+                continue
+            on_disk.add(test_case_id)
+            self._paths[test_case_id] = tc_file
+        for test_case_id in set(self._headers) - on_disk:
+            del self._headers[test_case_id]
+            stale = True
+        if stale:
+            self._rewrite_index()
+
+    def _apply_index_record(self, record: dict) -> None:
+        self._index_records += 1
+        if record.get("deleted"):
+            self._headers.pop(record["test_case_id"], None)
+        else:
+            self._headers[record["test_case_id"]] = TestCaseHeader(**record)
+
+    def _append_index_records(self, records: list[dict]) -> None:
+        if not records:
+            return
+        data = "".join(json.dumps(record) + "\n" for record in records).encode()
+        with file_lock(self.lock_path):
+            self._refresh_index()
+            with open(self.index_path, "ab") as f:
+                if f.tell() > self._index_offset:
+                    # Terminate a torn line so it can't swallow the first record
+                    data = b"\n" + data
+                f.write(data)
+                self._index_inode = os.fstat(f.fileno()).st_ino
+                self._index_offset = f.tell()
+            for record in records:
+                self._apply_index_record(record)
+            # Superseded records only cost disk and startup time; drop them occasionally
+            if self._index_records > 2 * len(self._headers) + 1000:
+                self._rewrite_index()
+
+    def _rewrite_index(self) -> None:
+        """Replace the index with one record per test case; the index lock must be held."""
+        data = "".join(
+            header.model_dump_json() + "\n" for header in self._headers.values()
+        ).encode()
+        atomic_write_bytes(self.index_path, data)
+        stat = os.stat(self.index_path)
+        self._index_inode = stat.st_ino
+        self._index_offset = stat.st_size
+        self._index_records = len(self._headers)
+
+    def get(self, test_case_id: str) -> Optional[bytes]:
+        tc_file = self._find_path(test_case_id)
+        if tc_file is None:
+            return None
+        try:
+            return tc_file.read_bytes()
+        except FileNotFoundError:
+            # Archived or rewritten in another format by another process
+            return None
+
+    def get_header(self, test_case_id: str) -> Optional[TestCaseHeader]:
+        self._refresh_index()
+        return self._headers.get(test_case_id)
+
+    def put(self, header: TestCaseHeader, body: bytes) -> None:
+        tc_file = self.dir / f"tc_{header.test_case_id}{self.extension}"
+        atomic_write_bytes(tc_file, body)
+        previous_file = self._paths.get(header.test_case_id)
+        if previous_file is not None and previous_file != tc_file:
+            previous_file.unlink(missing_ok=True)
+        self._paths[header.test_case_id] = tc_file
+        header = header.model_copy(update={"size_bytes": len(body)})
+        self._append_index_records([header.model_dump(mode="json")])
+
+    def delete(self, test_case_id: str) -> None:
+        tc_file = self._find_path(test_case_id)
+        if tc_file is not None:
+            tc_file.unlink(missing_ok=True)
+        self._paths.pop(test_case_id, None)
+        self._append_index_records([{"test_case_id": test_case_id, "deleted": True}])
+
+    def list_ids(
+        self,
+        status: Optional[TestCaseStatus] = None,
+        feedback_config_id: Optional[str] = None,
+        test_case_type: Optional[str] = None,
+        has_ai_annotation: Optional[bool] = None,
+        has_human_annotation: Optional[bool] = None,
+        order_by: Literal["test_case_id", "created_at"] = "test_case_id",
+        after: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> list[str]:
+        self._refresh_index()
+        headers = [
+            header
+            for header in self._headers.values()
+            if (status is None or header.status == status)
+            and (
+                feedback_config_id is None
+                or header.feedback_config_id == feedback_config_id
+            )
+            and (test_case_type is None or header.test_case_type == test_case_type)
+            and (
+                has_ai_annotation is None
+                or header.has_ai_annotation == has_ai_annotation
+            )
+            and (
+                has_human_annotation is None
+                or header.has_human_annotation == has_human_annotation
+            )
+            and (after is None or header.test_case_id > after)
+        ]
+        key = (
+            attrgetter("created_at", "test_case_id")
+            if order_by == "created_at"
+            else attrgetter("test_case_id")
+        )
+        # A small page doesn't need a full sort
+        headers = (
+            heapq.nsmallest(limit, headers, key=key)
+            if limit
+            else sorted(headers, key=key)
+        )
+        return [header.test_case_id for header in headers]
+
+    def count_by_status(self) -> dict[str, int]:
+        self._refresh_index()
+        counts = _empty_status_counts()
+        for header in self._headers.values():
+            counts[header.status] += 1
+        return counts
+
+    def archive(
+        self,
+        test_case_ids: list[str],
+        archive_dir: Path,
+        render: Optional[ArchiveRenderer] = None,
+    ) -> int:
+        archive_dir.mkdir(parents=True, exist_ok=True)
+        archived_count = 0
+        archived_ids = []
+        for test_case_id in test_case_ids:
+            tc_file = self._find_path(test_case_id)
+            if tc_file is None:
+                continue
+            try:
+                if render is not None:
+                    body = tc_file.read_bytes()
+                    atomic_write_bytes(
+                        archive_dir / tc_file.name, render(test_case_id, body)
+                    )
+                    tc_file.unlink()
+                else:
+                    os.rename(tc_file, archive_dir / tc_file.name)
+            except FileNotFoundError:
+                # Archived by another process in the meantime
+                continue
+            except OSError:
+                # The archive is on another filesystem
+                shutil.move(str(tc_file), str(archive_dir / tc_file.name))
+            archived_ids.append(test_case_id)
+            archived_count += 1
+        for test_case_id in archived_ids:
+            self._paths.pop(test_case_id, None)
+        self._append_index_records(
+            [
+                {"test_case_id": test_case_id, "deleted": True}
+                for test_case_id in archived_ids
+            ]
+        )
+        return archived_count
+
+
+class SQLiteTestCaseStore(TestCaseStore):
+    """Embedded SQLite store: one row per test case with indexed header columns.
+
+    WAL mode lets any number of processes read while one writes; writers from
+    other processes wait on the database lock.
+    """
+
+    DB_FILENAME = "test_cases.sqlite"
+    ARCHIVE_CHUNK_SIZE = 500
+    _HEADER_COLUMNS = (
+        "test_case_id",
+        "test_case_type",
+        "status",
+        "feedback_config_id",
+        "created_at",
+        "updated_at",
+        "has_ai_annotation",
+        "has_human_annotation",
+        "size_bytes",
+    )
+
+    def __init__(self, directory: Path):
+        self.dir = directory
+        self.db_path = directory / self.DB_FILENAME
+        self._lock = threading.Lock()
+        # Other processes may hold the write lock; wait for it rather than failing
+        self._conn = sqlite3.connect(
+            self.db_path, check_same_thread=False, isolation_level=None, timeout=30
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS test_cases (
+                test_case_id TEXT PRIMARY KEY,
+                test_case_type TEXT NOT NULL,
+                status TEXT NOT NULL,
+                feedback_config_id TEXT NOT NULL,
+                created_at TEXT NOT NULL,
+                updated_at TEXT NOT NULL,
+                has_ai_annotation INTEGER NOT NULL DEFAULT 0,
+                has_human_annotation INTEGER NOT NULL DEFAULT 0,
+                size_bytes INTEGER NOT NULL DEFAULT 0,
+                body BLOB NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_test_cases_status
+                ON test_cases (status, created_at);
+            CREATE INDEX IF NOT EXISTS idx_test_cases_config
+                ON test_cases (feedback_config_id, test_case_type);
+            CREATE INDEX IF NOT EXISTS idx_test_cases_type
+                ON test_cases (test_case_type);
+            CREATE INDEX IF NOT EXISTS idx_test_cases_created_at
+                ON test_cases (created_at);
+            CREATE INDEX IF NOT EXISTS idx_test_cases_updated_at
+                ON test_cases (updated_at);
+            """)
+        # Databases created before annotation presence was indexed
+        columns = {
+            row[1] for row in self._conn.execute("PRAGMA table_info(test_cases)")
+        }
+        for column in ("has_ai_annotation", "has_human_annotation", "size_bytes"):
+            if column not in columns:
+                self._conn.execute(
+                    f"ALTER TABLE test_cases ADD COLUMN {column} INTEGER NOT NULL DEFAULT 0"
+                )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_test_cases_human_annotation "
+            "ON test_cases (has_human_annotation)"
+        )
+
+    def get(self, test_case_id: str) -> Optional[bytes]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT body FROM test_cases WHERE test_case_id = ?", (test_case_id,)
+            ).fetchone()
+        return bytes(row[0]) if row else None
+
+    def get_header(self, test_case_id: str) -> Optional[TestCaseHeader]:
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {', '.join(self._HEADER_COLUMNS)} FROM test_cases WHERE test_case_id = ?",
+                (test_case_id,),
+            ).fetchone()
+        return TestCaseHeader(**dict(zip(self._HEADER_COLUMNS, row))) if row else None
+
+    def put(self, header: TestCaseHeader, body: bytes) -> None:
+        with self._lock:
+            self._conn.execute(
+                """
+                INSERT OR REPLACE INTO test_cases (
+                    test_case_id, test_case_type, status, feedback_config_id,
+                    created_at, updated_at, has_ai_annotation, has_human_annotation,
+                    size_bytes, body
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    header.test_case_id,
+                    header.test_case_type,
+                    header.status.value,
+                    header.feedback_config_id,
+                    header.created_at.isoformat(),
+                    header.updated_at.isoformat(),
+                    header.has_ai_annotation,
+                    header.has_human_annotation,
+                    len(body),
+                    body,
+                ),
+            )
+
+    def delete(self, test_case_id: str) -> None:
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM test_cases WHERE test_case_id = ?", (test_case_id,)
+            )
+
+    def list_ids(
+        self,
+        status: Optional[TestCaseStatus] = None,
+        feedback_config_id: Optional[str] = None,
+        test_case_type: Optional[str] = None,
+        has_ai_annotation: Optional[bool] = None,
+        has_human_annotation: Optional[bool] = None,
+        order_by: Literal["test_case_id", "created_at"] = "test_case_id",
+        after: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> list[str]:
+        clauses = []
+        params: list[str | int] = []
+        if status is not None:
+            clauses.append("status = ?")
+            params.append(TestCaseStatus(status).value)
+        if feedback_config_id is not None:
+            clauses.append("feedback_config_id = ?")
+            params.append(feedback_config_id)
+        if test_case_type is not None:
+            clauses.append("test_case_type = ?")
+            params.append(test_case_type)
+        if has_ai_annotation is not None:
+            clauses.append("has_ai_annotation = ?")
+            params.append(int(has_ai_annotation))
+        if has_human_annotation is not None:
+            clauses.append("has_human_annotation = ?")
+            params.append(int(has_human_annotation))
+        if after is not None:
+            clauses.append("test_case_id > ?")
+            params.append(after)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        order = "created_at, test_case_id" if order_by == "created_at" else order_by
+        limit_clause = ""
+        if limit:
+            limit_clause = "LIMIT ?"
+            params.append(limit)
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT test_case_id FROM test_cases {where} ORDER BY {order} {limit_clause}",
+                params,
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def count_by_status(self) -> dict[str, int]:
+        counts = _empty_status_counts()
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT status, COUNT(*) FROM test_cases GROUP BY status"
+            ).fetchall()
+        for status, count in rows:
+            counts[TestCaseStatus(status)] = count
+        return counts
+
+    def archive(
+        self,
+        test_case_ids: list[str],
+        archive_dir: Path,
+        render: Optional[ArchiveRenderer] = None,
+    ) -> int:
+        archive_dir.mkdir(parents=True, exist_ok=True)
+        archived_count = 0
+        # One short transaction per chunk, so other writers are never held up for long
+        for start in range(0, len(test_case_ids), self.ARCHIVE_CHUNK_SIZE):
+            chunk = test_case_ids[start : start + self.ARCHIVE_CHUNK_SIZE]
+            placeholders = ", ".join("?" * len(chunk))
+            # Written before the rows are deleted, so a failed commit loses nothing;
+            # the files of a rolled back chunk are removed again
+            archived_files: list[Path] = []
+            with self._lock:
+                self._conn.execute("BEGIN IMMEDIATE")
+                try:
+                    rows = self._conn.execute(
+                        f"SELECT test_case_id, body FROM test_cases WHERE test_case_id IN ({placeholders})",
+                        chunk,
+                    ).fetchall()
+                    for test_case_id, body in rows:
+                        body = bytes(body)
+                        extension = SERIALIZATION_EXTENSIONS[detect_format(body)]
+                        if render is not None:
+                            body = render(test_case_id, body)
+                        archive_file = archive_dir / f"tc_{test_case_id}{extension}"
+                        atomic_write_bytes(archive_file, body)
+                        archived_files.append(archive_file)
+                    self._conn.executemany(
+                        "DELETE FROM test_cases WHERE test_case_id = ?",
+                        [(test_case_id,) for test_case_id, _ in rows],
+                    )
+                    self._conn.execute("COMMIT")
+                except Exception:
+                    self._conn.execute("ROLLBACK")
+                    for archive_file in archived_files:
+                        archive_file.unlink(missing_ok=True)
+                    raise
+            archived_count += len(rows)
+        return archived_count
+
+
+def _stat_key(stat: os.stat_result) -> tuple[int, int, int]:
+    return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+
+def _config_version(data: dict[str, Any]) -> str:
+    """A content hash identifying a version of a serialized feedback config."""
+    fields = {key: value for key, value in data.items() if key != "schema_version"}
+    contents = json.dumps(fields, sort_keys=True).encode()
+    return hashlib.sha256(contents).hexdigest()[:16]
+
+
+class FeedbackConfigRegistry:
+    """Feedback configs referenced by test cases, stored once per config version.
+
+    Each config is validated once when first loaded and the same instance is shared
+    by every test case that references it. With `trusted=True`, configs stamped
+    with the current SCHEMA_VERSION skip the rubric validators.
+
+    The config ID only covers the fields that decide which test cases exist, so a
+    config with an edited rubric, categories or matchers keeps its ID. Every
+    registered version is kept as `{id}.{version}.json`, keyed by its content hash,
+    and the last registered one is the current version, `{id}.json`. Test cases
+    reference the version they were judged under, or the current one until then.
+    """
+
+    def __init__(self, directory: Path, trusted: bool = False):
+        self.dir = directory
+        self.dir.mkdir(parents=True, exist_ok=True)
+        self.trusted = trusted
+        # By config ID and version; version None is the current version
+        self._configs: dict[tuple[str, Optional[str]], FeedbackConfig] = {}
+        # Serialized contents of each current config file as last read or written,
+        # and its (inode, mtime, size) then, to notice other processes replacing it
+        self._contents: dict[str, bytes] = {}
+        self._current_stats: dict[str, tuple[int, int, int]] = {}
+        self._current_versions: dict[str, str] = {}
+
+    def _path(self, config_id: str, version: Optional[str] = None) -> Path:
+        if version is None:
+            return self.dir / f"{config_id}.json"
+        return self.dir / f"{config_id}.{version}.json"
+
+    def _refresh_current(self, config_id: str) -> None:
+        """Forget the cached current config of an ID if its file was replaced since."""
+        if config_id not in self._current_stats:
+            return
+        try:
+            stat = self._path(config_id).stat()
+        except FileNotFoundError:
+            stat = None
+        if stat is None or self._current_stats[config_id] != _stat_key(stat):
+            self._configs.pop((config_id, None), None)
+            self._contents.pop(config_id, None)
+            self._current_stats.pop(config_id, None)
+            self._current_versions.pop(config_id, None)
+
+    def register(self, config: FeedbackConfig) -> str:
+        """Persist a config as the current version of its ID, and return its version."""
+        self._refresh_current(config.id)
+        if self._configs.get((config.id, None)) is config:
+            return self._current_versions[config.id]
+        data = config.model_dump(mode="json")
+        version = _config_version(data)
+        data["schema_version"] = SCHEMA_VERSION
+        contents = json.dumps(data, indent=2).encode()
+        version_file = self._path(config.id, version)
+        # Versions are immutable, so an existing file is already up to date
+        if not version_file.exists():
+            atomic_write_bytes(version_file, contents)
+        config_file = self._path(config.id)
+        if config.id not in self._contents and config_file.exists():
+            self._contents[config.id] = config_file.read_bytes()
+        if self._contents.get(config.id) != contents:
+            atomic_write_bytes(config_file, contents)
+            self._contents[config.id] = contents
+        self._current_stats[config.id] = _stat_key(config_file.stat())
+        self._configs[(config.id, None)] = config
+        self._configs[(config.id, version)] = config
+        self._current_versions[config.id] = version
+        return version
+
+    def current_version(self, config_id: str) -> str:
+        """The version of the current config for an ID."""
+        self._refresh_current(config_id)
+        if config_id not in self._current_versions:
+            self.get(config_id)
+        return self._current_versions[config_id]
+
+    def get(self, config_id: str, version: Optional[str] = None) -> FeedbackConfig:
+        """Get the shared, already-validated config for an ID at a version.
+
+        Without a version, the current config for the ID is returned. Versions are
+        immutable, so only the current config is checked for changes made by other
+        processes.
+        """
+        if version is None:
+            self._refresh_current(config_id)
+        config = self._configs.get((config_id, version))
+        if config is None:
+            config_file = self._path(config_id, version)
+            try:
+                with open(config_file, "rb") as f:
+                    stat = os.fstat(f.fileno())
+                    contents = f.read()
+            except FileNotFoundError:
+                raise ValueError(
+                    f"Feedback config not found: {config_id}"
+                    + (f" (version {version})" if version is not None else "")
+                ) from None
+            data = json.loads(contents)
+            # Hashed before validating, which may normalize the data in place
+            current_version = _config_version(data)
+            config = FeedbackConfig.model_validate(
+                data, context=trusted_context(data, self.trusted)
+            )
+            self._configs[(config_id, version)] = config
+            if version is None:
+                # Current configs registered before versioning have no version file
+                if not self._path(config_id, current_version).exists():
+                    atomic_write_bytes(self._path(config_id, current_version), contents)
+                self._contents[config_id] = contents
+                self._current_stats[config_id] = _stat_key(stat)
+                self._current_versions[config_id] = current_version
+        return config
+
+
+def create_test_case_store(
+    kind: TestCaseStoreKind,
+    directory: Path,
+    serialization_format: SerializationFormat = "json",
+) -> TestCaseStore:
+    """Create a test case store of the given kind rooted at `directory`."""
+    if kind == "file":
+        return FileTestCaseStore(directory, serialization_format)
+    elif kind == "sqlite":
+        return SQLiteTestCaseStore(directory)
+    raise ValueError(f"Unknown test case store: {kind}")
@@ -0,0 +1,44 @@
+"""Sorted index of when raw judge inputs started, for time range queries.
+
+Each granularity's raw judge inputs are indexed by `start_ns` in a pair of
+parallel arrays, the sorted start times and the inputs' positions in their list,
+so the inputs that started in a window are found with two binary searches
+instead of a scan over every input.
+"""
+
+from __future__ import annotations
+
+from array import array
+from bisect import bisect_left
+from typing import Iterable, Optional
+
+
+class TimeIndex:
+    """Positions of the items of a list, sorted by their start time in nanoseconds."""
+
+    def __init__(self, starts: Iterable[Optional[int]]):
+        # Items without a start time are left out; no range contains them
+        pairs = sorted(
+            (start, position)
+            for position, start in enumerate(starts)
+            if start is not None
+        )
+        self.starts = array("q", (start for start, _ in pairs))
+        self.positions = array("q", (position for _, position in pairs))
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def positions_between(
+        self, start_ns: Optional[int] = None, end_ns: Optional[int] = None
+    ) -> list[int]:
+        """Positions of the items that started in [start_ns, end_ns), in time order."""
+        low = 0 if start_ns is None else bisect_left(self.starts, start_ns)
+        high = len(self.starts) if end_ns is None else bisect_left(self.starts, end_ns)
+        return self.positions[low:high].tolist() if low < high else []
+
+    def bounds(self) -> tuple[Optional[int], Optional[int]]:
+        """The earliest and latest start times in the index."""
+        if not self.starts:
+            return None, None
+        return self.starts[0], self.starts[-1]
@@ -0,0 +1,372 @@
+"""Import of trace.span JSONL exports, e.g. from the OpenAI Agents SDK.
+
+Each line of an export is a span, {"object": "trace.span", "id", "trace_id",
+"parent_id", "started_at", "ended_at", "span_data", "error"}, or a trace,
+{"object": "trace", "id", "workflow_name", "group_id", "metadata"}. Spans become
+InteractionSteps and traces become Interactions.
+
+Spans of a trace can be anywhere in the export, so the import runs in two passes
+of parallel worker processes, neither of which holds the whole export in memory:
+
+1. The input files are split into byte ranges, each parsed by a worker, which
+   appends every line starting in its range to one of `num_buckets` spill files,
+   chosen by a stable hash of the line's trace ID.
+2. Each bucket, which now holds every line of its traces, is converted and
+   grouped into interactions by a worker, which saves them to the interactions
+   directory.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import os
+import shutil
+import tempfile
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
+from datetime import datetime, timezone
+from functools import partial
+from pathlib import Path
+from typing import Any, Callable, Optional, TypeVar
+
+from pydantic import BaseModel
+
+from ._models import BlobStore, Interaction, SerializationFormat
+
+SPAN_OBJECT = "trace.span"
+TRACE_OBJECT = "trace"
+
+# Error messages kept per import; the rest are only counted
+MAX_ERRORS = 20
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_T = TypeVar("_T")
+_R = TypeVar("_R")
+
+
+class TraceSpanImportStats(BaseModel):
+    """Counts and timings of a trace span import."""
+
+    spans: int = 0
+    traces: int = 0
+    interactions: int = 0
+    skipped_lines: int = 0
+    failed_traces: int = 0
+    errors: list[str] = []
+    spill_seconds: float = 0.0
+    build_seconds: float = 0.0
+
+    @property
+    def seconds(self) -> float:
+        return self.spill_seconds + self.build_seconds
+
+    @property
+    def spans_per_second(self) -> float:
+        return self.spans / self.seconds if self.seconds else 0.0
+
+
+def parse_timestamp_ns(value: Any) -> Optional[int]:
+    """Nanoseconds since the epoch of an ISO 8601 string or a number of seconds.
+
+    Timestamps without a UTC offset are taken to be UTC.
+    """
+    if value is None or value == "":
+        return None
+    if isinstance(value, (int, float)):
+        return int(value * 1_000_000_000)
+    # datetime.fromisoformat only accepts a trailing "Z" from Python 3.11
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    delta = parsed - _EPOCH
+    # Integer arithmetic keeps microsecond precision that float seconds would lose
+    return (
+        (delta.days * 86_400 + delta.seconds) * 1_000_000 + delta.microseconds
+    ) * 1_000
+
+
+def _messages(items: Any) -> Optional[list[dict[str, Any]]]:
+    if not isinstance(items, list):
+        return None
+    messages = []
+    for item in items:
+        if isinstance(item, dict):
+            content = item.get("content", "")
+            if not isinstance(content, str):
+                content = json.dumps(content)
+            messages.append({"role": item.get("role", "user"), "content": content})
+        elif isinstance(item, str):
+            messages.append({"role": "user", "content": item})
+    return messages or None
+
+
+def span_to_step(
+    record: dict[str, Any], trace: Optional[dict[str, Any]] = None
+) -> dict[str, Any]:
+    """Map a trace.span record to InteractionStep fields.
+
+    `trace` is the record of the span's trace, if the export has one; its group_id
+    and workflow_name are copied onto the step.
+    """
+    span_data = record.get("span_data") or {}
+    start_ns = parse_timestamp_ns(record.get("started_at"))
+    end_ns = parse_timestamp_ns(record.get("ended_at"))
+    usage = span_data.get("usage")
+    model = span_data.get("model")
+
+    metadata: dict[str, Any] = {
+        "span_type": span_data.get("type"),
+        "error": record.get("error"),
+    }
+    if trace and trace.get("workflow_name"):
+        metadata["workflow_name"] = trace["workflow_name"]
+
+    return {
+        "id": record["id"],
+        "parent_step_id": record.get("parent_id"),
+        "interaction_id": record["trace_id"],
+        "group_id": trace.get("group_id") if trace else None,
+        "name": span_data.get("name") or span_data.get("type"),
+        "start_ns": start_ns,
+        "duration_ns": (
+            end_ns - start_ns if start_ns is not None and end_ns is not None else None
+        ),
+        "input_data": span_data.get("input"),
+        "output_data": span_data.get("output"),
+        "metadata": metadata,
+        "raw": record,
+        "model": model,
+        "input_messages": _messages(span_data.get("input")),
+        "output_messages": _messages(span_data.get("output")),
+        "usage": (
+            {
+                "input_tokens": usage.get("input_tokens"),
+                "output_tokens": usage.get("output_tokens"),
+                "total_tokens": usage.get("total_tokens"),
+            }
+            if isinstance(usage, dict)
+            else None
+        ),
+        "provider": "openai" if model else None,
+    }
+
+
+def build_trace_interaction(
+    trace_id: str,
+    spans: list[dict[str, Any]],
+    trace: Optional[dict[str, Any]] = None,
+) -> Interaction:
+    """Build the Interaction of a trace from its span records, ordered by start time."""
+    steps = sorted(
+        (span_to_step(span, trace) for span in spans),
+        key=lambda step: (step["start_ns"] is None, step["start_ns"] or 0),
+    )
+    starts = [step["start_ns"] for step in steps if step["start_ns"] is not None]
+    ends = [
+        step["start_ns"] + step["duration_ns"]
+        for step in steps
+        if step["start_ns"] is not None and step["duration_ns"] is not None
+    ]
+    trace = trace or {}
+    return Interaction.model_validate(
+        {
+            "id": trace_id,
+            "steps": steps,
+            "start_ns": min(starts) if starts else None,
+            "duration_ns": max(ends) - min(starts) if starts and ends else None,
+            "group_id": trace.get("group_id"),
+            "name": trace.get("workflow_name"),
+            "tags": trace.get("metadata") or {},
+        }
+    )
+
+
+def split_ranges(paths: list[Path], range_bytes: int) -> list[tuple[str, int, int]]:
+    """Split files into (path, start, end) byte ranges of about `range_bytes`.
+
+    A line belongs to the range it starts in, so ranges needn't fall on line
+    boundaries; see `_read_range`.
+    """
+    ranges = []
+    for path in paths:
+        size = path.stat().st_size
+        for start in range(0, size, range_bytes):
+            ranges.append((str(path), start, min(start + range_bytes, size)))
+    return ranges
+
+
+def _read_range(path: str, start: int, end: int):
+    with open(path, "rb") as f:
+        if start:
+            # Skip the rest of the line the previous range started
+            f.seek(start - 1)
+            f.readline()
+        while f.tell() < end:
+            line = f.readline()
+            if not line:
+                break
+            yield line
+
+
+def _bucket(trace_id: str, num_buckets: int) -> int:
+    # Python's hash() differs between processes; buckets must agree across workers
+    return zlib.crc32(trace_id.encode()) % num_buckets
+
+
+def _spill_range(
+    byte_range: tuple[str, int, int], spill_dir: str, num_buckets: int
+) -> TraceSpanImportStats:
+    path, start, end = byte_range
+    stats = TraceSpanImportStats()
+    buckets: dict[int, Any] = {}
+    with ExitStack() as spill_files:
+        for line in _read_range(path, start, end):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+                kind = record.get("object")
+                if kind == SPAN_OBJECT:
+                    trace_id = record["trace_id"]
+                    stats.spans += 1
+                elif kind == TRACE_OBJECT:
+                    trace_id = record["id"]
+                    stats.traces += 1
+                else:
+                    stats.skipped_lines += 1
+                    continue
+            except (ValueError, KeyError, TypeError, AttributeError) as e:
+                stats.skipped_lines += 1
+                if len(stats.errors) < MAX_ERRORS:
+                    stats.errors.append(f"{path} (range at byte {start}): {e!r}")
+                continue
+            bucket = _bucket(str(trace_id), num_buckets)
+            if bucket not in buckets:
+                # One spill file per bucket and worker process, appended to by
+                # every range that process parses
+                buckets[bucket] = spill_files.enter_context(
+                    open(Path(spill_dir) / f"{bucket:05d}.{os.getpid()}.jsonl", "ab")
+                )
+            if not line.endswith(b"\n"):
+                line += b"\n"
+            buckets[bucket].write(line)
+    return stats
+
+
+def _build_bucket(
+    bucket: int,
+    spill_dir: str,
+    interactions_dir: str,
+    format: SerializationFormat,
+    blob_dir: Optional[str],
+) -> TraceSpanImportStats:
+    stats = TraceSpanImportStats()
+    spans: dict[str, list[dict[str, Any]]] = {}
+    traces: dict[str, dict[str, Any]] = {}
+    for spill_path in sorted(Path(spill_dir).glob(f"{bucket:05d}.*.jsonl")):
+        with open(spill_path, "rb") as f:
+            for line in f:
+                record = json.loads(line)
+                if record.get("object") == SPAN_OBJECT:
+                    spans.setdefault(str(record["trace_id"]), []).append(record)
+                else:
+                    traces[str(record["id"])] = record
+
+    blob_store = BlobStore.open(blob_dir) if blob_dir else None
+    for trace_id, trace_spans in spans.items():
+        try:
+            interaction = build_trace_interaction(
+                trace_id, trace_spans, traces.get(trace_id)
+            )
+            interaction.save(
+                str(Path(interactions_dir) / trace_id),
+                format=format,
+                blob_store=blob_store,
+            )
+        except Exception as e:
+            stats.failed_traces += 1
+            if len(stats.errors) < MAX_ERRORS:
+                stats.errors.append(f"{trace_id}: {e}")
+            continue
+        stats.interactions += 1
+    return stats
+
+
+def _run(function: Callable[[_T], _R], items: list[_T], workers: int) -> list[_R]:
+    if workers <= 1:
+        return [function(item) for item in items]
+    with ProcessPoolExecutor(workers) as pool:
+        return list(pool.map(function, items))
+
+
+def _merge(total: TraceSpanImportStats, part: TraceSpanImportStats) -> None:
+    total.spans += part.spans
+    total.traces += part.traces
+    total.interactions += part.interactions
+    total.skipped_lines += part.skipped_lines
+    total.failed_traces += part.failed_traces
+    total.errors.extend(part.errors[: MAX_ERRORS - len(total.errors)])
+
+
+def import_trace_spans(
+    paths: list[Path],
+    interactions_dir: Path,
+    workers: Optional[int] = None,
+    range_bytes: int = 64 * 1024 * 1024,
+    num_buckets: Optional[int] = None,
+    format: SerializationFormat = "json",
+    blob_store: Optional[BlobStore] = None,
+) -> TraceSpanImportStats:
+    """Import trace.span JSONL files into `interactions_dir`, one directory per trace.
+
+    Args:
+        paths: JSONL exports; spans and traces may be spread over several files
+        interactions_dir: Where interactions are saved with `Interaction.save`
+        workers: Worker processes for both passes; defaults to the CPU count
+        range_bytes: Size of the byte ranges parsed by each pass-1 task
+        num_buckets: Spill buckets, and pass-2 tasks. A pass-2 worker holds a
+            bucket in memory, so this defaults to enough buckets to keep each
+            around `range_bytes`, and at least 4 per worker
+        format: Serialization format of the saved interactions
+        blob_store: Store large payload strings in this blob store
+    """
+    workers = workers or os.cpu_count() or 1
+    total_bytes = sum(path.stat().st_size for path in paths)
+    num_buckets = num_buckets or max(workers * 4, math.ceil(total_bytes / range_bytes))
+    interactions_dir.mkdir(parents=True, exist_ok=True)
+    stats = TraceSpanImportStats()
+
+    # Spilled next to the output, which is on a disk with room for the data
+    spill_dir = tempfile.mkdtemp(
+        prefix=".trace_span_spill_", dir=interactions_dir.parent
+    )
+    try:
+        start = time.perf_counter()
+        for part in _run(
+            partial(_spill_range, spill_dir=spill_dir, num_buckets=num_buckets),
+            split_ranges(paths, range_bytes),
+            workers,
+        ):
+            _merge(stats, part)
+        stats.spill_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for part in _run(
+            partial(
+                _build_bucket,
+                spill_dir=spill_dir,
+                interactions_dir=str(interactions_dir),
+                format=format,
+                blob_dir=str(blob_store.blob_dir) if blob_store is not None else None,
+            ),
+            list(range(num_buckets)),
+            workers,
+        ):
+            _merge(stats, part)
+        stats.build_seconds = time.perf_counter() - start
+    finally:
+        shutil.rmtree(spill_dir, ignore_errors=True)
+    return stats
@@ -10,6 +10,7 @@ from ._models import (
     FeedbackConfigStats,
     Annotation,
 )
+from ._search_index import SearchHit
 
 
 class AnnotationRequest(BaseModel):
@@ -54,13 +55,47 @@ class FeedbackConfigResponse(BaseModel):
     status: str = Field(description="Status of the operation")
     config_id: str = Field(description="ID of the feedback config")
     archived_count: int = Field(
-        description="Number of test cases archived from previous config"
+        description="Number of annotated test cases from the previous config being archived in the background"
     )
     new_test_cases: NewTestCasesInfo = Field(
         description="Information about newly generated test cases"
     )
 
 
+class ReloadIngestedDataResponse(BaseModel):
+    """Response from reloading the ingested data."""
+
+    added: int = Field(description="Number of newly ingested interactions loaded")
+    changed: int = Field(description="Number of re-ingested interactions reloaded")
+    removed: int = Field(description="Number of interactions no longer ingested")
+    total_steps: int = Field(description="Number of steps loaded after the reload")
+    new_pointwise_test_cases: int = Field(
+        description="Number of pointwise test cases created for new matching inputs"
+    )
+    new_ranking_test_cases: int = Field(
+        description="Number of ranking test cases created for new matching inputs"
+    )
+    invalidated_test_cases: int = Field(
+        description="Number of pending test cases marked invalid because their raw judge inputs were removed"
+    )
+
+
+class SearchResponse(BaseModel):
+    """Response from searching the ingested steps."""
+
+    query: str = Field(description="The search query")
+    steps: list[SearchHit] = Field(
+        description="Matching steps, best match first, with highlighted snippets"
+    )
+    interaction_ids: list[str] = Field(
+        description="Interactions of the matching steps, ordered by their best match"
+    )
+    test_case_ids: list[str] = Field(
+        description="Test cases judging a matching step, or its interaction or group"
+    )
+    took_ms: float = Field(description="Time taken by the search, in milliseconds")
+
+
 class GetFeedbackConfigResponse(BaseModel):
     """Response from getting the current feedback config."""
 
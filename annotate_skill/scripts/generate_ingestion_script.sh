@@ -58,8 +58,12 @@ TODO: Implement the ingest() function below based on your trace format.
 # Standard library imports
 import argparse
 import json
+import os
+import queue
+import threading
+import time
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Iterable, Iterator, Optional
 
 EOF
 
@@ -75,7 +79,7 @@ cat >> "$OUTPUT_FILE" << 'EOF'
 # =============================================================================
 
 
-def ingest(folder_path: str) -> list[Interaction]:
+def ingest(folder_path: str) -> Iterator[Interaction]:
     """
     Convert raw traces from folder_path into normalized Interaction objects.
 
@@ -83,17 +87,22 @@ def ingest(folder_path: str) -> list[Interaction]:
     1. Load and parse your raw trace files
     2. Extract relevant data (spans, messages, LLM calls, etc.)
     3. Convert to InteractionStep objects
-    4. Group steps into Interaction objects
+    4. Group steps into Interaction objects and `yield` each one
+
+    Yield interactions one at a time instead of building a list: they are
+    written while the rest of the dataset is still being read, so datasets much
+    larger than memory can be ingested. (Returning a list still works.)
 
     Args:
         folder_path: Path to directory containing raw trace files
 
-    Returns:
-        List of Interaction objects
+    Yields:
+        Interaction objects
 
     Example structure:
-        [
-            Interaction(
+        for trace_file in sorted(Path(folder_path).glob("*.json")):
+            ...
+            yield Interaction(
                 id="trace_abc123",
                 name="User request",
                 steps=[
@@ -101,9 +110,7 @@ def ingest(folder_path: str) -> list[Interaction]:
                     InteractionStep(id="step2", name="Tool call", ...),
                 ],
                 ...
-            ),
-            ...
-        ]
+            )
     """
     # TODO: Implement your custom ingestion logic here!
     #
@@ -112,7 +119,11 @@ def ingest(folder_path: str) -> list[Interaction]:
     # - Parse each file and extract span/event data
     # - Create InteractionStep for each span
     # - Group steps by trace_id/conversation_id into Interactions
-    # - Return list[Interaction]
+    # - Yield each Interaction as soon as all of its steps are read. If steps
+    #   of one trace are spread over many files, group them per file or per
+    #   batch of files rather than over the whole dataset
+    # - Yield interactions in a deterministic order, so --resume can skip the
+    #   ones already written
 
     raise NotImplementedError(
         "Please implement the ingest() function based on your trace format. "
@@ -124,10 +135,108 @@ def ingest(folder_path: str) -> list[Interaction]:
 # MAIN EXECUTION LOGIC (No changes needed)
 # =============================================================================
 
+PROGRESS_FILENAME = ".ingest_progress"
+_DONE = object()
+
+
+class IngestProgress:
+    """Append-only log of the IDs of interactions written to --output-dir.
+
+    An interaction is logged only once it is saved in full, so after a crash
+    `--resume` skips exactly the interactions that don't need writing again.
+    """
+
+    def __init__(self, path: Path, resume: bool):
+        self.written_ids: set[str] = set()
+        if resume and path.exists():
+            self.written_ids = set(path.read_text().split())
+        self._file = open(path, "a" if resume else "w")
+        self._lock = threading.Lock()
+
+    def record(self, interaction_id: str) -> None:
+        with self._lock:
+            self._file.write(interaction_id + "\n")
+            self._file.flush()
+
+    def close(self) -> None:
+        self._file.close()
+
+
+def write_interactions(
+    interactions: Iterable[Interaction],
+    save: Callable[[Interaction], None],
+    workers: int,
+    queue_size: Optional[int] = None,
+    skip_ids: Optional[set[str]] = None,
+    progress_every: float = 5.0,
+) -> tuple[int, int]:
+    """
+    Save interactions with a pool of writer threads as they are produced.
+
+    At most `queue_size` interactions (default: 4 per worker) wait for a
+    writer, so producing them blocks while the writers catch up and memory
+    stays bounded however large the dataset is.
+
+    Returns:
+        (number of interactions written, number skipped as already written)
+    """
+    pending: queue.Queue = queue.Queue(maxsize=queue_size or workers * 4)
+    errors: list[BaseException] = []
+    written = 0
+    written_lock = threading.Lock()
+
+    def writer() -> None:
+        nonlocal written
+        while True:
+            interaction = pending.get()
+            if interaction is _DONE:
+                return
+            if errors:
+                # Keep draining so the producer never blocks on a full queue
+                continue
+            try:
+                save(interaction)
+            except BaseException as e:
+                errors.append(e)
+                continue
+            with written_lock:
+                written += 1
+
+    threads = [threading.Thread(target=writer, daemon=True) for _ in range(workers)]
+    for thread in threads:
+        thread.start()
+
+    skipped = 0
+    start = last_report = time.monotonic()
+    try:
+        for interaction in interactions:
+            if errors:
+                break
+            if skip_ids and interaction.id in skip_ids:
+                skipped += 1
+                continue
+            pending.put(interaction)
+            now = time.monotonic()
+            if now - last_report >= progress_every:
+                last_report = now
+                print(
+                    f"  {written} written, {skipped} skipped, "
+                    f"{pending.qsize()} queued ({written / (now - start):.1f} interactions/s)"
+                )
+    finally:
+        for _ in threads:
+            pending.put(_DONE)
+        for thread in threads:
+            thread.join()
+
+    if errors:
+        raise errors[0]
+    return written, skipped
+
 
 def main():
     """
-    Main execution: call ingest() and save interactions to filesystem.
+    Main execution: stream interactions from ingest() to the filesystem.
     """
     parser = argparse.ArgumentParser(
         description="Normalize traces into annotation workflow format"
@@ -142,30 +251,93 @@ def main():
         default=".haize_annotations/ingested_data/interactions",
         help="Output directory for ingested interactions",
     )
+    parser.add_argument(
+        "--format",
+        choices=["json", "compact", "msgpack", "zstd"],
+        default="json",
+        help="Serialization format for saved interactions (default: json)",
+    )
+    parser.add_argument(
+        "--shard-dir",
+        default=None,
+        help="Pack interactions into offset-indexed shards in this directory "
+        "(e.g. .haize_annotations/ingested_data/shards) instead of --output-dir",
+    )
+    parser.add_argument(
+        "--blobs",
+        action="store_true",
+        help="Store large payload strings (e.g. repeated system prompts) once in a "
+        "content-addressed blob store next to the output directory",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Writer threads serializing and saving interactions (default: one per CPU)",
+    )
+    parser.add_argument(
+        "--queue-size",
+        type=int,
+        default=None,
+        help="Interactions held in memory waiting for a writer (default: 4 per worker)",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continue an interrupted run: skip interactions it already wrote",
+    )
     args = parser.parse_args()
 
-    # Call generated ingest function
-    print(f"Loading and normalizing traces from {args.input}...")
+    blob_store = None
+    if args.blobs:
+        blob_store = BlobStore(Path(args.shard_dir or args.output_dir).parent / BLOBS_DIRNAME)
+
+    progress = None
+    shard_writer = None
+    if args.shard_dir:
+        print(f"Packing interactions into shards in {args.shard_dir}...")
+        shard_writer = InteractionShardWriter(
+            args.shard_dir, format=args.format, blob_store=blob_store, append=args.resume
+        )
+        skip_ids = shard_writer.written_ids
+        save = shard_writer.write
+        destination = args.shard_dir
+    else:
+        print(f"Saving interactions to {args.output_dir}...")
+        output_dir = Path(args.output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        progress = IngestProgress(output_dir / PROGRESS_FILENAME, args.resume)
+        skip_ids = progress.written_ids
+
+        def save(interaction: Interaction) -> None:
+            interaction.save(
+                str(output_dir / interaction.id), format=args.format, blob_store=blob_store
+            )
+            progress.record(interaction.id)
+
+        destination = str(output_dir)
+    if args.resume:
+        print(f"Resuming: {len(skip_ids)} interactions already written")
+
+    print(f"Streaming traces from {args.input} with {args.workers} writers...")
     try:
-        interactions = ingest(args.input)
+        written, skipped = write_interactions(
+            ingest(args.input), save, args.workers, args.queue_size, set(skip_ids)
+        )
     except NotImplementedError as e:
         print(f"\nError: {e}")
         print("\nPlease implement the ingest() function in this script.")
         print("See SKILL.md Phase 1 for guidance.")
         return
-
-    print(f"\nFound {len(interactions)} interactions")
-
-    # Save each interaction to filesystem
-    print(f"Saving interactions to {args.output_dir}...")
-    output_dir = Path(args.output_dir)
-    output_dir.mkdir(parents=True, exist_ok=True)
-
-    for interaction in interactions:
-        interaction_path = output_dir / interaction.id
-        interaction.save(str(interaction_path))
-
-    print(f"\nComplete! Saved {len(interactions)} interactions to {output_dir}")
+    finally:
+        if shard_writer is not None:
+            shard_writer.close()
+        if progress is not None:
+            progress.close()
+
+    print(f"\nComplete! Wrote {written} interactions to {destination}")
+    if skipped:
+        print(f"  ({skipped} already written by a previous run were skipped)")
     print(f"\nNext steps:")
     print(f"  1. Validate: python scripts/validate_ingested_data.py --ingested-dir {args.output_dir} --verbose")
     print(f"  2. Create feedback config")
@@ -188,6 +360,6 @@ echo "   2. Imports from scripts._models (no code duplication!)"
 echo "   3. ingest() template + main() execution logic"
 echo ""
 echo "Next steps:"
-echo "  1. Edit $OUTPUT_FILE and implement the ingest(folder_path) function"
+echo "  1. Edit $OUTPUT_FILE and implement the ingest(folder_path) generator"
 echo "  2. Run: python $OUTPUT_FILE --input /path/to/traces/folder"
 echo ""
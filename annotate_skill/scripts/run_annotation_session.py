@@ -7,12 +7,12 @@ Usage:
         --port 8000 # backend port
         --frontend-port 5173 # frontend port
 """
+
 import argparse
 import asyncio
 import json
 import logging
 import os
-import shutil
 import signal
 import subprocess
 import sys
@@ -30,10 +30,14 @@ from fastapi.middleware.cors import CORSMiddleware
 from ._models import (
     Interaction,
     FeedbackConfig,
+    SerializationFormat,
+    SpanTree,
     TestCaseStatus,
 )
 from ._test_case_processor import TestCaseProcessor
+from ._interaction_utils import LoadExecutor
 from ._test_case_collection import TestCaseCollection
+from ._test_case_store import TestCaseStoreKind
 from ._annotation_utils import compute_feedback_config_stats
 from .api_models import (
     AnnotationRequest,
@@ -44,6 +48,8 @@ from .api_models import (
     HealthResponse,
     NewTestCasesInfo,
     NextTestCaseResponse,
+    ReloadIngestedDataResponse,
+    SearchResponse,
     StatusCounts,
     StatsResponse,
     VisualizeTestCaseResponse,
@@ -54,8 +60,17 @@ logger = logging.getLogger(__name__)
 haize_annotations_dir: Optional[Path] = None
 source_data_directory: Optional[Path] = None
 collection: Optional[TestCaseCollection] = None
+test_case_store_kind: TestCaseStoreKind = "file"
+trusted_reads: bool = False
+serialization_format: SerializationFormat = "json"
+load_workers: Optional[int] = None
+load_executor: LoadExecutor = "thread"
+lazy_payloads: bool = False
+reload_interval: float = 0
+reload_task: Optional[asyncio.Task] = None
 test_case_processor_worker: Optional[TestCaseProcessor] = None
 test_case_processor_task: Optional[asyncio.Task] = None
+archive_task: Optional[asyncio.Task] = None
 
 feedback_config: Optional[FeedbackConfig] = None
 frontend_process: Optional[subprocess.Popen] = None
@@ -64,9 +79,19 @@ frontend_port: int = 5173
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    global reload_task
     await refresh_on_startup_or_config_change()
+    if reload_interval > 0:
+        reload_task = asyncio.create_task(_watch_ingested_data(reload_interval))
     yield
-    global test_case_processor_task, frontend_process
+    global test_case_processor_task, frontend_process, archive_task
+
+    if reload_task and not reload_task.done():
+        reload_task.cancel()
+        try:
+            await reload_task
+        except asyncio.CancelledError:
+            pass
 
     if test_case_processor_task and not test_case_processor_task.done():
         test_case_processor_task.cancel()
@@ -75,6 +100,10 @@ async def lifespan(app: FastAPI):
         except asyncio.CancelledError:
             pass
 
+    if archive_task and not archive_task.done():
+        logger.info("Waiting for test case archiving to finish...")
+        await archive_task
+
     if frontend_process and frontend_process.poll() is None:
         logger.info("\nShutting down frontend server...")
         frontend_process.terminate()
@@ -106,31 +135,73 @@ async def save_feedback_config():
         logger.info(f"✓ Updated feedback config stats: {feedback_config_path}")
 
 
-def _archive_annotated_test_cases(old_config_id: str) -> int:
-    global collection, haize_annotations_dir
+def _create_collection(build_search_index: bool = False) -> TestCaseCollection:
+    """A collection over the session's data.
 
-    if not collection or not haize_annotations_dir:
-        return 0
+    Only the live collection serving the API needs the search index; short-lived
+    ones (config validation, archive jobs) skip building it.
+    """
+    return TestCaseCollection(
+        haize_annotations_dir / "test_cases",
+        haize_annotations_dir,
+        store=test_case_store_kind,
+        trusted=trusted_reads,
+        serialization_format=serialization_format,
+        load_workers=load_workers,
+        load_executor=load_executor,
+        lazy_payloads=lazy_payloads,
+        build_search_index=build_search_index,
+    )
+
+
+async def _run_archive_job(
+    test_case_ids: list[str],
+    archive_dir: Path,
+    old_config: FeedbackConfig,
+    previous_job: Optional[asyncio.Task],
+) -> None:
+    if previous_job:
+        await previous_job
+
+    def archive() -> int:
+        # A separate collection: the store coordinates with the live one through
+        # its lock files, so nothing is shared between threads
+        return _create_collection().archive_test_cases(
+            test_case_ids, archive_dir, feedback_config=old_config
+        )
+
+    try:
+        archived_count = await asyncio.to_thread(archive)
+        logger.info(
+            f"✓ Archived {archived_count} annotated test cases to {archive_dir}"
+        )
+    except Exception as e:
+        logger.error(f"Failed to archive test cases to {archive_dir}: {e}")
+
+
+def _archive_annotated_test_cases(old_config: FeedbackConfig) -> int:
+    """Start archiving the human-annotated test cases and return how many there are.
 
-    all_test_cases = collection.list_test_cases()
-    annotated_cases = [tc for tc in all_test_cases if tc.human_annotation is not None]
+    The test cases are selected from the store's header index, and moved by a
+    background job so that a config change doesn't wait for it. The job embeds
+    `old_config` rather than reading the registry, which the new config may have
+    replaced by the time it runs.
+    """
+    global collection, haize_annotations_dir, archive_task
 
-    if not annotated_cases:
+    if not collection or not haize_annotations_dir:
         return 0
 
-    archive_dir = haize_annotations_dir / "archived_annotations" / old_config_id
-    archive_dir.mkdir(parents=True, exist_ok=True)
+    annotated_ids = collection.get_test_case_ids(has_human_annotation=True)
 
-    archived_count = 0
-    for tc in annotated_cases:
-        tc_file = collection.dir / f"tc_{tc.test_case_id}.json"
-        if tc_file.exists():
-            archive_file = archive_dir / f"tc_{tc.test_case_id}.json"
-            shutil.move(str(tc_file), str(archive_file))
-            archived_count += 1
+    if not annotated_ids:
+        return 0
 
-    logger.info(f"✓ Archived {archived_count} annotated test cases to {archive_dir}")
-    return archived_count
+    archive_dir = haize_annotations_dir / "archived_annotations" / old_config.id
+    archive_task = asyncio.create_task(
+        _run_archive_job(annotated_ids, archive_dir, old_config, archive_task)
+    )
+    return len(annotated_ids)
 
 
 async def refresh_on_startup_or_config_change() -> bool:
@@ -161,9 +232,11 @@ async def refresh_on_startup_or_config_change() -> bool:
         feedback_config = FeedbackConfig(**json.loads(content))
     logger.info(f"✓ Loaded feedback config: {feedback_config.id}")
 
-    test_cases_dir = haize_annotations_dir / "test_cases"
-    collection = TestCaseCollection(test_cases_dir, haize_annotations_dir)
-    logger.info(f"✓ Initialized test case collection: {test_cases_dir}")
+    collection = _create_collection(build_search_index=True)
+    logger.info(f"✓ Initialized test case collection: {collection.dir}")
+    # Pending test cases of this config ID see an edited rubric or categories;
+    # judged ones keep the version they were judged under
+    collection.feedback_configs.register(feedback_config)
 
     if not collection.has_data():
         logger.warning("No ingested data available. Run ingestion first.")
@@ -219,6 +292,64 @@ def _generate_test_cases_for_config(config: FeedbackConfig) -> dict[str, int]:
     }
 
 
+def reload_ingested_data() -> ReloadIngestedDataResponse:
+    """Merge newly ingested data into the live session.
+
+    Only new and re-ingested interactions are parsed. Test cases are created for
+    the new raw judge inputs that match the active feedback config, and the test
+    case processor picks them up on its next poll. Pending test cases of removed
+    raw judge inputs are marked invalid.
+    """
+    global collection, feedback_config, test_case_processor_worker
+
+    if not collection:
+        raise ValueError("TestCaseCollection not initialized")
+
+    delta = collection.reload_ingested_data()
+    if delta is None:
+        raise ValueError("No ingested data found")
+
+    new_test_case_ids: dict[str, list[str]] = {"pointwise": [], "ranking": []}
+    if not delta.is_empty():
+        if feedback_config:
+            new_test_case_ids = collection.initialize_test_cases_for_new_inputs(
+                collection.get_new_raw_judge_inputs(delta, feedback_config.granularity),
+                collection.get_raw_judge_inputs(feedback_config.granularity),
+                feedback_config,
+            )
+        if test_case_processor_worker:
+            test_case_processor_worker.steps = collection.get_raw_judge_inputs("step")
+            test_case_processor_worker.interactions = collection.get_raw_judge_inputs(
+                "interaction"
+            )
+            test_case_processor_worker.groups = collection.get_raw_judge_inputs("group")
+
+    return ReloadIngestedDataResponse(
+        added=len(delta.added),
+        changed=len(delta.changed),
+        removed=len(delta.removed),
+        total_steps=len(collection.get_raw_judge_inputs("step")),
+        new_pointwise_test_cases=len(new_test_case_ids["pointwise"]),
+        new_ranking_test_cases=len(new_test_case_ids["ranking"]),
+        invalidated_test_cases=len(delta.invalidated_test_case_ids),
+    )
+
+
+async def _watch_ingested_data(interval: float) -> None:
+    """Reload the ingested data every `interval` seconds."""
+    while True:
+        await asyncio.sleep(interval)
+        if not collection:
+            continue
+        try:
+            result = reload_ingested_data()
+        except Exception as e:
+            logger.error(f"Failed to reload ingested data: {e}")
+            continue
+        if result.added or result.changed or result.removed:
+            logger.info(f"✓ Reloaded ingested data: {result}")
+
+
 @app.get("/health", response_model=HealthResponse)
 async def health() -> HealthResponse:
     """Health check endpoint."""
@@ -235,7 +366,7 @@ async def create_or_update_feedback_config(
     """Create or update the active feedback configuration.
 
     This will:
-    1. Archive existing annotated test cases if a config already exists
+    1. Archive existing annotated test cases in the background if a config already exists
     2. Save the new config to disk
     3. Refresh the entire annotation session (load config, generate test cases, start pipeline)
     """
@@ -249,13 +380,12 @@ async def create_or_update_feedback_config(
             logger.info(
                 f"📦 Archiving test cases from old config: {feedback_config.id}"
             )
-            archived_count = _archive_annotated_test_cases(feedback_config.id)
+            archived_count = _archive_annotated_test_cases(feedback_config)
 
         feedback_config = new_config
         await save_feedback_config()
 
-        test_cases_dir = haize_annotations_dir / "test_cases"
-        temp_collection = TestCaseCollection(test_cases_dir, haize_annotations_dir)
+        temp_collection = _create_collection()
 
         if temp_collection.has_data():
             raw_judge_inputs = temp_collection.get_raw_judge_inputs(
@@ -287,6 +417,15 @@ async def create_or_update_feedback_config(
         )
 
 
+@app.post("/ingested-data/reload", response_model=ReloadIngestedDataResponse)
+async def reload_ingested_data_endpoint() -> ReloadIngestedDataResponse:
+    """Pick up newly ingested or re-ingested data without restarting the server."""
+    try:
+        return reload_ingested_data()
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
 @app.get("/feedback-config", response_model=GetFeedbackConfigResponse)
 async def get_feedback_config() -> GetFeedbackConfigResponse:
     """Get the active feedback configuration."""
@@ -298,22 +437,21 @@ async def get_feedback_config() -> GetFeedbackConfigResponse:
 @app.get("/{step_id}/interaction")
 async def get_interaction_for_step(step_id: str) -> Interaction:
     """Get the interaction for a specific step."""
-    interaction_step = next(
-        (step for step in collection._steps if step.id == step_id), None
-    )
-    if not interaction_step:
+    if collection.get_step(step_id) is None:
         raise HTTPException(status_code=404, detail="Step not found")
-    interaction = next(
-        (
-            interaction
-            for interaction in collection._interactions
-            if interaction.id == interaction_step.interaction_id
-        ),
-        None,
-    )
+    interaction = collection.get_interaction_for_step(step_id)
     if not interaction:
         raise HTTPException(status_code=404, detail="Interaction not found")
-    return interaction.model_dump(mode="json")
+    return collection.materialize(interaction).model_dump(mode="json")
+
+
+@app.get("/interactions/{interaction_id}/span-tree", response_model=SpanTree)
+async def get_span_tree(interaction_id: str) -> SpanTree:
+    """Get the step hierarchy of an interaction: children, depths and critical path."""
+    interaction = collection.get_interaction(interaction_id)
+    if not interaction:
+        raise HTTPException(status_code=404, detail="Interaction not found")
+    return interaction.span_tree()
 
 
 @app.get("/test-cases/{test_case_id}")
@@ -321,11 +459,44 @@ async def get_test_case(test_case_id: str):
     """Get specific test case by ID."""
     try:
         tc = collection.get_test_case(test_case_id)
-        return tc.model_dump(mode="json")
+        return collection.materialize_test_case(tc).model_dump(mode="json")
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
 
 
+@app.get("/api/search", response_model=SearchResponse)
+async def search(q: str, limit: int = 20) -> SearchResponse:
+    """Full-text search of the ingested steps' names, inputs, outputs and messages.
+
+    Every term of `q` must match; end a term with `*` to match it as a prefix.
+    Returns the best matching steps with snippets, their interactions, and the
+    test cases judging them (or their interaction or group).
+    """
+    start = time.perf_counter()
+    try:
+        hits = collection.search(q, limit=max(1, min(limit, 200)))
+    except RuntimeError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+    interaction_ids = list(dict.fromkeys(hit.interaction_id for hit in hits))
+    references = [
+        reference
+        for hit in hits
+        for reference in (
+            ("step", hit.step_id),
+            ("interaction", hit.interaction_id),
+            ("group", hit.group_id),
+        )
+    ]
+    return SearchResponse(
+        query=q,
+        steps=hits,
+        interaction_ids=interaction_ids,
+        test_case_ids=collection.get_test_case_ids_for_inputs(references),
+        took_ms=(time.perf_counter() - start) * 1000,
+    )
+
+
 @app.get("/api/test-cases/next", response_model=NextTestCaseResponse)
 async def get_next_test_case() -> NextTestCaseResponse:
     """Get the next test case that needs human annotation.
@@ -336,23 +507,22 @@ async def get_next_test_case() -> NextTestCaseResponse:
     if they have no particular preference on what they want to see.
 
     Otherwise, feel free to do more targeted scans of the test cases directory
-    or use the search endpoint.
+    or use the search endpoint (GET /api/search?q=...).
     """
-    ai_annotated = collection.get_by_status(TestCaseStatus.AI_ANNOTATED)
+    next_tc, ai_annotated_count = collection.get_oldest_by_status(
+        TestCaseStatus.AI_ANNOTATED
+    )
 
-    if not ai_annotated:
+    if next_tc is None:
         return NextTestCaseResponse(
             test_case=None,
             remaining=0,
             message="No test cases ready for annotation",
         )
 
-    ai_annotated.sort(key=lambda tc: tc.created_at)
-    next_tc = ai_annotated[0]
-
     return NextTestCaseResponse(
-        test_case=next_tc,
-        remaining=len(ai_annotated) - 1,
+        test_case=collection.materialize_test_case(next_tc),
+        remaining=ai_annotated_count - 1,
     )
 
 
@@ -403,9 +573,8 @@ async def get_stats() -> StatsResponse:
 
     comprehensive_stats = None
     if feedback_config:
-        all_test_cases = collection.list_test_cases()
         comprehensive_stats = compute_feedback_config_stats(
-            all_test_cases, feedback_config.feedback_spec
+            collection.iter_test_cases(), feedback_config.feedback_spec
         )
 
     return StatsResponse(
@@ -440,13 +609,60 @@ def main():
         action="store_true",
         help="Skip starting the frontend dev server",
     )
+    parser.add_argument(
+        "--test-case-store",
+        choices=["file", "sqlite"],
+        default="file",
+        help="Test case storage backend: one JSON file per test case, or an indexed SQLite database (default: file)",
+    )
+    parser.add_argument(
+        "--trusted-reads",
+        action="store_true",
+        help="Skip model validators when loading test cases and feedback configs written by this version of the tool",
+    )
+    parser.add_argument(
+        "--serialization-format",
+        choices=["json", "compact", "msgpack", "zstd"],
+        default="json",
+        help="Format for writing test cases; existing test cases are read in any format (default: json)",
+    )
+    parser.add_argument(
+        "--load-workers",
+        type=int,
+        default=None,
+        help="Workers for loading ingested interactions (default: one per CPU, 1 to load sequentially)",
+    )
+    parser.add_argument(
+        "--load-executor",
+        choices=["thread", "process"],
+        default="thread",
+        help="Load ingested interactions in worker threads or processes (default: thread)",
+    )
+    parser.add_argument(
+        "--lazy-payloads",
+        action="store_true",
+        help="Keep only step skeletons in memory and load step inputs, outputs and messages from disk when needed",
+    )
+    parser.add_argument(
+        "--reload-interval",
+        type=float,
+        default=0,
+        help="Pick up newly ingested data every this many seconds (default: 0, only on POST /ingested-data/reload)",
+    )
     args = parser.parse_args()
 
-    global haize_annotations_dir, source_data_directory, collection, feedback_config, frontend_port
+    global haize_annotations_dir, source_data_directory, collection, feedback_config, frontend_port, test_case_store_kind, trusted_reads, serialization_format, load_workers, load_executor, lazy_payloads, reload_interval
 
     haize_annotations_dir = Path(args.haize_annotations_dir)
     source_data_directory = Path(args.source_data_directory)
     frontend_port = args.frontend_port
+    test_case_store_kind = args.test_case_store
+    trusted_reads = args.trusted_reads
+    serialization_format = args.serialization_format
+    load_workers = args.load_workers
+    load_executor = args.load_executor
+    lazy_payloads = args.lazy_payloads
+    reload_interval = args.reload_interval
 
     haize_annotations_dir.mkdir(parents=True, exist_ok=True)
     logger.info(f"✓ Haize annotations directory: {haize_annotations_dir}")
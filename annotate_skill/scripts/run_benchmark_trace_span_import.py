@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Benchmark the trace.span importer, in spans per second.
+
+Builds a synthetic export by repeating a sample export with fresh trace and span
+IDs, then imports it into a temporary directory with each number of workers.
+
+Usage (must be run as a module):
+    python -m scripts.run_benchmark_trace_span_import --copies 500 --workers 1 4
+"""
+
+import argparse
+import re
+import shutil
+import tempfile
+from pathlib import Path
+
+from ._trace_spans import import_trace_spans
+
+DEFAULT_SAMPLE = (
+    Path(__file__).resolve().parents[2]
+    / "tests"
+    / "example_research_agent"
+    / "example_research_agent_traces.jsonl"
+)
+# Trace and span ID values, not the "trace_id" key
+_ID_PATTERN = re.compile(r'"(trace|span)_([0-9a-f]{16,})"')
+
+
+def write_synthetic_export(sample: Path, output: Path, copies: int) -> int:
+    """Write `copies` copies of a sample export with unique IDs; returns the line count."""
+    lines = sample.read_text().splitlines()
+    with open(output, "w") as f:
+        for copy in range(copies):
+            for line in lines:
+                f.write(_ID_PATTERN.sub(rf'"\1_{copy}_\2"', line) + "\n")
+    return len(lines) * copies
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark importing trace.span JSONL exports"
+    )
+    parser.add_argument(
+        "--sample",
+        default=str(DEFAULT_SAMPLE),
+        help="trace.span export to repeat (default: the example research agent traces)",
+    )
+    parser.add_argument(
+        "--copies",
+        type=int,
+        default=200,
+        help="Number of copies of the sample in the synthetic export (default: 200)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        nargs="+",
+        default=[1, 2, 4],
+        help="Worker counts to benchmark (default: 1 2 4)",
+    )
+    parser.add_argument(
+        "--format",
+        choices=["json", "compact", "msgpack", "zstd"],
+        default="compact",
+        help="Serialization format for saved interactions (default: compact)",
+    )
+    parser.add_argument(
+        "--range-mb",
+        type=int,
+        default=16,
+        help="Size of the chunks of input parsed by each task (default: 16)",
+    )
+    args = parser.parse_args()
+
+    work_dir = Path(tempfile.mkdtemp(prefix="trace_span_benchmark_"))
+    try:
+        export = work_dir / "export.jsonl"
+        line_count = write_synthetic_export(Path(args.sample), export, args.copies)
+        size_mb = export.stat().st_size / 1024 / 1024
+        print(f"📂 Synthetic export: {line_count} lines, {size_mb:.1f} MB")
+
+        for workers in args.workers:
+            interactions_dir = work_dir / f"workers_{workers}" / "interactions"
+            stats = import_trace_spans(
+                [export],
+                interactions_dir,
+                workers=workers,
+                range_bytes=args.range_mb * 1024 * 1024,
+                format=args.format,
+            )
+            print(
+                f"  {workers} workers: {stats.spans_per_second:>10,.0f} spans/s "
+                f"({stats.spans} spans, {stats.interactions} interactions; "
+                f"spill {stats.spill_seconds:.2f}s, build {stats.build_seconds:.2f}s)"
+            )
+            shutil.rmtree(interactions_dir.parent)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Import trace.span JSONL exports (e.g. from the OpenAI Agents SDK) without
+writing an ingest.py.
+
+Every span becomes an InteractionStep and every trace an Interaction, saved to
+ingested_data/interactions. Spans of a trace may be spread across lines and
+files; see scripts/_trace_spans.py for the record format and how the import is
+parallelized.
+
+Usage (must be run as a module):
+    python -m scripts.run_import_trace_spans \\
+        --input tests/example_research_agent/example_research_agent_traces.jsonl \\
+        --haize-annotations-dir .haize_annotations
+"""
+
+import argparse
+from pathlib import Path
+
+from ._models import BLOBS_DIRNAME, BlobStore
+from ._trace_spans import import_trace_spans
+
+
+def _input_files(inputs: list[str]) -> list[Path]:
+    paths = []
+    for input_path in map(Path, inputs):
+        if input_path.is_dir():
+            paths.extend(sorted(input_path.rglob("*.jsonl")))
+        else:
+            paths.append(input_path)
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Import trace.span JSONL exports into the ingested data store"
+    )
+    parser.add_argument(
+        "--input",
+        required=True,
+        nargs="+",
+        help="JSONL files, or directories searched for *.jsonl files",
+    )
+    parser.add_argument(
+        "--haize-annotations-dir",
+        required=True,
+        help="Haize annotations directory; interactions are written to ingested_data/interactions",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Worker processes (default: one per CPU)",
+    )
+    parser.add_argument(
+        "--range-mb",
+        type=int,
+        default=64,
+        help="Size of the chunks of input parsed by each task (default: 64)",
+    )
+    parser.add_argument(
+        "--format",
+        choices=["json", "compact", "msgpack", "zstd"],
+        default="json",
+        help="Serialization format for saved interactions (default: json)",
+    )
+    parser.add_argument(
+        "--blobs",
+        action="store_true",
+        help="Store large payload strings once in ingested_data/blobs and reference them from the steps",
+    )
+    args = parser.parse_args()
+
+    paths = _input_files(args.input)
+    if not paths:
+        print(f"No JSONL files found in {' '.join(args.input)}")
+        return
+
+    ingested_data_dir = Path(args.haize_annotations_dir) / "ingested_data"
+    interactions_dir = ingested_data_dir / "interactions"
+    blob_store = BlobStore(ingested_data_dir / BLOBS_DIRNAME) if args.blobs else None
+
+    print(f"📂 Importing trace spans from {len(paths)} files into {interactions_dir}")
+    stats = import_trace_spans(
+        paths,
+        interactions_dir,
+        workers=args.workers,
+        range_bytes=args.range_mb * 1024 * 1024,
+        format=args.format,
+        blob_store=blob_store,
+    )
+
+    print(
+        f"✓ Imported {stats.spans} spans into {stats.interactions} interactions "
+        f"({stats.traces} trace records) in {stats.seconds:.1f}s, "
+        f"{stats.spans_per_second:,.0f} spans/s"
+    )
+    if stats.skipped_lines:
+        print(f"⚠️  Skipped {stats.skipped_lines} lines that aren't spans or traces")
+    if stats.failed_traces:
+        print(f"⚠️  Could not import {stats.failed_traces} traces")
+    for error in stats.errors:
+        print(f"   {error}")
+    print(
+        f"\nNext: python -m scripts.run_validate_ingested_data "
+        f"--ingested-dir {interactions_dir}"
+    )
+
+
+if __name__ == "__main__":
+    main()
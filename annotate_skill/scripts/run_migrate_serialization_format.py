@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Convert an existing .haize_annotations directory to another serialization format.
+
+Rewrites ingested interactions, test cases and archived test cases in the given
+format. Files in any format can always be loaded, so this is only needed to
+shrink or speed up an existing directory.
+
+Usage (must be run as a module):
+    python -m scripts.run_migrate_serialization_format \\
+        --haize-annotations-dir .haize_annotations \\
+        --format zstd
+"""
+
+import argparse
+from pathlib import Path
+from typing import Optional
+
+from ._models import (
+    BLOBS_DIRNAME,
+    SERIALIZATION_EXTENSIONS,
+    BlobStore,
+    Interaction,
+    SerializationFormat,
+    dump_bytes,
+    load_bytes,
+)
+from ._test_case_collection import TestCaseCollection
+from ._test_case_store import test_case_file_id
+
+
+def migrate_interactions(
+    interactions_dir: Path,
+    serialization_format: SerializationFormat,
+    blob_store: Optional[BlobStore] = None,
+) -> int:
+    """Re-save every ingested interaction in the given format.
+
+    Large payload strings are moved to `blob_store` if given, and inlined otherwise.
+    """
+    migrated_count = 0
+    for interaction_dir in interactions_dir.iterdir():
+        if not interaction_dir.is_dir():
+            continue
+        try:
+            interaction = Interaction.load(str(interaction_dir))
+        except Exception as e:
+            print(f"⚠️  Warning: Could not load {interaction_dir.name}: {e}")
+            continue
+        interaction.save(
+            str(interaction_dir), format=serialization_format, blob_store=blob_store
+        )
+        migrated_count += 1
+    return migrated_count
+
+
+def migrate_archived_test_cases(
+    archive_dir: Path, serialization_format: SerializationFormat
+) -> int:
+    """Rewrite archived tc_{id} files in the given format."""
+    extension = SERIALIZATION_EXTENSIONS[serialization_format]
+    migrated_count = 0
+    for tc_file in archive_dir.rglob("tc_*"):
+        test_case_id = test_case_file_id(tc_file)
+        if test_case_id is None:
+            continue
+        data = load_bytes(tc_file.read_bytes())
+        new_file = tc_file.with_name(f"tc_{test_case_id}{extension}")
+        new_file.write_bytes(dump_bytes(data, serialization_format))
+        if new_file != tc_file:
+            tc_file.unlink()
+        migrated_count += 1
+    return migrated_count
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Convert a .haize_annotations directory to another serialization format"
+    )
+    parser.add_argument(
+        "--haize-annotations-dir",
+        required=True,
+        help="Haize annotations directory to convert",
+    )
+    parser.add_argument(
+        "--format",
+        required=True,
+        choices=["json", "compact", "msgpack", "zstd"],
+        help="Serialization format to convert to",
+    )
+    parser.add_argument(
+        "--blobs",
+        action="store_true",
+        help="Store large step payload strings once in ingested_data/blobs (default: inline them)",
+    )
+    parser.add_argument(
+        "--test-case-store",
+        choices=["file", "sqlite"],
+        default="file",
+        help="Test case storage backend used by the annotation session (default: file)",
+    )
+    args = parser.parse_args()
+
+    haize_annotations_dir = Path(args.haize_annotations_dir)
+    interactions_dir = haize_annotations_dir / "ingested_data" / "interactions"
+    test_cases_dir = haize_annotations_dir / "test_cases"
+    archive_dir = haize_annotations_dir / "archived_annotations"
+
+    if interactions_dir.exists():
+        print(f"📂 Converting interactions in {interactions_dir}")
+        blob_store = (
+            BlobStore(interactions_dir.parent / BLOBS_DIRNAME) if args.blobs else None
+        )
+        count = migrate_interactions(interactions_dir, args.format, blob_store)
+        print(f"✓ Converted {count} interactions")
+
+    if test_cases_dir.exists():
+        print(f"📂 Converting test cases in {test_cases_dir}")
+        collection = TestCaseCollection(
+            test_cases_dir,
+            haize_annotations_dir,
+            store=args.test_case_store,
+            serialization_format=args.format,
+        )
+        count = collection.convert_serialization_format()
+        print(f"✓ Converted {count} test cases")
+
+    if archive_dir.exists():
+        print(f"📂 Converting archived test cases in {archive_dir}")
+        count = migrate_archived_test_cases(archive_dir, args.format)
+        print(f"✓ Converted {count} archived test cases")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Pack ingested interactions into a few large shard files plus an offset index.
+
+Converts the one-directory-per-interaction layout under
+ingested_data/interactions into ingested_data/shards, which the annotation
+session loads instead of the interaction directories when present.
+
+Usage (must be run as a module):
+    python -m scripts.run_pack_ingested_data \\
+        --haize-annotations-dir .haize_annotations
+"""
+
+import argparse
+import shutil
+from pathlib import Path
+from typing import Optional
+
+from ._models import BLOBS_DIRNAME, BlobStore, Interaction, InteractionShardWriter
+
+
+def pack_interactions(
+    interactions_dir: Path,
+    shard_dir: Path,
+    serialization_format: str = "compact",
+    max_shard_bytes: int = 256 * 1024 * 1024,
+    blob_store: Optional[BlobStore] = None,
+) -> tuple[int, list[str]]:
+    """Write every interaction directory in `interactions_dir` into shards.
+
+    Returns the number of interactions packed and the names of the directories
+    skipped because they could not be loaded.
+    """
+    packed_count = 0
+    skipped: list[str] = []
+    with InteractionShardWriter(
+        str(shard_dir),
+        format=serialization_format,
+        max_shard_bytes=max_shard_bytes,
+        blob_store=blob_store,
+    ) as writer:
+        for interaction_dir in sorted(interactions_dir.iterdir()):
+            if not interaction_dir.is_dir():
+                continue
+            try:
+                interaction = Interaction.load(str(interaction_dir))
+            except Exception as e:
+                print(f"⚠️  Warning: Could not load {interaction_dir.name}: {e}")
+                skipped.append(interaction_dir.name)
+                continue
+            interaction.save_to_shard(writer)
+            packed_count += 1
+    return packed_count, skipped
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Pack ingested interactions into offset-indexed shard files"
+    )
+    parser.add_argument(
+        "--haize-annotations-dir",
+        required=True,
+        help="Haize annotations directory containing ingested_data/interactions",
+    )
+    parser.add_argument(
+        "--format",
+        choices=["compact", "msgpack", "zstd"],
+        default="compact",
+        help="Record format inside the shards (default: compact JSON lines)",
+    )
+    parser.add_argument(
+        "--max-shard-mb",
+        type=int,
+        default=256,
+        help="Start a new shard once the current one reaches this size (default: 256)",
+    )
+    parser.add_argument(
+        "--blobs",
+        action="store_true",
+        help="Store large payload strings once in ingested_data/blobs and reference them from the shards",
+    )
+    parser.add_argument(
+        "--remove-interaction-dirs",
+        action="store_true",
+        help="Delete ingested_data/interactions after packing, unless an interaction could not be packed",
+    )
+    args = parser.parse_args()
+
+    ingested_data_dir = Path(args.haize_annotations_dir) / "ingested_data"
+    interactions_dir = ingested_data_dir / "interactions"
+    shard_dir = ingested_data_dir / "shards"
+
+    if not interactions_dir.exists():
+        print(f"Ingested data directory not found at {interactions_dir}")
+        return
+
+    print(f"📂 Packing interactions from {interactions_dir} into {shard_dir}")
+    blob_store = BlobStore(ingested_data_dir / BLOBS_DIRNAME) if args.blobs else None
+    count, skipped = pack_interactions(
+        interactions_dir,
+        shard_dir,
+        args.format,
+        args.max_shard_mb * 1024 * 1024,
+        blob_store,
+    )
+    print(f"✓ Packed {count} interactions")
+    if skipped:
+        print(f"⚠️  Skipped {len(skipped)} interactions: {', '.join(skipped)}")
+
+    if args.remove_interaction_dirs and skipped:
+        print(
+            f"Not removing {interactions_dir}: the skipped interactions are only "
+            "there. Fix or remove them and re-run."
+        )
+    elif args.remove_interaction_dirs:
+        shutil.rmtree(interactions_dir)
+        print(f"🗑️  Removed {interactions_dir}")
+    else:
+        print(
+            f"Shards take precedence over {interactions_dir}; "
+            "re-run this after re-ingesting."
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -2,95 +2,338 @@
 """
 Validate ingested data in filesystem structure.
 
-This is a standalone script - no imports from skill library needed.
-It reads interactions from the filesystem and validates structure.
+Reads interactions from the filesystem and validates their structure, streaming
+each step once through worker processes. When the interactions were packed into
+shards (ingested_data/shards), the shards are validated instead, as the
+annotation session loads them in preference. The report can also be written as
+JSON.
 
 Usage:
     python scripts/validate_ingested_data.py \\
         --ingested-dir .haize_annotations/ingested_data/interactions \\
-        --verbose
+        --verbose --json validation_report.json
 """
 
 import argparse
-import random
 import json
+import math
+import os
+import random
+import sys
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 from pathlib import Path
-from collections import Counter, defaultdict
-from pydantic import ValidationError
+from typing import Any, Callable, Iterable, Optional, TypeVar, Union
+
+from ._models import Interaction, InteractionShardReader, InteractionStep, load_bytes
+
+# Step fields whose coverage (share of steps with a truthy value) is reported
+COVERAGE_FIELDS = (
+    "id",
+    "name",
+    "interaction_id",
+    "parent_step_id",
+    "input_data",
+    "output_data",
+    "model",
+)
+SAMPLE_SIZE = 5
+SAMPLE_STEPS = 2
+
+# An interaction directory, or the ID of an interaction packed in shards
+Item = TypeVar("Item", Path, str)
+
 
-from ._models import InteractionStep
+class ValidationStats:
+    """
+    Statistics of the ingested data, accumulated one step at a time.
 
+    Apart from the IDs needed for orphan detection, memory doesn't grow with the
+    number of steps: counters are merged across interactions and worker shards,
+    and steps are dropped as soon as they are counted.
+    """
 
-def load_interaction(interaction_dir: Path) -> tuple[dict, list[InteractionStep]]:
-    with open(interaction_dir / "metadata.json", "r") as f:
-        metadata = json.load(f)
+    def __init__(self):
+        self.total_steps = 0
+        self.num_interactions = 0
+        self.root_steps = 0
+        self.llm_calls = 0
+        self.models: Counter[str] = Counter()
+        self.field_counts: Counter[str] = Counter()
+        self.interactions_per_group: Counter[str] = Counter()
+        self.step_ids: set[str] = set()
+        # Parent references not resolved within their own interaction
+        self.pending_parents: Counter[str] = Counter()
+        self.load_errors: list[str] = []
+        self.samples: list[dict[str, Any]] = []
+
+    def add_step(self, step: InteractionStep) -> None:
+        self.total_steps += 1
+        if not step.parent_step_id:
+            self.root_steps += 1
+        if step.model:
+            self.llm_calls += 1
+            self.models[step.model] += 1
+        for field in COVERAGE_FIELDS:
+            if getattr(step, field):
+                self.field_counts[field] += 1
+
+    def merge(self, other: "ValidationStats") -> None:
+        self.total_steps += other.total_steps
+        self.num_interactions += other.num_interactions
+        self.root_steps += other.root_steps
+        self.llm_calls += other.llm_calls
+        self.models.update(other.models)
+        self.field_counts.update(other.field_counts)
+        self.interactions_per_group.update(other.interactions_per_group)
+        self.step_ids.update(other.step_ids)
+        self.pending_parents.update(other.pending_parents)
+        self.load_errors.extend(other.load_errors)
+        self.samples.extend(other.samples)
+
+    def resolve_parents(self) -> None:
+        """Drop pending parent references to steps seen so far."""
+        for parent_id in [p for p in self.pending_parents if p in self.step_ids]:
+            del self.pending_parents[parent_id]
+
+    def orphaned_steps(self) -> int:
+        self.resolve_parents()
+        return sum(self.pending_parents.values())
+
+
+def _parse_step(
+    record: Union[bytes, dict[str, Any]], blob_store: Optional[Any]
+) -> InteractionStep:
+    if blob_store is not None:
+        data = record if isinstance(record, dict) else json.loads(record)
+        return InteractionStep.model_validate(blob_store.resolve_step(data))
+    if isinstance(record, dict):
+        return InteractionStep.model_validate(record)
+    return InteractionStep.model_validate_json(record)
+
+
+def _step_preview(step: InteractionStep) -> dict[str, Any]:
+    preview: dict[str, Any] = {"id": step.id}
+    if step.name:
+        preview["name"] = step.name
+    if step.model:
+        preview["model"] = step.model
+    if step.input_data:
+        preview["input"] = str(step.input_data)[:100]
+    if step.output_data:
+        preview["output"] = str(step.output_data)[:100]
+    return preview
+
+
+def _validate_steps(
+    name: str,
+    metadata: dict[str, Any],
+    records: Iterable[Union[bytes, dict[str, Any]]],
+    blob_store: Optional[Any],
+    sample: bool = False,
+) -> ValidationStats:
+    """Stream the step records of one interaction into fresh statistics."""
+    stats = ValidationStats()
+    parent_refs: Counter[str] = Counter()
+    previews = []
+    for record in records:
+        try:
+            step = _parse_step(record, blob_store)
+        except ValueError as e:
+            raise ValueError(f"Invalid step in {name}: {e}")
+        stats.add_step(step)
+        stats.step_ids.add(step.id)
+        if step.parent_step_id:
+            parent_refs[step.parent_step_id] += 1
+        if sample and len(previews) < SAMPLE_STEPS:
+            previews.append(_step_preview(step))
+
+    # Parents are nearly always in the same interaction; only the rest wait for
+    # the IDs of the other interactions
+    stats.pending_parents = Counter(
+        {
+            parent_id: count
+            for parent_id, count in parent_refs.items()
+            if parent_id not in stats.step_ids
+        }
+    )
+    stats.num_interactions = 1
+    if metadata.get("group_id"):
+        stats.interactions_per_group[metadata["group_id"]] = 1
+    if sample:
+        stats.samples.append(
+            {
+                "id": metadata["id"],
+                "name": metadata.get("name"),
+                "group_id": metadata.get("group_id"),
+                "num_steps": stats.total_steps,
+                "steps": previews,
+            }
+        )
+    return stats
+
+
+def validate_interaction(
+    interaction_dir: Path, sample: bool = False
+) -> ValidationStats:
+    """Stream the steps of one saved interaction into fresh statistics."""
+    metadata = Interaction.load_metadata(str(interaction_dir))
+    return _validate_steps(
+        interaction_dir.name,
+        metadata,
+        Interaction.iter_step_records(str(interaction_dir)),
+        Interaction.blob_store_for(str(interaction_dir), metadata),
+        sample,
+    )
 
-    steps = []
-    with open(interaction_dir / "steps.jsonl", "r") as f:
-        for line in f:
-            if line.strip():
-                step_data = json.loads(line)
-                try:
-                    step = InteractionStep(**step_data)
-                    steps.append(step)
-                except ValidationError as e:
-                    raise ValidationError(
-                        f"Invalid step in {interaction_dir.name}: {e}"
-                    )
 
-    return metadata, steps
+def validate_packed_interaction(
+    reader: InteractionShardReader, interaction_id: str, sample: bool = False
+) -> ValidationStats:
+    """Stream the steps of one interaction packed in shards into fresh statistics."""
+    metadata = load_bytes(reader.read_record(interaction_id))
+    records = metadata.pop("steps", None) or []
+    return _validate_steps(interaction_id, metadata, records, reader.blob_store, sample)
 
 
-def validate_ingested_filesystem(ingested_dir: Path, verbose: bool = False) -> dict:
+def validate_shard(
+    interaction_dirs: list[Path], sample_dirs: frozenset[Path] = frozenset()
+) -> ValidationStats:
+    """Validate a shard of interaction directories into merged statistics."""
+    shard_stats = ValidationStats()
+    for interaction_dir in interaction_dirs:
+        try:
+            interaction_stats = validate_interaction(
+                interaction_dir, interaction_dir in sample_dirs
+            )
+        except Exception as e:
+            shard_stats.load_errors.append(f"{interaction_dir.name}: {e}")
+            continue
+        shard_stats.merge(interaction_stats)
+    shard_stats.resolve_parents()
+    return shard_stats
+
+
+def validate_packed_shard(
+    shard_dir: Path,
+    interaction_ids: list[str],
+    sample_ids: frozenset[str] = frozenset(),
+) -> ValidationStats:
+    """Validate a shard of the interactions packed in `shard_dir` into merged statistics."""
+    shard_stats = ValidationStats()
+    with InteractionShardReader(str(shard_dir)) as reader:
+        for interaction_id in interaction_ids:
+            try:
+                interaction_stats = validate_packed_interaction(
+                    reader, interaction_id, interaction_id in sample_ids
+                )
+            except Exception as e:
+                shard_stats.load_errors.append(f"{interaction_id}: {e}")
+                continue
+            shard_stats.merge(interaction_stats)
+    shard_stats.resolve_parents()
+    return shard_stats
+
+
+def _validate_shards(
+    items: list[Item],
+    sample_items: frozenset[Item],
+    workers: int,
+    validate: Callable[[list[Item], frozenset[Item]], ValidationStats] = validate_shard,
+) -> ValidationStats:
+    stats = ValidationStats()
+    if workers <= 1:
+        stats.merge(validate(items, sample_items))
+        return stats
+    # A few shards per worker keeps workers busy when interaction sizes vary
+    shard_size = math.ceil(len(items) / (workers * 4))
+    shards = [items[i : i + shard_size] for i in range(0, len(items), shard_size)]
+    with ProcessPoolExecutor(workers) as pool:
+        for shard_stats in pool.map(validate, shards, [sample_items] * len(shards)):
+            stats.merge(shard_stats)
+    return stats
+
+
+def validate_ingested_filesystem(
+    ingested_dir: Path,
+    verbose: bool = False,
+    workers: Optional[int] = None,
+    shard_dir: Optional[Path] = None,
+) -> dict:
     """
     Validate ingested data stored in filesystem.
 
+    Every step is read once, by one of `workers` processes (default: one per
+    CPU), and counted without keeping it in memory.
+
     Args:
         ingested_dir: Directory containing interaction subdirectories
         verbose: Print detailed samples
+        workers: Number of worker processes; 1 validates in-process
+        shard_dir: Directory of packed shards; validated instead of
+            `ingested_dir` if it contains any
 
     Returns:
-        Dictionary of validation results and statistics
+        Dictionary of validation results and statistics, JSON-serializable
     """
     results = {"valid": True, "errors": [], "warnings": [], "stats": {}}
 
-    if not ingested_dir.exists():
+    use_shards = shard_dir is not None and InteractionShardReader.exists(str(shard_dir))
+    if not use_shards and not ingested_dir.exists():
         results["valid"] = False
         results["errors"].append(f"Directory not found: {ingested_dir}")
         return results
 
-    # Find all interaction directories
-    interaction_dirs = [d for d in ingested_dir.iterdir() if d.is_dir()]
+    # Find all interaction directories, or packed interactions
+    interaction_dirs = (
+        sorted(d for d in ingested_dir.iterdir() if d.is_dir())
+        if ingested_dir.exists()
+        else []
+    )
+    if use_shards:
+        with InteractionShardReader(str(shard_dir)) as reader:
+            items: list = reader.ids()
+        print(f"Found {len(items)} interactions packed in {shard_dir}", file=sys.stderr)
+        unpacked = sorted({d.name for d in interaction_dirs}.difference(items))
+        if unpacked:
+            results["warnings"].append(
+                f"{len(unpacked)} interaction directories are not in the shards, "
+                f"which the annotation session loads instead; re-run "
+                f"run_pack_ingested_data: {', '.join(unpacked)}"
+            )
+        validate = partial(validate_packed_shard, shard_dir)
+    else:
+        items = interaction_dirs
+        print(f"Found {len(items)} interaction directories", file=sys.stderr)
+        validate = validate_shard
 
-    if not interaction_dirs:
+    if not items:
         results["valid"] = False
-        results["errors"].append("No interaction directories found")
+        results["errors"].append(
+            "No packed interactions found"
+            if use_shards
+            else "No interaction directories found"
+        )
         return results
 
-    print(f"Found {len(interaction_dirs)} interaction directories")
-
-    # Load and validate each interaction
-    interactions_metadata = []
-    all_steps = []
-    load_errors = []
-
-    for interaction_dir in interaction_dirs:
-        try:
-            metadata, steps = load_interaction(interaction_dir)
-            interactions_metadata.append(metadata)
-            all_steps.extend(steps)
-        except Exception as e:
-            load_errors.append(f"{interaction_dir.name}: {e}")
+    # Samples are picked up during the pass rather than loaded again afterwards
+    sample_items = frozenset(
+        random.sample(items, min(SAMPLE_SIZE, len(items))) if verbose else []
+    )
+    stats = _validate_shards(
+        items, sample_items, workers or os.cpu_count() or 1, validate
+    )
 
-    if load_errors:
-        results["warnings"].extend(load_errors)
-        if len(load_errors) == len(interaction_dirs):
+    if stats.load_errors:
+        results["warnings"].extend(stats.load_errors)
+        if len(stats.load_errors) == len(items):
             results["valid"] = False
             results["errors"].append("Failed to load all interactions")
             return results
 
-    total_steps = len(all_steps)
-    num_interactions = len(interactions_metadata)
+    total_steps = stats.total_steps
+    num_interactions = stats.num_interactions
 
     results["stats"]["total_steps"] = total_steps
     results["stats"]["num_interactions"] = num_interactions
@@ -101,102 +344,78 @@ def validate_ingested_filesystem(ingested_dir: Path, verbose: bool = False) -> d
         results["stats"]["avg_steps_per_interaction"] = 0
 
     # Group-level statistics
-    group_ids = [m.get("group_id") for m in interactions_metadata if m.get("group_id")]
-    unique_groups = len(set(group_ids))
+    unique_groups = len(stats.interactions_per_group)
     results["stats"]["num_groups"] = unique_groups
 
     if unique_groups > 0:
-        # Interactions per group
-        interactions_by_group = defaultdict(list)
-        for metadata in interactions_metadata:
-            if metadata.get("group_id"):
-                interactions_by_group[metadata["group_id"]].append(metadata["id"])
-
-        interactions_per_group = [len(ints) for ints in interactions_by_group.values()]
-        results["stats"]["avg_interactions_per_group"] = sum(
-            interactions_per_group
-        ) / len(interactions_per_group)
+        results["stats"]["avg_interactions_per_group"] = (
+            sum(stats.interactions_per_group.values()) / unique_groups
+        )
     else:
         results["stats"]["avg_interactions_per_group"] = 0
 
     # Root spans (steps with no parent)
-    root_steps = [s for s in all_steps if not s.parent_step_id]
-    results["stats"]["root_steps"] = len(root_steps)
+    results["stats"]["root_steps"] = stats.root_steps
 
     # LLM-specific statistics
-    llm_steps = [s for s in all_steps if s.model]
-    results["stats"]["llm_calls"] = len(llm_steps)
+    results["stats"]["llm_calls"] = stats.llm_calls
 
-    if llm_steps:
-        models = [s.model for s in llm_steps if s.model]
-        model_counts = dict(Counter(models))
-        results["stats"]["models_used"] = model_counts
+    if stats.llm_calls:
+        results["stats"]["models_used"] = dict(stats.models.most_common())
 
     # Field coverage
-    field_coverage = {
-        "id": sum(1 for s in all_steps if s.id),
-        "name": sum(1 for s in all_steps if s.name),
-        "interaction_id": sum(1 for s in all_steps if s.interaction_id),
-        "parent_step_id": sum(1 for s in all_steps if s.parent_step_id),
-        "input_data": sum(1 for s in all_steps if s.input_data),
-        "output_data": sum(1 for s in all_steps if s.output_data),
-        "model": sum(1 for s in all_steps if s.model),
-    }
-
+    field_coverage = {field: stats.field_counts[field] for field in COVERAGE_FIELDS}
+    results["stats"]["field_coverage"] = field_coverage
     results["stats"]["field_coverage_pct"] = {
-        field: f"{(count / total_steps) * 100:.1f}%"
+        field: f"{(count / total_steps) * 100:.1f}%" if total_steps else "0.0%"
         for field, count in field_coverage.items()
     }
 
     # Check for orphaned parent references
-    step_ids = {s.id for s in all_steps}
-    orphaned = [
-        s for s in all_steps if s.parent_step_id and s.parent_step_id not in step_ids
-    ]
+    orphaned = stats.orphaned_steps()
+    results["stats"]["orphaned_steps"] = orphaned
 
     if orphaned:
         results["warnings"].append(
-            f"{len(orphaned)} steps reference non-existent parent_step_id"
+            f"{orphaned} steps reference non-existent parent_step_id"
         )
 
-    if verbose and interactions_metadata:
-        print("\n" + "=" * 80)
-        print("SAMPLE INTERACTIONS (5 random)")
-        print("=" * 80)
+    if verbose:
+        results["samples"] = sorted(stats.samples, key=lambda sample: sample["id"])
 
-        sample_dirs = random.sample(interaction_dirs, min(5, len(interaction_dirs)))
+    return results
 
-        for interaction_dir in sample_dirs:
-            try:
-                metadata, steps = load_interaction(interaction_dir)
-
-                print(f"\nInteraction ID: {metadata['id']}")
-                if metadata.get("name"):
-                    print(f"  Name: {metadata['name']}")
-                if metadata.get("group_id"):
-                    print(f"  Group ID: {metadata['group_id']}")
-                print(f"  Steps: {len(steps)}")
-
-                # Show first 2 steps
-                for i, step in enumerate(steps[:2]):
-                    print(f"\n  Step {i+1}: {step.id}")
-                    if step.name:
-                        print(f"    Name: {step.name}")
-                    if step.model:
-                        print(f"    Model: {step.model}")
-                    if step.input_data:
-                        input_preview = str(step.input_data)[:100]
-                        print(f"    Input: {input_preview}...")
-                    if step.output_data:
-                        output_preview = str(step.output_data)[:100]
-                        print(f"    Output: {output_preview}...")
-
-                if len(steps) > 2:
-                    print(f"\n  ... and {len(steps) - 2} more steps")
-            except Exception as e:
-                print(f"\n  Error loading sample: {e}")
 
-    return results
+def print_samples(samples: list[dict]):
+    """Print the sampled interactions of a verbose validation."""
+    print("\n" + "=" * 80)
+    print(f"SAMPLE INTERACTIONS ({len(samples)} random)")
+    print("=" * 80)
+
+    for sample in samples:
+        print(f"\nInteraction ID: {sample['id']}")
+        if sample.get("name"):
+            print(f"  Name: {sample['name']}")
+        if sample.get("group_id"):
+            print(f"  Group ID: {sample['group_id']}")
+        print(f"  Steps: {sample['num_steps']}")
+
+        # Show first 2 steps
+        for i, step in enumerate(sample["steps"]):
+            print(f"\n  Step {i+1}: {step['id']}")
+            if step.get("name"):
+                print(f"    Name: {step['name']}")
+            if step.get("model"):
+                print(f"    Model: {step['model']}")
+            if step.get("input"):
+                print(f"    Input: {step['input']}...")
+            if step.get("output"):
+                print(f"    Output: {step['output']}...")
+
+        if sample["num_steps"] > len(sample["steps"]):
+            print(
+                f"\n  ... and {sample['num_steps'] - len(sample['steps'])} more steps"
+            )
 
 
 def print_results(results: dict):
@@ -263,15 +482,41 @@ def main():
     parser.add_argument(
         "--verbose", action="store_true", help="Show detailed samples of interactions"
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Worker processes validating interactions (default: one per CPU)",
+    )
+    parser.add_argument(
+        "--json",
+        metavar="PATH",
+        default=None,
+        help="Also write the report as JSON to PATH, or print only the JSON report with '-'",
+    )
 
     args = parser.parse_args()
 
     ingested_dir = Path(args.ingested_dir)
+    # Packed next to the interaction directories, in ingested_data/shards
+    shard_dir = ingested_dir.parent / "shards"
 
-    results = validate_ingested_filesystem(ingested_dir, args.verbose)
+    results = validate_ingested_filesystem(
+        ingested_dir, args.verbose, args.workers, shard_dir
+    )
 
+    if args.json == "-":
+        print(json.dumps(results, indent=2))
+        return
+
+    if results.get("samples"):
+        print_samples(results["samples"])
     print_results(results)
 
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2))
+        print(f"\n📝 Wrote JSON report to {args.json}")
+
 
 if __name__ == "__main__":
     main()